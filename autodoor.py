@@ -1,40 +1,4003 @@
+import time
+# 记录模块导入耗时，用于启动耗时统计
+IMPORT_START_TIME = time.perf_counter()
+
 import tkinter as tk
 from tkinter import messagebox, ttk, filedialog
-import pyautogui
-import pytesseract
-from PIL import Image, ImageGrab
+from tkinter import font as tkfont
+from PIL import Image, ImageChops, ImageFilter, ImageOps
 import threading
-import time
 import random
 import datetime
+import argparse
+import signal
 import subprocess
 import os
 import sys
 import json
 import platform
-from collections import deque
+import hashlib
+import heapq
+import math
+import importlib
+import importlib.util
+import itertools
+import logging
+import multiprocessing
+import queue
+import shlex
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait as futures_wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque, namedtuple, OrderedDict
+
+# 全局版本号配置
+VERSION = "1.2.0"
+
+# 延迟导入的模块及其首次导入耗时（毫秒）
+LAZY_IMPORT_TIMES = {}
+
+
+class LazyModule:
+    """延迟导入的模块
+    首次访问模块属性时才真正导入，缩短程序启动时间；是否已安装可通过available查询而不触发导入
+    """
+
+    def __init__(self, name, on_import=None):
+        self._name = name
+        self._on_import = on_import
+        self._module = None
+        self._lock = threading.Lock()
+
+    @property
+    def available(self):
+        """模块是否已安装"""
+        if self._module is not None:
+            return True
+        try:
+            return importlib.util.find_spec(self._name) is not None
+        except (ImportError, ValueError):
+            return False
+
+    def load(self):
+        """导入模块，导入失败时抛出ImportError"""
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._name)
+                    if self._on_import:
+                        self._on_import(module)
+                    LAZY_IMPORT_TIMES[self._name] = (time.perf_counter() - start) * 1000
+                    self._module = module
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __setattr__(self, attr, value):
+        if attr.startswith('_'):
+            object.__setattr__(self, attr, value)
+        else:
+            setattr(self.load(), attr, value)
+
+
+def _init_pyautogui(module):
+    # 禁用PyAutoGUI的故障安全机制，防止鼠标移动到屏幕角落时触发异常
+    module.FAILSAFE = False
+    # 按键时长和点击后的等待由事件线程调度，不需要每次调用后固定暂停0.1秒
+    module.PAUSE = 0
+
+
+def _init_pygame(module):
+    module.mixer.init()
+
+
+# 以下模块导入较慢或只在部分功能中使用，首次使用时再导入
+pyautogui = LazyModule("pyautogui", on_import=_init_pyautogui)
+pytesseract = LazyModule("pytesseract")
+ImageGrab = LazyModule("PIL.ImageGrab")
+
+# pygame用于音频播放
+pygame = LazyModule("pygame", on_import=_init_pygame)
+PYGAME_AVAILABLE = pygame.available
+
+# screeninfo用于多显示器区域选择，不可用时提供安装提示
+screeninfo = LazyModule("screeninfo")
+
+# numpy用于图像比较等向量化计算；打包版本可能不包含numpy
+np = LazyModule("numpy")
+NUMPY_AVAILABLE = np.available
+
+# mss用于高速截图；不可用时使用PIL的ImageGrab
+mss = LazyModule("mss")
+MSS_AVAILABLE = mss.available
+
+# python-xlib用于通过XTest扩展注入输入；不可用时使用pyautogui
+Xlib = LazyModule("Xlib")
+XLIB_AVAILABLE = Xlib.available
+
+# tesserocr直接调用libtesseract，不可用时回退到pytesseract
+tesserocr = LazyModule("tesserocr")
+TESSEROCR_AVAILABLE = tesserocr.available
+
+# 模块导入耗时，不包含延迟导入的模块
+IMPORT_TIME_MS = (time.perf_counter() - IMPORT_START_TIME) * 1000
+
+
+def encode_pnm(image):
+    """将图像编码为未压缩的PNM字节串，灰度图为P5，其余转为RGB后编码为P6"""
+    if image.mode not in ("L", "RGB"):
+        image = image.convert("L" if image.mode in ("1", "LA") else "RGB")
+    magic = b"P5" if image.mode == "L" else b"P6"
+    return b"%s\n%d %d\n255\n" % (magic, image.width, image.height) + image.tobytes()
+
+
+class OCRTimeout(Exception):
+    """OCR识别超过了设置的时限，tesseract进程已被终止"""
+
+
+class OCRCancelled(Exception):
+    """所属模块已停止，OCR识别被取消"""
+
+
+def tesseract_pipe_image_to_string(tesseract_cmd, image, lang='eng', config='', timeout=None, cancel_event=None):
+    """通过标准输入输出调用tesseract识别图像
+    图像以PNM格式写入tesseract的标准输入，识别结果从标准输出读取，不产生临时文件；
+    超时或cancel_event被设置时终止tesseract进程
+
+    Raises:
+        subprocess.CalledProcessError: tesseract返回非0
+        subprocess.TimeoutExpired: 超过timeout秒未完成
+        OCRCancelled: cancel_event被设置
+    """
+    args = [tesseract_cmd or "tesseract", "stdin", "stdout", "-l", lang]
+    args += shlex.split(config, posix=platform.system() != "Windows")
+    kwargs = {}
+    if platform.system() == "Windows":
+        # 不弹出控制台窗口
+        kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW
+    deadline = time.monotonic() + timeout if timeout else None
+    data = encode_pnm(image)
+    with subprocess.Popen(args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **kwargs) as process:
+        while True:
+            # 分段等待，以便及时响应取消
+            wait = 0.05 if cancel_event is not None else None
+            if deadline is not None:
+                remaining = max(0.0, deadline - time.monotonic())
+                wait = remaining if wait is None else min(wait, remaining)
+            try:
+                stdout, stderr = process.communicate(data, timeout=wait)
+                break
+            except subprocess.TimeoutExpired:
+                # 输入已在第一次等待时写入，继续等待时不能再次传入
+                data = None
+                cancelled = cancel_event is not None and cancel_event.is_set()
+                if not cancelled and (deadline is None or time.monotonic() < deadline):
+                    continue
+                process.kill()
+                process.communicate()
+                if cancelled:
+                    raise OCRCancelled("识别已取消")
+                raise subprocess.TimeoutExpired(args, timeout)
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, args, stdout, stderr)
+    return stdout.decode('utf-8', errors='replace')
+
+
+class OCREngine:
+    """常驻OCR引擎池
+    优先使用tesserocr常驻的libtesseract实例，避免每次识别都启动tesseract进程并重新加载模型；
+    tesserocr不可用时通过管道调用tesseract进程，也可指定使用pytesseract。文字识别和数字识别共用同一个引擎池。
+    进程池模式下识别在按CPU核数创建的工作进程中执行，每个进程的Tesseract只使用一个OpenMP线程
+    """
+
+    DEFAULT_POOL_SIZE = 3
+    # auto: 优先tesserocr，其次管道；pipe: 通过标准输入输出传递PNM图像；pytesseract: 经临时PNG文件调用
+    BACKENDS = ("auto", "tesserocr", "pipe", "pytesseract")
+    # thread: 在调用线程中识别；process: 提交到进程池识别
+    EXECUTORS = ("thread", "process")
+
+    def __init__(self, tesseract_cmd="", pool_size=DEFAULT_POOL_SIZE, log_callback=None, backend="auto",
+                 executor="thread"):
+        self.tesseract_cmd = tesseract_cmd
+        self.log_callback = log_callback
+        self.backend_name = backend
+        self.backend = self.resolve_backend(backend)
+
+        # 空闲的API实例，按(语言, 配置)分组
+        self._idle_apis = {}
+        self._all_apis = []
+        self._lock = threading.Lock()
+        # submit()使用的线程池和进程池模式的进程池，首次使用时创建
+        self._thread_pool = None
+        self._process_pool = None
+        self.executor = None
+        self.pool_size = None
+        self.configure_executor(executor, pool_size)
+
+        # 调用延迟统计
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        self.call_count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.timeout_count = 0
+        self.cancel_count = 0
+
+    def _log(self, message):
+        if self.log_callback:
+            self.log_callback(message)
+
+    def configure_executor(self, executor, pool_size=0):
+        """设置执行方式和池大小，pool_size为0时线程模式使用默认值，进程池模式使用CPU核数"""
+        executor = executor if executor in self.EXECUTORS else "thread"
+        if pool_size <= 0:
+            pool_size = (os.cpu_count() or 1) if executor == "process" else self.DEFAULT_POOL_SIZE
+        if executor == self.executor and pool_size == self.pool_size:
+            return
+        self._shutdown_pools()
+        self.executor = executor
+        self.pool_size = pool_size
+        # 限制同时进行的识别数量
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+
+    def _get_process_pool(self):
+        with self._lock:
+            if self._process_pool is None:
+                # 使用spawn启动工作进程，避免复制界面和调度线程的状态
+                self._process_pool = ProcessPoolExecutor(
+                    max_workers=self.pool_size, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_ocr_worker, initargs=(self.tesseract_cmd, self.backend_name))
+                self._log(f"OCR进程池已启动，工作进程数: {self.pool_size}")
+            return self._process_pool
+
+    def _shutdown_pools(self):
+        """关闭线程池和进程池，正在进行的识别完成后工作进程自行退出"""
+        with self._lock:
+            pools = [self._thread_pool, self._process_pool]
+            self._thread_pool = None
+            self._process_pool = None
+        for pool in pools:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def last_latency_ms(self):
+        """当前线程最近一次识别的耗时（毫秒）"""
+        return getattr(self._local, "last_latency_ms", 0.0)
+
+    @staticmethod
+    def resolve_backend(name):
+        """将配置的后端名称解析为实际使用的后端，tesserocr不可用或名称无效时按auto处理"""
+        if name in ("pipe", "pytesseract") or (name == "tesserocr" and TESSEROCR_AVAILABLE):
+            return name
+        return "tesserocr" if TESSEROCR_AVAILABLE else "pipe"
+
+    def set_backend(self, name):
+        """切换OCR后端，返回实际使用的后端"""
+        backend = self.resolve_backend(name)
+        self.backend_name = name
+        if backend != self.backend:
+            self.backend = backend
+            self.close()
+        return backend
+
+    def set_tesseract_cmd(self, tesseract_cmd):
+        """更新Tesseract路径，已创建的实例将被释放并按新路径重建"""
+        self.tesseract_cmd = tesseract_cmd
+        self.close()
+
+    def _get_tessdata_path(self):
+        """根据Tesseract可执行文件位置推断tessdata目录"""
+        if self.tesseract_cmd:
+            tessdata = os.path.join(os.path.dirname(self.tesseract_cmd), "tessdata")
+            if os.path.isdir(tessdata):
+                return tessdata
+        return None
+
+    @staticmethod
+    def parse_config(config):
+        """将pytesseract风格的配置字符串解析为(psm, oem, 变量字典)"""
+        psm = None
+        oem = None
+        variables = {}
+        tokens = config.split()
+        i = 0
+        while i < len(tokens):
+            token = tokens[i]
+            if token == "--psm" and i + 1 < len(tokens):
+                psm = int(tokens[i + 1])
+                i += 1
+            elif token == "--oem" and i + 1 < len(tokens):
+                oem = int(tokens[i + 1])
+                i += 1
+            elif token == "-c" and i + 1 < len(tokens) and "=" in tokens[i + 1]:
+                name, value = tokens[i + 1].split("=", 1)
+                variables[name] = value
+                i += 1
+            i += 1
+        return psm, oem, variables
+
+    def _create_api(self, lang, config):
+        """创建一个新的libtesseract实例"""
+        psm, oem, variables = self.parse_config(config)
+        kwargs = {"lang": lang}
+        tessdata = self._get_tessdata_path()
+        if tessdata:
+            kwargs["path"] = tessdata
+        if psm is not None:
+            kwargs["psm"] = psm
+        if oem is not None:
+            kwargs["oem"] = oem
+        api = tesserocr.PyTessBaseAPI(**kwargs)
+        for name, value in variables.items():
+            api.SetVariable(name, value)
+        return api
+
+    def _acquire_api(self, lang, config):
+        key = (lang, config)
+        with self._lock:
+            idle = self._idle_apis.setdefault(key, [])
+            if idle:
+                return idle.pop()
+        api = self._create_api(lang, config)
+        with self._lock:
+            self._all_apis.append(api)
+        return api
+
+    def _release_api(self, lang, config, api):
+        with self._lock:
+            if api in self._all_apis:
+                self._idle_apis.setdefault((lang, config), []).append(api)
+                return
+        # 实例在使用期间已被close()移出池，使用完毕后再释放
+        api.End()
+
+    def _discard_api(self, api):
+        """释放识别超时的实例，下次识别时重新创建"""
+        with self._lock:
+            if api in self._all_apis:
+                self._all_apis.remove(api)
+        try:
+            api.End()
+        except Exception:
+            pass
+
+    def _pytesseract_image_to_string(self, image, lang, config, timeout=None):
+        # pytesseract在首次识别时才导入，导入后再设置可执行文件路径
+        if self.tesseract_cmd:
+            pytesseract.pytesseract.tesseract_cmd = self.tesseract_cmd
+        try:
+            return pytesseract.image_to_string(image, lang=lang, config=config, timeout=timeout or 0)
+        except RuntimeError as e:
+            # pytesseract超时后已终止进程，抛出的是RuntimeError
+            if "timeout" in str(e).lower():
+                raise subprocess.TimeoutExpired("tesseract", timeout)
+            raise
+
+    def _tesserocr_image_to_string(self, api, image, lang, config, timeout=None):
+        try:
+            api.SetImage(image)
+            if timeout is not None and not api.Recognize(timeout=max(1, int(timeout * 1000))):
+                # 超时的实例可能处于中间状态，不再放回池中
+                self._discard_api(api)
+                api = None
+                raise subprocess.TimeoutExpired("libtesseract", timeout)
+            return api.GetUTF8Text()
+        finally:
+            if api is not None:
+                self._release_api(lang, config, api)
+
+    def _acquire_slot(self, deadline, cancel_event):
+        """等待空闲的识别名额，等待期间响应超时和取消"""
+        while not self._slots.acquire(timeout=0.05):
+            if cancel_event is not None and cancel_event.is_set():
+                raise OCRCancelled("识别已取消")
+            if deadline is not None and time.monotonic() >= deadline:
+                raise subprocess.TimeoutExpired("tesseract", 0)
+
+    def _local_image_to_string(self, image, lang, config, timeout, cancel_event):
+        """在当前线程中按后端识别"""
+        if self.backend == "tesserocr":
+            try:
+                api = self._acquire_api(lang, config)
+            except Exception as e:
+                # libtesseract初始化失败（如缺少语言包），回退到管道调用tesseract进程
+                self._log(f"tesserocr初始化失败，回退到管道调用: {str(e)}")
+                self.backend = "pipe"
+                api = None
+            if api is not None:
+                return self._tesserocr_image_to_string(api, image, lang, config, timeout)
+            return tesseract_pipe_image_to_string(self.tesseract_cmd, image, lang, config, timeout, cancel_event)
+        if self.backend == "pipe":
+            return tesseract_pipe_image_to_string(self.tesseract_cmd, image, lang, config, timeout, cancel_event)
+        return self._pytesseract_image_to_string(image, lang, config, timeout)
+
+    def _process_image_to_string(self, image, lang, config, timeout, cancel_event):
+        """提交到进程池识别并等待结果
+        时限从工作进程开始识别时计算，由工作进程终止超时的tesseract；
+        工作进程超过时限仍未返回时回收工作进程，避免卡住的识别一直占用进程池；
+        取消时排队中的识别直接撤销，正在进行的识别不再等待
+        """
+        while True:
+            pool = self._get_process_pool()
+            try:
+                future = pool.submit(_ocr_worker_image_to_string, image, lang, config, timeout)
+            except BrokenProcessPool:
+                if self._reset_process_pool(pool):
+                    raise
+                continue
+            deadline = None
+            while True:
+                try:
+                    return future.result(timeout=0.05)
+                except FuturesTimeoutError:
+                    pass
+                except BrokenProcessPool:
+                    # 工作进程异常退出，下次识别时重建进程池
+                    if self._reset_process_pool(pool):
+                        raise
+                    # 进程池已因回收其他超时的工作进程而重建，在新进程池中重新识别
+                    break
+                if cancel_event is not None and cancel_event.is_set():
+                    future.cancel()
+                    raise OCRCancelled("识别已取消")
+                if timeout and deadline is None and future.running():
+                    # 工作进程自身的时限到期后还需返回结果，多等待0.5秒
+                    deadline = time.monotonic() + timeout + 0.5
+                if deadline is not None and time.monotonic() >= deadline:
+                    self._recycle_process_pool(pool)
+                    raise subprocess.TimeoutExpired("tesseract", timeout)
+
+    def _reset_process_pool(self, pool, reason="OCR工作进程异常退出"):
+        """丢弃进程池，下次识别时重建；进程池已被重建时返回False"""
+        with self._lock:
+            if pool is not self._process_pool:
+                return False
+            self._process_pool = None
+        self._log(f"{reason}，重建进程池")
+        pool.shutdown(wait=False, cancel_futures=True)
+        return True
+
+    def _recycle_process_pool(self, pool):
+        """终止进程池的工作进程，与线程模式终止超时的tesseract相同
+        ProcessPoolExecutor无法单独替换一个工作进程，终止任一工作进程都会使整个进程池不可用，
+        因此整体重建，其他正在进行的识别在新进程池中重新提交
+        """
+        processes = list((getattr(pool, "_processes", None) or {}).values())
+        if not self._reset_process_pool(pool, "OCR工作进程识别超时"):
+            return
+        for process in processes:
+            try:
+                process.kill()
+            except Exception:
+                pass
+
+    def submit(self, image, lang='eng', config='', timeout=None, cancel_event=None):
+        """异步识别，返回结果为文字的Future，多个区域可同时提交后分别等待"""
+        with self._lock:
+            if self._thread_pool is None:
+                # 这里的线程只负责等待，实际的并发数由识别名额或进程池限制
+                self._thread_pool = ThreadPoolExecutor(max_workers=self.pool_size * 2, thread_name_prefix="ocr")
+            pool = self._thread_pool
+        return pool.submit(self.image_to_string, image, lang, config, timeout, cancel_event)
+
+    def image_to_string(self, image, lang='eng', config='', timeout=None, cancel_event=None):
+        """识别图像中的文字，接口与pytesseract.image_to_string一致
+
+        Args:
+            timeout: 识别时限（秒），线程模式包括等待空闲名额的时间，None表示不限制
+            cancel_event: 取消信号，设置后尽快终止识别，tesserocr后端只在识别开始前检查
+
+        Raises:
+            OCRTimeout: 超过时限，tesseract进程已终止或libtesseract实例已丢弃
+            OCRCancelled: cancel_event被设置
+        """
+        start = time.perf_counter()
+        deadline = time.monotonic() + timeout if timeout else None
+
+        def remaining():
+            return None if deadline is None else max(0.001, deadline - time.monotonic())
+
+        try:
+            if cancel_event is not None and cancel_event.is_set():
+                raise OCRCancelled("识别已取消")
+            if self.executor == "process":
+                text = self._process_image_to_string(image, lang, config, timeout, cancel_event)
+            else:
+                self._acquire_slot(deadline, cancel_event)
+                try:
+                    text = self._local_image_to_string(image, lang, config, remaining(), cancel_event)
+                finally:
+                    self._slots.release()
+        except (subprocess.TimeoutExpired, OCRTimeout):
+            with self._stats_lock:
+                self.timeout_count += 1
+            raise OCRTimeout(f"识别超过{timeout}秒")
+        except OCRCancelled:
+            with self._stats_lock:
+                self.cancel_count += 1
+            raise
+
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._local.last_latency_ms = elapsed_ms
+        with self._stats_lock:
+            self.call_count += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+        return text
+
+    def get_stats(self):
+        """获取调用统计"""
+        with self._stats_lock:
+            avg_ms = self.total_ms / self.call_count if self.call_count else 0.0
+            return {
+                "backend": self.backend,
+                "executor": self.executor,
+                "pool_size": self.pool_size,
+                "calls": self.call_count,
+                "avg_ms": avg_ms,
+                "max_ms": self.max_ms,
+                "timeouts": self.timeout_count,
+                "cancelled": self.cancel_count
+            }
+
+    def format_stats(self):
+        """格式化调用统计，用于日志输出"""
+        stats = self.get_stats()
+        return (f"后端={stats['backend']}, 执行方式={stats['executor']}, 调用{stats['calls']}次, "
+                f"平均{stats['avg_ms']:.1f}ms, 最大{stats['max_ms']:.1f}ms, "
+                f"超时{stats['timeouts']}次, 取消{stats['cancelled']}次")
+
+    def close(self):
+        """释放所有libtesseract实例，关闭线程池和进程池"""
+        self._shutdown_pools()
+        with self._lock:
+            # 正在使用的实例由_release_api在归还时释放
+            apis = [api for idle in self._idle_apis.values() for api in idle]
+            self._all_apis = []
+            self._idle_apis = {}
+        for api in apis:
+            try:
+                api.End()
+            except Exception:
+                pass
+
+
+# 进程池工作进程中的OCR引擎
+_worker_ocr_engine = None
+
+
+def _init_ocr_worker(tesseract_cmd, backend):
+    """进程池工作进程初始化
+    每个进程的Tesseract只使用一个OpenMP线程，多个进程同时识别时不会超额占用CPU；
+    需在创建libtesseract实例或启动tesseract进程前设置
+    """
+    global _worker_ocr_engine
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    _worker_ocr_engine = OCREngine(tesseract_cmd, pool_size=1, backend=backend)
+
+
+def _ocr_worker_image_to_string(image, lang, config, timeout):
+    """在工作进程中识别，超时时由工作进程终止tesseract"""
+    return _worker_ocr_engine.image_to_string(image, lang, config, timeout)
+
+
+class FrameChangeDetector:
+    """画面变化检测
+    将截图按块缩小为灰度缩略图，与上一次识别时的缩略图逐像素比较；
+    最大差值不超过容差时视为画面未变化，直接复用上一次的识别结果
+    """
+
+    def __init__(self, tolerance=12, reduce_factor=4):
+        self.tolerance = tolerance
+        self.reduce_factor = reduce_factor
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _thumbnail(self, image):
+        """生成灰度缩略图，块平均可以抑制少量噪点"""
+        thumb = image.convert('L')
+        factor = min(self.reduce_factor, thumb.width, thumb.height)
+        if factor > 1:
+            thumb = thumb.reduce(factor)
+        return thumb
+
+    def _max_diff(self, previous, current):
+        """计算两张缩略图的最大像素差"""
+        if NUMPY_AVAILABLE:
+            a = np.asarray(previous, dtype=np.int16)
+            b = np.asarray(current, dtype=np.int16)
+            return int(np.abs(a - b).max())
+        return ImageChops.difference(previous, current).getextrema()[1]
+
+    def lookup(self, key, image):
+        """检查画面是否变化
+
+        Returns:
+            (hit, result): 画面未变化时hit为True，result为上一次保存的识别结果
+        """
+        thumb = self._thumbnail(image)
+        with self._lock:
+            entry = self._entries.get(key)
+            if (entry and entry["has_result"] and entry["thumb"].size == thumb.size
+                    and self._max_diff(entry["thumb"], thumb) <= self.tolerance):
+                self.hits += 1
+                return True, entry["result"]
+            self.misses += 1
+            self._entries[key] = {"thumb": thumb, "result": None, "has_result": False}
+        return False, None
+
+    def store(self, key, result):
+        """保存当前画面对应的识别结果"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                entry["result"] = result
+                entry["has_result"] = True
+
+    def reset(self):
+        """清空所有缓存的画面"""
+        with self._lock:
+            self._entries.clear()
+
+    def format_stats(self):
+        """格式化命中统计，用于日志输出"""
+        with self._lock:
+            total = self.hits + self.misses
+            rate = self.hits / total * 100 if total else 0.0
+            return f"跳过识别{self.hits}次, 执行识别{self.misses}次, 命中率{rate:.1f}%"
+
+
+class OCRResultCache:
+    """OCR识别结果缓存
+    以灰度图像内容哈希、识别语言和配置字符串为键，按LRU淘汰，超过有效期的结果视为失效
+    """
+
+    def __init__(self, max_size=128, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(image, lang, config=''):
+        """根据图像内容生成缓存键"""
+        digest = hashlib.blake2b(image.tobytes(), digest_size=16).hexdigest()
+        return (digest, image.mode, image.size, lang, config)
+
+    def configure(self, max_size, ttl):
+        """更新缓存容量和有效期，容量为0时禁用缓存"""
+        with self._lock:
+            self.max_size = max(0, max_size)
+            self.ttl = max(0, ttl)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        """获取缓存的识别结果，未命中时返回None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                text, stored_at = entry
+                if self.ttl <= 0 or time.monotonic() - stored_at <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return text
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, text):
+        """保存识别结果"""
+        with self._lock:
+            if self.max_size <= 0:
+                return
+            self._entries[key] = (text, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def format_stats(self):
+        """格式化命中统计，用于界面显示"""
+        with self._lock:
+            total = self.hits + self.misses
+            rate = self.hits / total * 100 if total else 0.0
+            return (f"OCR缓存: {len(self._entries)}/{self.max_size}条, "
+                    f"命中{self.hits}次, 未命中{self.misses}次, 命中率{rate:.1f}%")
+
+
+def otsu_threshold(histogram):
+    """大津法根据256级灰度直方图计算二值化阈值，灰度不大于阈值的为一类；图像只有一种灰度时返回None"""
+    if NUMPY_AVAILABLE:
+        hist = np.asarray(histogram, dtype=np.float64)
+        weight0 = np.cumsum(hist)
+        weight1 = weight0[-1] - weight0
+        sums = np.cumsum(hist * np.arange(256))
+        mean0 = sums / np.maximum(weight0, 1)
+        mean1 = (sums[-1] - sums) / np.maximum(weight1, 1)
+        between = weight0 * weight1 * (mean0 - mean1) ** 2
+        threshold = int(np.argmax(between))
+        return threshold if between[threshold] > 0 else None
+
+    total = sum(histogram)
+    total_sum = sum(value * count for value, count in enumerate(histogram))
+    weight0 = 0
+    sum0 = 0
+    best_threshold = None
+    best_between = 0
+    for value, count in enumerate(histogram):
+        weight0 += count
+        sum0 += value * count
+        weight1 = total - weight0
+        if weight0 == 0 or weight1 == 0:
+            continue
+        between = weight0 * weight1 * (sum0 / weight0 - (total_sum - sum0) / weight1) ** 2
+        if between > best_between:
+            best_threshold, best_between = value, between
+    return best_threshold
+
+
+class ImagePreprocessor:
+    """OCR前的图像预处理
+    按区域配置执行：二值化（大津法或自适应阈值）、统一为白底黑字、裁剪到文字内容、
+    按整数倍缩放到目标文字高度，再加上白边交给Tesseract，省去Tesseract自身较慢的二值化；
+    每个区域的缩放倍数按区域尺寸缓存，保证同一区域的输出尺寸稳定
+    """
+
+    DEFAULTS = {'enabled': False, 'threshold': 'otsu', 'target_height': 32, 'invert': 'auto'}
+    THRESHOLD_METHODS = ("otsu", "adaptive")
+    BORDER = 8
+    ADAPTIVE_WINDOW = 25
+    ADAPTIVE_OFFSET = 10
+    # 文字高度低于该值时多半只截到了部分内容，不缓存缩放倍数
+    MIN_PLAN_HEIGHT = 6
+
+    def __init__(self):
+        self._plans = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def normalize_options(cls, options):
+        """补全并校验预处理配置"""
+        merged = dict(cls.DEFAULTS)
+        if isinstance(options, dict):
+            merged.update((key, options[key]) for key in cls.DEFAULTS if key in options)
+        merged['enabled'] = bool(merged['enabled'])
+        if merged['threshold'] not in cls.THRESHOLD_METHODS:
+            merged['threshold'] = cls.DEFAULTS['threshold']
+        try:
+            merged['target_height'] = max(8, int(merged['target_height']))
+        except (TypeError, ValueError):
+            merged['target_height'] = cls.DEFAULTS['target_height']
+        if merged['invert'] not in ("auto", True, False):
+            merged['invert'] = cls.DEFAULTS['invert']
+        return merged
+
+    @staticmethod
+    def signature(options):
+        """预处理配置的字符串表示，作为OCR缓存键的一部分，未启用时为空"""
+        if not options['enabled']:
+            return ""
+        return f"pre:{options['threshold']}:{options['target_height']}:{options['invert']}"
+
+    def _scale_factors(self, key, size, content_height, target_height):
+        """计算整数缩放倍数(放大, 缩小)，同一区域尺寸不变时复用"""
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan and plan[0] == (size, target_height):
+                return plan[1]
+        ratio = target_height / content_height
+        if ratio >= 1.5:
+            factors = (int(round(ratio)), 1)
+        elif ratio <= 0.5:
+            factors = (1, int(round(1 / ratio)))
+        else:
+            factors = (1, 1)
+        if content_height >= self.MIN_PLAN_HEIGHT:
+            with self._lock:
+                self._plans[key] = ((size, target_height), factors)
+        return factors
+
+    def reset(self, key=None):
+        """清除缓存的缩放倍数，区域重新选择后调用"""
+        with self._lock:
+            if key is None:
+                self._plans.clear()
+            else:
+                self._plans.pop(key, None)
+
+    def blank(self):
+        """没有文字内容时返回空白图像"""
+        return Image.new('L', (self.BORDER * 2, self.BORDER * 2), 255)
+
+    def process(self, key, image, options):
+        """预处理区域截图
+
+        Args:
+            key: 区域标识，用于缓存缩放倍数
+            image: 区域截图
+            options: normalize_options返回的预处理配置
+
+        Returns:
+            白底黑字的二值图像（'L'模式，只有0和255）
+        """
+        gray = image.convert('L')
+        if NUMPY_AVAILABLE:
+            return self._process_numpy(key, gray, options)
+        return self._process_pil(key, gray, options)
+
+    def _adaptive_ink(self, pixels):
+        """自适应阈值：比邻域平均值暗ADAPTIVE_OFFSET以上的像素为文字，用积分图计算邻域平均值"""
+        window = self.ADAPTIVE_WINDOW
+        radius = window // 2
+        padded = np.pad(pixels.astype(np.int32), radius, mode='edge')
+        integral = np.pad(padded.cumsum(axis=0).cumsum(axis=1), ((1, 0), (1, 0)))
+        sums = (integral[window:, window:] - integral[:-window, window:]
+                - integral[window:, :-window] + integral[:-window, :-window])
+        return pixels.astype(np.int32) * window * window < sums - self.ADAPTIVE_OFFSET * window * window
+
+    def _process_numpy(self, key, gray, options):
+        pixels = np.asarray(gray, dtype=np.uint8)
+        if pixels.size == 0:
+            return self.blank()
+        threshold = otsu_threshold(np.bincount(pixels.ravel(), minlength=256))
+        if threshold is None:
+            return self.blank()
+
+        # 统一为深色文字：深色像素占多数时为深色背景浅色文字
+        ink = pixels <= threshold
+        invert = options['invert']
+        if invert == "auto":
+            invert = np.count_nonzero(ink) * 2 > ink.size
+        if invert:
+            pixels = 255 - pixels
+            ink = ~ink
+        if options['threshold'] == "adaptive":
+            ink = self._adaptive_ink(pixels)
+
+        # 裁剪到文字内容
+        rows = np.flatnonzero(ink.any(axis=1))
+        if not rows.size:
+            return self.blank()
+        cols = np.flatnonzero(ink.any(axis=0))
+        ink = ink[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+
+        # 按整数倍缩放到目标文字高度
+        up, down = self._scale_factors(key, gray.size, ink.shape[0], options['target_height'])
+        if up > 1:
+            ink = ink.repeat(up, axis=0).repeat(up, axis=1)
+        elif down > 1:
+            height, width = ink.shape
+            padded = np.zeros((-(-height // down) * down, -(-width // down) * down), dtype=bool)
+            padded[:height, :width] = ink
+            ink = padded.reshape(padded.shape[0] // down, down, padded.shape[1] // down, down).any(axis=(1, 3))
+
+        border = self.BORDER
+        output = np.full((ink.shape[0] + border * 2, ink.shape[1] + border * 2), 255, dtype=np.uint8)
+        output[border:-border, border:-border][ink] = 0
+        return Image.fromarray(output, 'L')
+
+    def _process_pil(self, key, gray, options):
+        """未安装numpy时的PIL实现，处理步骤与numpy实现相同"""
+        histogram = gray.histogram()
+        threshold = otsu_threshold(histogram)
+        if threshold is None:
+            return self.blank()
+
+        invert = options['invert']
+        if invert == "auto":
+            invert = sum(histogram[:threshold + 1]) * 2 > gray.width * gray.height
+        if invert:
+            gray = ImageOps.invert(gray)
+            threshold = 254 - threshold
+
+        # 文字像素为255，便于getbbox裁剪
+        if options['threshold'] == "adaptive":
+            radius = self.ADAPTIVE_WINDOW // 2
+            local_mean = ImageOps.expand(gray, radius).filter(ImageFilter.BoxBlur(radius)).crop(
+                (radius, radius, radius + gray.width, radius + gray.height))
+            offset = self.ADAPTIVE_OFFSET
+            ink = ImageChops.subtract(local_mean, gray).point(lambda v: 255 if v > offset else 0)
+        else:
+            ink = gray.point(lambda v: 255 if v <= threshold else 0)
+
+        bbox = ink.getbbox()
+        if bbox is None:
+            return self.blank()
+        ink = ink.crop(bbox)
+
+        up, down = self._scale_factors(key, gray.size, ink.height, options['target_height'])
+        if up > 1:
+            ink = ink.resize((ink.width * up, ink.height * up), Image.NEAREST)
+        elif down > 1:
+            ink = ink.reduce(down).point(lambda v: 255 if v else 0)
+
+        return ImageOps.expand(ImageOps.invert(ink), self.BORDER, fill=255)
+
+
+class DigitTemplateRecognizer:
+    """数字模板识别
+    数字区域使用固定字体：二值化后按列投影切分字符，按高度缩放到固定大小，
+    与已学习的数字和'/'模板计算归一化相关系数；模板从Tesseract确认过的识别结果自动学习，
+    置信度不足时返回None，由调用方回退到Tesseract
+    """
+
+    CHARSET = "0123456789/"
+    GLYPH_HEIGHT = 16
+    GLYPH_WIDTH = 12
+    MAX_GLYPHS = 16
+    # 字符宽高比超过该值时视为多个字符粘连
+    MAX_ASPECT = 0.9
+
+    def __init__(self, min_confidence=0.9, max_samples=8):
+        self.min_confidence = min_confidence
+        self.max_samples = max_samples
+        self._samples = {}
+        self._matrix = None
+        self._labels = []
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fallbacks = 0
+
+    @staticmethod
+    def _crop_rows(glyph):
+        """裁掉字符上下的空白"""
+        rows = glyph.any(axis=1)
+        top = int(rows.argmax())
+        bottom = len(rows) - int(rows[::-1].argmax())
+        return glyph[top:bottom]
+
+    def _split_touching(self, glyph):
+        """字符粘连时在中间部分像素最少的列处切开，递归处理多个字符粘连"""
+        height, width = glyph.shape
+        if width < 4 or width <= height * self.MAX_ASPECT:
+            return [glyph]
+        counts = np.count_nonzero(glyph, axis=0)
+        low, high = width // 4, width - width // 4
+        cut = low + int(np.argmin(counts[low:high]))
+        parts = []
+        for part in (glyph[:, :cut], glyph[:, cut:]):
+            if part.any():
+                parts.extend(self._split_touching(self._crop_rows(part)))
+        return parts
+
+    def _resize(self, glyph):
+        """按高度缩放，水平居中放入固定大小的画布"""
+        height, width = glyph.shape
+        out_width = min(self.GLYPH_WIDTH, max(1, (width * self.GLYPH_HEIGHT + height // 2) // height))
+        row_index = np.arange(self.GLYPH_HEIGHT) * height // self.GLYPH_HEIGHT
+        col_index = np.arange(out_width) * width // out_width
+        canvas = np.zeros((self.GLYPH_HEIGHT, self.GLYPH_WIDTH), dtype=bool)
+        offset = (self.GLYPH_WIDTH - out_width) // 2
+        canvas[:, offset:offset + out_width] = glyph[row_index][:, col_index]
+        return canvas
+
+    def segment(self, image):
+        """二值化后按列投影切分字符
+
+        Returns:
+            每行一个字符特征向量（零均值、单位长度）的矩阵，没有字符或字符过多（多半不是数字）时返回None
+        """
+        pixels = np.asarray(image.convert('L'), dtype=np.uint8)
+        if pixels.size == 0:
+            return None
+        threshold = otsu_threshold(np.bincount(pixels.ravel(), minlength=256))
+        if threshold is None:
+            return None
+        ink = pixels <= threshold
+        # 字符像素占少数，深色背景浅色文字时取反
+        if np.count_nonzero(ink) * 2 > ink.size:
+            ink = ~ink
+
+        # 按列投影，连续有字符像素的列为一个字符，少于3个像素的视为噪点
+        columns = np.concatenate(([False], ink.any(axis=0), [False]))
+        edges = np.flatnonzero(columns[1:] != columns[:-1]).tolist()
+        glyphs = []
+        for start, end in zip(edges[0::2], edges[1::2]):
+            glyph = ink[:, start:end]
+            if np.count_nonzero(glyph) >= 3:
+                glyphs.extend(self._split_touching(self._crop_rows(glyph)))
+        if not glyphs or len(glyphs) > self.MAX_GLYPHS:
+            return None
+
+        vectors = np.stack([self._resize(glyph) for glyph in glyphs]).reshape(len(glyphs), -1).astype(np.float32)
+        vectors -= vectors.mean(axis=1, keepdims=True)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-6)
+
+    def classify(self, image):
+        """与模板逐一比较
+
+        Returns:
+            (text, confidence): confidence为各字符最佳相关系数中的最小值，无法识别时text为None
+        """
+        with self._lock:
+            matrix, labels = self._matrix, self._labels
+        if matrix is None:
+            return None, 0.0
+        glyphs = self.segment(image)
+        if glyphs is None:
+            return None, 0.0
+        scores = glyphs @ matrix.T
+        best = scores.argmax(axis=1)
+        confidence = float(scores[np.arange(len(best)), best].min())
+        return ''.join(labels[i] for i in best), confidence
+
+    def recognize(self, image):
+        """识别数字，置信度不足时返回None"""
+        text, confidence = self.classify(image)
+        with self._lock:
+            if text is not None and confidence >= self.min_confidence:
+                self.hits += 1
+                return text
+            self.fallbacks += 1
+        return None
+
+    def learn(self, image, text):
+        """用Tesseract确认过的识别结果学习模板，切分出的字符数与文字长度不一致时不学习
+
+        Returns:
+            bool: 是否学习了新的模板
+        """
+        text = text.replace(' ', '')
+        if not text or any(char not in self.CHARSET for char in text):
+            return False
+        glyphs = self.segment(image)
+        if glyphs is None or len(glyphs) != len(text):
+            return False
+
+        learned = False
+        with self._lock:
+            for char, vector in zip(text, glyphs):
+                samples = self._samples.setdefault(char, [])
+                # 与已有样本几乎相同时不重复保存
+                if samples and max(float(sample @ vector) for sample in samples) > 0.98:
+                    continue
+                samples.append(vector)
+                if len(samples) > self.max_samples:
+                    samples.pop(0)
+                learned = True
+            if learned:
+                self._labels = [char for char, samples in self._samples.items() for _ in samples]
+                self._matrix = np.stack([vector for samples in self._samples.values() for vector in samples])
+        return learned
+
+    def learned_chars(self):
+        """已学习模板的字符"""
+        with self._lock:
+            return ''.join(char for char in self.CHARSET if char in self._samples)
+
+    def reset(self):
+        """清空已学习的模板"""
+        with self._lock:
+            self._samples.clear()
+            self._matrix = None
+            self._labels = []
+
+    def format_stats(self):
+        """格式化命中统计，用于界面显示"""
+        with self._lock:
+            return f"命中{self.hits}次, 回退Tesseract{self.fallbacks}次"
+
+
+KeywordMatch = namedtuple("KeywordMatch", ["keyword", "start", "end", "text", "distance"])
+
+
+class KeywordMatcher:
+    """多关键词匹配
+    所有关键词编译为一个Aho-Corasick自动机，只扫描一遍文字，耗时与关键词数量无关；
+    模糊匹配时先按OCR常见混淆字符规范化，再把关键词编辑距离为1的变体一并编入自动机，
+    编辑距离为1的匹配必须是完整的单词，避免"floor"中的"oor"之类的子串误触发
+    """
+
+    # OCR常见混淆，左侧字符串规范为右侧字符，两字符的混淆优先
+    CONFUSIONS = {
+        "rn": "m", "vv": "w",
+        "0": "o", "1": "l", "|": "l", "!": "l", "5": "s", "$": "s", "@": "a",
+    }
+    # 模糊匹配时替换和插入的候选字符
+    FUZZY_ALPHABET = "abcdefghijklmnopqrstuvwxyz"
+    # 短关键词的编辑距离变体多是常见单词（door -> poor、doom），只做混淆规范化
+    FUZZY_MIN_LENGTH = 5
+
+    def __init__(self, keywords, fuzzy=False):
+        self.keywords = [keyword for keyword in dict.fromkeys(str(k).strip().lower() for k in keywords) if keyword]
+        self.fuzzy = fuzzy
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        # 最长模式串的长度，用于判断后面是否还可能出现位置更靠前的匹配
+        self._max_length = 0
+        for index, keyword in enumerate(self.keywords):
+            if fuzzy:
+                variants = self._fuzzy_variants(self.normalize(keyword)[0])
+            else:
+                variants = {keyword: 0}
+            for variant, distance in variants.items():
+                self._add(variant, (index, distance, len(variant)))
+                self._max_length = max(self._max_length, len(variant))
+        self._build()
+
+    @classmethod
+    def normalize(cls, text):
+        """按混淆表规范化文字
+
+        Returns:
+            (规范化后的文字, 每个字符在原文字中的起始位置)
+        """
+        chars = []
+        positions = []
+        i = 0
+        length = len(text)
+        while i < length:
+            pair = text[i:i + 2]
+            if len(pair) == 2 and pair in cls.CONFUSIONS:
+                chars.append(cls.CONFUSIONS[pair])
+                positions.append(i)
+                i += 2
+                continue
+            char = text[i]
+            chars.append(cls.CONFUSIONS.get(char, char))
+            positions.append(i)
+            i += 1
+        return ''.join(chars), positions
+
+    @classmethod
+    def _fuzzy_variants(cls, keyword):
+        """生成编辑距离不超过1的变体，{变体: 编辑距离}"""
+        variants = {keyword: 0}
+        if len(keyword) < cls.FUZZY_MIN_LENGTH:
+            return variants
+        for i in range(len(keyword) + 1):
+            for char in cls.FUZZY_ALPHABET:
+                variants.setdefault(keyword[:i] + char + keyword[i:], 1)
+            if i < len(keyword):
+                variants.setdefault(keyword[:i] + keyword[i + 1:], 1)
+                for char in cls.FUZZY_ALPHABET:
+                    variants.setdefault(keyword[:i] + char + keyword[i + 1:], 1)
+        return variants
+
+    def _add(self, pattern, output):
+        """将模式串加入字典树"""
+        node = 0
+        for char in pattern:
+            next_node = self._goto[node].get(char)
+            if next_node is None:
+                next_node = len(self._goto)
+                self._goto[node][char] = next_node
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            node = next_node
+        self._output[node].append(output)
+
+    def _build(self):
+        """按层序计算失败指针，并把失败指针上的输出合并到当前节点"""
+        pending = deque(self._goto[0].values())
+        while pending:
+            node = pending.popleft()
+            for char, child in self._goto[node].items():
+                pending.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+
+    @staticmethod
+    def _is_whole_word(text, positions, start, end):
+        """扫描文字中[start, end)对应的原文字前后是否都不是英文字母或数字"""
+        if positions is not None:
+            end = positions[end] if end < len(positions) else len(text)
+            start = positions[start]
+        before = text[start - 1] if start > 0 else ""
+        after = text[end] if end < len(text) else ""
+        return not any(c.isascii() and c.isalnum() for c in (before, after))
+
+    def search(self, text):
+        """查找匹配的关键词，编辑距离小的优先，其次是位置靠前、匹配较长的
+
+        Returns:
+            KeywordMatch或None，start/end为原文字中的位置
+        """
+        if not self.keywords:
+            return None
+        lower_text = text.lower()
+        if self.fuzzy:
+            scan_text, positions = self.normalize(lower_text)
+        else:
+            scan_text, positions = lower_text, None
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        best = None
+        node = 0
+        for i, char in enumerate(scan_text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for index, distance, length in output[node]:
+                start = i - length + 1
+                if distance and not self._is_whole_word(text, positions, start, i + 1):
+                    continue
+                if best is None or (distance, start, -length) < (best[1], best[2], best[2] - best[3]):
+                    best = (index, distance, start, i + 1)
+            # 已有精确匹配，且之后结束的模式串都不可能从它的起点或更靠前的位置开始
+            if best is not None and best[1] == 0 and i - best[2] >= self._max_length:
+                break
+
+        if best is None:
+            return None
+        index, distance, start, end = best
+        if positions is not None:
+            end = positions[end] if end < len(positions) else len(text)
+            start = positions[start]
+        return KeywordMatch(self.keywords[index], start, end, text[start:end], distance)
+
+
+def normalize_region(region):
+    """将区域坐标规范为(left, top, right, bottom)格式"""
+    x1, y1, x2, y2 = region
+    return (min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2))
+
+
+class CaptureBackend:
+    """截图后端基类
+    grab_raw返回原始像素缓冲，grab返回PIL图像，bbox均为(left, top, right, bottom)
+    """
+
+    name = "base"
+
+    def grab_raw(self, bbox):
+        """截取区域并返回(像素缓冲, (宽, 高), 像素格式)"""
+        image = self.grab(bbox)
+        return image.tobytes(), image.size, image.mode
+
+    def grab(self, bbox):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class ImageGrabBackend(CaptureBackend):
+    """PIL ImageGrab截图后端，兼容性最好"""
+
+    name = "imagegrab"
+
+    def grab(self, bbox):
+        # 设置all_screens=True捕获所有屏幕
+        return ImageGrab.grab(bbox=bbox, all_screens=True)
+
+
+class MSSBackend(CaptureBackend):
+    """mss截图后端，直接调用各平台的原生截图接口，返回BGRA原始缓冲"""
+
+    name = "mss"
+
+    def __init__(self):
+        if not MSS_AVAILABLE:
+            raise RuntimeError("mss库未安装")
+        # mss实例不能跨线程使用，每个线程单独创建
+        self._local = threading.local()
+        self._instances = []
+        self._lock = threading.Lock()
+
+    def _get_sct(self):
+        sct = getattr(self._local, "sct", None)
+        if sct is None:
+            sct = mss.mss()
+            self._local.sct = sct
+            with self._lock:
+                self._instances.append(sct)
+        return sct
+
+    def grab_raw(self, bbox):
+        left, top, right, bottom = bbox
+        shot = self._get_sct().grab({"left": left, "top": top, "width": right - left, "height": bottom - top})
+        return shot.raw, shot.size, "BGRA"
+
+    def grab(self, bbox):
+        raw, size, _ = self.grab_raw(bbox)
+        return Image.frombuffer("RGB", size, raw, "raw", "BGRX", 0, 1)
+
+    def close(self):
+        with self._lock:
+            instances = self._instances
+            self._instances = []
+        for sct in instances:
+            try:
+                sct.close()
+            except Exception:
+                pass
+
+
+class FileReplayBackend(CaptureBackend):
+    """文件回放截图后端，用于测试
+    按顺序循环回放图像文件（或图像对象），图像坐标视为从屏幕原点开始
+    """
+
+    name = "replay"
+
+    IMAGE_EXTENSIONS = ('.png', '.bmp', '.jpg', '.jpeg', '.pgm', '.ppm')
+
+    def __init__(self, source):
+        if isinstance(source, str):
+            if os.path.isdir(source):
+                source = [os.path.join(source, f) for f in sorted(os.listdir(source))
+                          if f.lower().endswith(self.IMAGE_EXTENSIONS)]
+            else:
+                source = [source]
+        self.frames = [Image.open(item).convert("RGB") if isinstance(item, str) else item for item in source]
+        if not self.frames:
+            raise ValueError("回放截图后端没有可用的图像")
+        self._index = 0
+        self._lock = threading.Lock()
+
+    def grab(self, bbox):
+        with self._lock:
+            frame = self.frames[self._index]
+            self._index = (self._index + 1) % len(self.frames)
+        return frame.crop(bbox)
+
+
+CAPTURE_BACKENDS = ["auto", "mss", "imagegrab"]
+
+
+def create_capture_backend(name="auto"):
+    """根据名称创建截图后端
+    auto优先使用mss，"replay:路径"创建文件回放后端
+    """
+    if name.startswith("replay:"):
+        return FileReplayBackend(name[len("replay:"):])
+    if name in ("auto", "mss") and MSS_AVAILABLE:
+        return MSSBackend()
+    return ImageGrabBackend()
+
+
+def benchmark_capture_backends(bbox=(0, 0, 400, 200), rounds=20, backends=None):
+    """测量各截图后端的截图耗时
+
+    Returns:
+        {后端名称: {"avg_ms", "min_ms", "fps"}或{"error"}}
+    """
+    if backends is None:
+        backends = [ImageGrabBackend()]
+        if MSS_AVAILABLE:
+            backends.insert(0, MSSBackend())
+    results = {}
+    for backend in backends:
+        try:
+            # 预热一次，排除首次初始化的开销
+            backend.grab(bbox)
+            timings = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                backend.grab(bbox)
+                timings.append((time.perf_counter() - start) * 1000)
+            avg_ms = sum(timings) / len(timings)
+            results[backend.name] = {
+                "avg_ms": avg_ms,
+                "min_ms": min(timings),
+                "fps": 1000 / avg_ms if avg_ms > 0 else 0.0
+            }
+        except Exception as e:
+            results[backend.name] = {"error": str(e)}
+    return results
+
+
+class InputBackend:
+    """输入注入后端基类
+    click、key_down、key_up分别注入一次鼠标点击、按键按下和按键弹起，按键名称与pyautogui相同
+    """
+
+    name = "base"
+
+    def click(self, x, y):
+        raise NotImplementedError
+
+    def key_down(self, key):
+        raise NotImplementedError
+
+    def key_up(self, key):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PyAutoGUIBackend(InputBackend):
+    """pyautogui输入后端，兼容性最好"""
+
+    name = "pyautogui"
+
+    def click(self, x, y):
+        pyautogui.click(x, y)
+
+    def key_down(self, key):
+        pyautogui.keyDown(key)
+
+    def key_up(self, key):
+        pyautogui.keyUp(key)
+
+
+class XTestBackend(InputBackend):
+    """X11 XTest输入后端，直接向X服务器发送输入事件，只在Linux的X11会话中可用"""
+
+    name = "xtest"
+
+    # pyautogui按键名称 -> X keysym名称，其余按键名称直接作为keysym名称查找
+    KEYSYM_NAMES = {
+        "enter": "Return", "return": "Return", "esc": "Escape", "escape": "Escape", "tab": "Tab",
+        "backspace": "BackSpace", "delete": "Delete", "del": "Delete", "insert": "Insert",
+        "home": "Home", "end": "End", "pageup": "Prior", "pgup": "Prior", "pagedown": "Next", "pgdn": "Next",
+        "up": "Up", "down": "Down", "left": "Left", "right": "Right",
+        "shift": "Shift_L", "shiftleft": "Shift_L", "shiftright": "Shift_R",
+        "ctrl": "Control_L", "ctrlleft": "Control_L", "ctrlright": "Control_R",
+        "alt": "Alt_L", "altleft": "Alt_L", "altright": "Alt_R",
+        "win": "Super_L", "winleft": "Super_L", "winright": "Super_R",
+        "capslock": "Caps_Lock", "numlock": "Num_Lock", "scrolllock": "Scroll_Lock",
+        "pause": "Pause", "printscreen": "Print",
+    }
+
+    def __init__(self, display_name=None):
+        if not XLIB_AVAILABLE:
+            raise RuntimeError("python-xlib库未安装")
+        from Xlib import X, XK, display
+        from Xlib.ext import xtest
+        self._X = X
+        self._XK = XK
+        self._xtest = xtest
+        self._display = display.Display(display_name)
+        if not self._display.has_extension("XTEST"):
+            self._display.close()
+            raise RuntimeError("X服务器不支持XTest扩展")
+        self._keycodes = {}
+        # Xlib的连接不能同时在多个线程中使用
+        self._lock = threading.Lock()
+
+    def _keycode(self, key):
+        """按键名称转换为keycode，结果缓存"""
+        keycode = self._keycodes.get(key)
+        if keycode is None:
+            name = key.lower()
+            if len(name) > 1 and name[0] == "f" and name[1:].isdigit():
+                name = name.upper()
+            keysym = self._XK.string_to_keysym(self.KEYSYM_NAMES.get(name, name))
+            if not keysym and len(key) == 1:
+                # Latin-1字符的keysym与字符编码相同，如"="
+                keysym = ord(key)
+            keycode = self._display.keysym_to_keycode(keysym) if keysym else 0
+            if not keycode:
+                raise ValueError(f"不支持的按键: {key}")
+            self._keycodes[key] = keycode
+        return keycode
+
+    def click(self, x, y):
+        X = self._X
+        with self._lock:
+            self._xtest.fake_input(self._display, X.MotionNotify, x=x, y=y)
+            self._xtest.fake_input(self._display, X.ButtonPress, 1)
+            self._xtest.fake_input(self._display, X.ButtonRelease, 1)
+            self._display.flush()
+
+    def key_down(self, key):
+        with self._lock:
+            self._xtest.fake_input(self._display, self._X.KeyPress, self._keycode(key))
+            self._display.flush()
+
+    def key_up(self, key):
+        with self._lock:
+            self._xtest.fake_input(self._display, self._X.KeyRelease, self._keycode(key))
+            self._display.flush()
+
+    def close(self):
+        with self._lock:
+            try:
+                self._display.close()
+            except Exception:
+                pass
+
+
+class RecordingBackend(InputBackend):
+    """只记录不注入的输入后端，用于测试和无界面试运行
+    actions为(time.perf_counter, 动作, 参数)列表，动作为click、down或up
+    """
+
+    name = "record"
+
+    def __init__(self):
+        self.actions = []
+        self._lock = threading.Lock()
+
+    def _record(self, action, value):
+        with self._lock:
+            self.actions.append((time.perf_counter(), action, value))
+
+    def click(self, x, y):
+        self._record("click", (x, y))
+
+    def key_down(self, key):
+        self._record("down", key)
+
+    def key_up(self, key):
+        self._record("up", key)
+
+    def times(self, action, value):
+        """指定动作和参数的所有记录时间"""
+        with self._lock:
+            return [t for t, a, v in self.actions if a == action and v == value]
+
+    def clear(self):
+        with self._lock:
+            self.actions.clear()
+
+
+INPUT_BACKENDS = ["auto", "xtest", "pyautogui"]
+
+
+def create_input_backend(name="auto"):
+    """根据名称创建输入后端
+    auto在Linux的X11会话中优先使用XTest，"record"创建只记录不注入的后端
+    """
+    if name == "record":
+        return RecordingBackend()
+    if (name in ("auto", "xtest") and XLIB_AVAILABLE and platform.system() == "Linux"
+            and os.environ.get("DISPLAY")):
+        try:
+            return XTestBackend()
+        except Exception:
+            if name == "xtest":
+                raise
+    return PyAutoGUIBackend()
+
+
+class CaptureScheduler:
+    """统一截图调度
+    同一识别周期内只截取一次所有活动区域的外接矩形，各模块从这一帧中裁剪自己的区域，
+    截图次数与区域数量无关；同一个使用方不会两次拿到同一帧，再次请求时重新截图
+    """
+
+    def __init__(self, grab_func, max_age=0.05, max_union_ratio=8):
+        # grab_func接收bbox并返回PIL图像
+        self.grab_func = grab_func
+        # 帧在不同使用方之间的最长复用时间（秒），应小于最短识别间隔
+        self.max_age = max_age
+        # 外接矩形面积超过各区域面积之和的倍数时，改为单独截取请求的区域
+        self.max_union_ratio = max_union_ratio
+        self._regions = {}
+        self._frame = None
+        self._frame_bbox = None
+        self._frame_time = 0.0
+        self._frame_seq = 0
+        # 使用方 -> 最近拿到的帧序号
+        self._seen = {}
+        self._lock = threading.Lock()
+        self.grab_count = 0
+        self.request_count = 0
+
+    def register(self, key, region):
+        """登记一个活动区域，下次截图时纳入外接矩形"""
+        with self._lock:
+            self._regions[key] = normalize_region(region)
+
+    def unregister(self, key):
+        """移除活动区域"""
+        with self._lock:
+            self._regions.pop(key, None)
+            self._seen.pop(key, None)
+
+    @staticmethod
+    def _contains(outer, inner):
+        return (outer[0] <= inner[0] and outer[1] <= inner[1]
+                and outer[2] >= inner[2] and outer[3] >= inner[3])
+
+    @staticmethod
+    def _area(bbox):
+        return max(0, bbox[2] - bbox[0]) * max(0, bbox[3] - bbox[1])
+
+    def _union_bbox(self, bbox):
+        """计算请求区域与所有活动区域的外接矩形"""
+        boxes = list(self._regions.values())
+        if bbox not in boxes:
+            boxes.append(bbox)
+        union = (min(b[0] for b in boxes), min(b[1] for b in boxes),
+                 max(b[2] for b in boxes), max(b[3] for b in boxes))
+        if self._area(union) > self.max_union_ratio * sum(self._area(b) for b in boxes):
+            # 区域相距太远（如分布在不同显示器），截取外接矩形反而更慢
+            return bbox
+        return union
+
+    def grab(self, region, key=None):
+        """获取指定区域的截图，优先从当前帧裁剪
+
+        Args:
+            key: 使用方，通常为登记区域时的key；该使用方已拿到过当前帧时重新截图，
+                轮询间隔再短也不会重复识别旧画面
+        """
+        bbox = normalize_region(region)
+        with self._lock:
+            self.request_count += 1
+            now = time.monotonic()
+            if (self._frame is None or now - self._frame_time > self.max_age
+                    or not self._contains(self._frame_bbox, bbox)
+                    or (key is not None and self._seen.get(key) == self._frame_seq)):
+                union = self._union_bbox(bbox)
+                self._frame = self.grab_func(union)
+                self._frame_bbox = union
+                self._frame_time = time.monotonic()
+                self._frame_seq += 1
+                self.grab_count += 1
+            if key is not None:
+                self._seen[key] = self._frame_seq
+            frame = self._frame
+            frame_bbox = self._frame_bbox
+        if frame_bbox == bbox:
+            return frame
+        return frame.crop((bbox[0] - frame_bbox[0], bbox[1] - frame_bbox[1],
+                           bbox[2] - frame_bbox[0], bbox[3] - frame_bbox[1]))
+
+    def format_stats(self):
+        """格式化截图统计，用于日志输出"""
+        with self._lock:
+            return f"截图请求{self.request_count}次, 实际截图{self.grab_count}次"
+
+
+class TimerScheduler:
+    """单线程定时调度器
+    所有定时任务的下一次触发时间保存在基于单调时钟的最小堆中，由一个线程统一驱动；
+    下一次触发时间按上一次的计划时间累加，不会因回调耗时而漂移，支持小于1秒的间隔
+    """
+
+    def __init__(self, log_callback=None):
+        self.log_callback = log_callback
+        self._heap = []
+        self._jobs = {}
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        """启动调度线程"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1):
+        """停止调度线程"""
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+
+    def schedule(self, job_id, interval, callback, delay=0.0):
+        """添加或替换一个周期任务
+
+        Args:
+            job_id: 任务标识，如("timed", 0)
+            interval: 触发间隔（秒），可以是小数
+            callback: 回调函数，在调度线程中执行，不应阻塞
+            delay: 首次触发前的延迟（秒）
+        """
+        interval = max(0.01, float(interval))
+        with self._cond:
+            seq = next(self._seq)
+            deadline = time.monotonic() + max(0.0, delay)
+            self._jobs[job_id] = {"interval": interval, "callback": callback, "seq": seq}
+            heapq.heappush(self._heap, (deadline, seq, job_id))
+            self._cond.notify()
+
+    def postpone(self, job_id, delay):
+        """将任务的下一次触发调整到delay秒之后，也可早于原计划，用于出错后暂停和自适应间隔"""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job["seq"] = next(self._seq)
+            heapq.heappush(self._heap, (time.monotonic() + delay, job["seq"], job_id))
+            self._cond.notify()
+
+    def cancel(self, job_id):
+        """取消任务，堆中残留的条目在出堆时丢弃"""
+        with self._cond:
+            return self._jobs.pop(job_id, None) is not None
+
+    def has_job(self, job_id):
+        with self._cond:
+            return job_id in self._jobs
+
+    def job_count(self):
+        with self._cond:
+            return len(self._jobs)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    now = time.monotonic()
+                    if self._heap and self._heap[0][0] <= now:
+                        break
+                    self._cond.wait(self._heap[0][0] - now if self._heap else None)
+                if not self._running:
+                    return
+
+                deadline, seq, job_id = heapq.heappop(self._heap)
+                job = self._jobs.get(job_id)
+                if job is None or job["seq"] != seq:
+                    # 已取消或已重新调度的过期条目
+                    continue
+
+                # 按计划时间累加得到下一次触发时间，错过的周期直接跳过
+                interval = job["interval"]
+                next_deadline = deadline + interval
+                now = time.monotonic()
+                if next_deadline <= now:
+                    next_deadline += ((now - next_deadline) // interval + 1) * interval
+                heapq.heappush(self._heap, (next_deadline, seq, job_id))
+                callback = job["callback"]
+
+            try:
+                callback()
+            except Exception as e:
+                if self.log_callback:
+                    self.log_callback(f"定时调度任务{job_id}错误: {str(e)}")
+
+
+class AdaptivePoller:
+    """自适应识别间隔
+    画面变化或数字接近阈值时按最短间隔识别，画面持续不变时间隔按倍数增长，直到最长间隔；
+    同时统计最近一段时间内的实际识别频率
+    """
+
+    def __init__(self, floor=0.1, ceiling=1.0, backoff=2.0, rate_window=10.0):
+        self.backoff = backoff
+        self.rate_window = rate_window
+        self._polls = deque()
+        self._lock = threading.Lock()
+        self.floor = self.ceiling = self.interval = 0.0
+        self.configure(floor, ceiling)
+        self.interval = self.floor
+
+    def configure(self, floor, ceiling):
+        """更新最短和最长间隔（秒），最短间隔不超过最长间隔"""
+        with self._lock:
+            self.ceiling = max(0.01, float(ceiling))
+            self.floor = min(max(0.01, float(floor)), self.ceiling)
+            self.interval = min(max(self.interval, self.floor), self.ceiling)
+
+    def update(self, changed, urgent=False):
+        """根据本次识别结果计算下一次识别的间隔
+
+        Args:
+            changed: 画面是否变化
+            urgent: 是否需要尽快再次识别，如数字接近阈值
+
+        Returns:
+            下一次识别前的等待时间（秒）
+        """
+        now = time.monotonic()
+        with self._lock:
+            if changed or urgent:
+                self.interval = self.floor
+            else:
+                self.interval = min(self.ceiling, self.interval * self.backoff)
+            self._polls.append(now)
+            while self._polls and now - self._polls[0] > self.rate_window:
+                self._polls.popleft()
+            return self.interval
+
+    def rate(self):
+        """最近rate_window秒内的实际识别频率（次/秒）"""
+        now = time.monotonic()
+        with self._lock:
+            while self._polls and now - self._polls[0] > self.rate_window:
+                self._polls.popleft()
+            if len(self._polls) < 2:
+                return 0.0
+            return (len(self._polls) - 1) / max(now - self._polls[0], 1e-6)
+
+    def format_stats(self):
+        """格式化当前间隔和实际频率"""
+        return f"当前间隔{self.interval:.2f}秒, 实际{self.rate():.1f}次/秒"
+
+
+class EventQueue:
+    """按模块优先级出队并合并重复按键的事件队列
+    数字识别的按键优先于文字识别，文字识别优先于定时按键，同一优先级按先后顺序；
+    同一模块区域的同一按键（或动作序列）尚未执行时，新的事件合并到已有事件中。
+    队列已满时丢弃优先级最低的最早事件，新事件的优先级更低时丢弃新事件。
+    不加锁，调用方负责同步
+    """
+
+    # 数值越小越优先，没有模块信息的控制事件（如退出）最优先
+    MODULE_PRIORITY = {'number': 1, 'ocr': 2, 'timed': 3}
+    DEFAULT_PRIORITY = 0
+    DEFAULT_MAX_SIZE = 64
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, depth_window=1000):
+        self.max_size = max(1, max_size)
+        # 优先级 -> 事件列表，事件为(事件, 模块信息, 识别开始时间, 入队时间)
+        self._queues = {}
+        # 尚未执行的按键事件，用于合并
+        self._pending = set()
+        self._size = 0
+        # 入队时的队列长度，用于统计队列深度
+        self._depths = deque(maxlen=depth_window)
+        self.enqueued = 0
+        self.coalesced = 0
+        self.dropped = 0
+
+    def __len__(self):
+        return self._size
+
+    @classmethod
+    def priority(cls, module_info):
+        if not module_info:
+            return cls.DEFAULT_PRIORITY
+        return cls.MODULE_PRIORITY.get(module_info[0], cls.DEFAULT_PRIORITY)
+
+    @staticmethod
+    def _coalesce_key(item):
+        event, module_info = item[0], item[1]
+        return (event, module_info) if event[0] in ('keypress', 'sequence') else None
+
+    def _forget(self, item):
+        self._size -= 1
+        key = self._coalesce_key(item)
+        if key is not None:
+            self._pending.discard(key)
+
+    def push(self, item):
+        """加入事件
+
+        Returns:
+            (结果, 被丢弃的事件)：结果为'queued'、'coalesced'或'dropped'，
+            'dropped'时被丢弃的可能是新事件本身，也可能是为新事件腾出位置的旧事件
+        """
+        key = self._coalesce_key(item)
+        if key is not None and key in self._pending:
+            self.coalesced += 1
+            return "coalesced", None
+
+        priority = self.priority(item[1])
+        dropped = None
+        if self._size >= self.max_size:
+            self.dropped += 1
+            lowest = max(p for p, queue in self._queues.items() if queue)
+            if priority > lowest:
+                return "dropped", item
+            dropped = self._queues[lowest].popleft()
+            self._forget(dropped)
+
+        self._queues.setdefault(priority, deque()).append(item)
+        if key is not None:
+            self._pending.add(key)
+        self._size += 1
+        self.enqueued += 1
+        self._depths.append(self._size)
+        return ("dropped", dropped) if dropped is not None else ("queued", None)
+
+    def pop(self, skip=None):
+        """按优先级取出第一个事件，skip(事件)为真的事件留在队列中；没有可取出的事件时返回None"""
+        for priority in sorted(self._queues):
+            queue = self._queues[priority]
+            for index, item in enumerate(queue):
+                if skip is not None and skip(item):
+                    continue
+                del queue[index]
+                self._forget(item)
+                return item
+        return None
+
+    def discard(self, predicate):
+        """丢弃predicate(事件)为真的事件，返回丢弃数量"""
+        discarded = 0
+        for priority, queue in self._queues.items():
+            remaining = deque()
+            for item in queue:
+                if predicate(item):
+                    self._forget(item)
+                    discarded += 1
+                else:
+                    remaining.append(item)
+            self._queues[priority] = remaining
+        return discarded
+
+    def get_stats(self):
+        """获取队列统计，深度为最近入队时的队列长度"""
+        depths = sorted(self._depths)
+        return {
+            "size": self._size,
+            "depth_p95": LatencyRecorder.percentile(depths, 95) if depths else 0,
+            "depth_max": depths[-1] if depths else 0,
+            "enqueued": self.enqueued,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped
+        }
+
+    def format_stats(self):
+        """格式化队列统计"""
+        stats = self.get_stats()
+        return (f"当前{stats['size']}个, 深度p95 {stats['depth_p95']}、最大{stats['depth_max']}, "
+                f"入队{stats['enqueued']}次, 合并{stats['coalesced']}次, 丢弃{stats['dropped']}次")
+
+
+class LatencyRecorder:
+    """识别到按键各阶段的耗时统计
+    按(模块, 区域, 阶段)保存最近的耗时样本，计算滚动的p50/p95/p99
+    """
+
+    # 阶段名称，按流水线顺序排列
+    STAGE_NAMES = OrderedDict([
+        ("capture", "截图"),
+        ("grayscale", "灰度转换"),
+        ("preprocess", "预处理"),
+        ("ocr", "文字识别"),
+        ("ocr_timeout", "识别超时"),
+        ("parse", "数字解析"),
+        ("match", "关键词匹配"),
+        ("enqueue", "事件入队"),
+        ("queue_wait", "队列等待"),
+        ("sequence", "动作序列"),
+        ("click", "鼠标点击"),
+        ("keydown", "按下按键"),
+        ("keyup", "弹起按键"),
+        ("total", "识别到按键"),
+    ])
+
+    def __init__(self, window=1000):
+        self.window = window
+        self._samples = {}
+        self._lock = threading.Lock()
+        self._stage_order = {stage: i for i, stage in enumerate(self.STAGE_NAMES)}
+
+    def record(self, module, region, stage, ms):
+        """记录一次耗时（毫秒）"""
+        key = (module, region, stage)
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(ms)
+
+    @staticmethod
+    def percentile(sorted_samples, p):
+        """最近秩法计算百分位数，sorted_samples必须已排序且不为空"""
+        index = max(0, min(len(sorted_samples) - 1, int(math.ceil(p / 100 * len(sorted_samples))) - 1))
+        return sorted_samples[index]
+
+    def snapshot(self):
+        """返回各阶段的耗时分布，按模块、区域和流水线顺序排列"""
+        with self._lock:
+            items = [(key, sorted(samples)) for key, samples in self._samples.items()]
+
+        rows = []
+        for (module, region, stage), samples in items:
+            if not samples:
+                continue
+            rows.append({
+                'module': module,
+                'region': region,
+                'stage': stage,
+                'count': len(samples),
+                'p50': self.percentile(samples, 50),
+                'p95': self.percentile(samples, 95),
+                'p99': self.percentile(samples, 99),
+                'max': samples[-1]
+            })
+        rows.sort(key=lambda row: (row['module'], row['region'],
+                                   self._stage_order.get(row['stage'], len(self._stage_order))))
+        return rows
+
+    def export_json(self, path):
+        """导出耗时分布到JSON文件"""
+        data = {
+            'exported_at': datetime.datetime.now().isoformat(),
+            'window': self.window,
+            'stages': self.snapshot()
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+
+LOG_LEVELS = {
+    "debug": logging.DEBUG,
+    "info": logging.INFO,
+    "warning": logging.WARNING,
+    "error": logging.ERROR
+}
+
+
+class AsyncLogger:
+    """异步日志
+    调用方只负责格式化并放入队列；后台线程批量写入带缓冲的日志文件并按大小轮转，
+    界面日志由主线程定期批量取出显示
+    """
+
+    def __init__(self, log_file, level=logging.INFO, max_bytes=5 * 1024 * 1024, backup_count=3,
+                 ui_capacity=5000):
+        self.log_file = log_file
+        self.level = level
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._queue = queue.SimpleQueue()
+        # 等待界面刷新的日志，界面长时间不刷新时丢弃最早的条目
+        self._ui_pending = deque(maxlen=ui_capacity)
+        self._ui_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+
+    def is_enabled(self, level):
+        return level >= self.level
+
+    def set_level(self, level):
+        self.level = level
+
+    def log(self, message, level=logging.INFO, module=None):
+        """记录一条日志，返回格式化后的日志行；级别未启用时返回None"""
+        if level < self.level:
+            return None
+        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        log_entry = f"[{timestamp}] {message}\n"
+        self._queue.put(log_entry)
+        with self._ui_lock:
+            self._ui_pending.append((log_entry, module))
+        return log_entry
+
+    def drain_ui(self, max_items=500):
+        """取出等待界面显示的日志，返回[(日志行, 模块)]"""
+        items = []
+        with self._ui_lock:
+            while self._ui_pending and len(items) < max_items:
+                items.append(self._ui_pending.popleft())
+        return items
+
+    def _open(self):
+        return open(self.log_file, 'a', encoding='utf-8', buffering=64 * 1024)
+
+    def _rotate(self, f):
+        """日志文件超过大小上限时轮转"""
+        f.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.log_file}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.log_file}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.log_file, f"{self.log_file}.1")
+        else:
+            os.remove(self.log_file)
+        return self._open()
+
+    def _writer_loop(self):
+        f = None
+        while True:
+            entry = self._queue.get()
+            batch = [entry]
+            # 一次取出队列中所有日志，合并写入
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            closing = None in batch
+            try:
+                if f is None:
+                    f = self._open()
+                f.write("".join(item for item in batch if item is not None))
+                f.flush()
+                if self.max_bytes > 0 and f.tell() >= self.max_bytes:
+                    f = self._rotate(f)
+            except Exception as e:
+                print(f"写入日志文件失败: {str(e)}")
+                if f is not None:
+                    try:
+                        f.close()
+                    except Exception:
+                        pass
+                    f = None
+            if closing:
+                if f is not None:
+                    f.close()
+                return
+
+    def close(self, timeout=1):
+        """写完队列中剩余的日志后关闭文件"""
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+
+
+class LogBuffer:
+    """日志环形缓冲
+    只保留最近的N条日志，并按模块分别保留一份索引，筛选时无需重新读取日志文件
+    """
+
+    def __init__(self, capacity=5000):
+        self.capacity = capacity
+        self._all = deque(maxlen=capacity)
+        self._by_module = {}
+
+    def append(self, line, module=None):
+        self._all.append(line)
+        if module:
+            self._by_module.setdefault(module, deque(maxlen=self.capacity)).append(line)
+
+    def view(self, module=None):
+        """获取指定模块的日志序列，module为None时返回全部日志"""
+        if module is None:
+            return self._all
+        return self._by_module.get(module, ())
+
+    def clear(self):
+        self._all.clear()
+        self._by_module.clear()
+
+
+class VirtualLogView:
+    """虚拟化日志视图
+    日志保存在LogBuffer中，文本框只渲染当前可见的行，滚动条由视图自行维护，
+    日志条数不影响插入和滚动的开销
+    """
+
+    def __init__(self, parent, buffer, font=("Arial", 9)):
+        self.buffer = buffer
+        self.module = None
+        self.top = 0
+        # 位于底部时自动跟随最新日志
+        self.follow = True
+
+        self.text = tk.Text(parent, height=20, width=80, font=font, wrap=tk.NONE, state=tk.DISABLED)
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.on_scroll)
+        self.xscrollbar = ttk.Scrollbar(parent, orient=tk.HORIZONTAL, command=self.text.xview)
+        self.text.configure(xscrollcommand=self.xscrollbar.set)
+
+        self.xscrollbar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
+
+        # 行高只在创建和文本框尺寸变化时计算，渲染和滚动时直接使用
+        self.line_height = 1
+        self.update_line_height()
+
+        self.text.bind("<Configure>", self.on_configure)
+        self.text.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.text.bind("<Button-4>", lambda e: self.scroll_by(-3))
+        self.text.bind("<Button-5>", lambda e: self.scroll_by(3))
+
+    def update_line_height(self):
+        """按文本框当前字体计算行高"""
+        self.line_height = max(1, tkfont.Font(font=self.text.cget("font")).metrics("linespace"))
+
+    def on_configure(self, event):
+        self.update_line_height()
+        self.render()
+
+    def visible_rows(self):
+        """根据文本框高度计算可见行数"""
+        return max(1, self.text.winfo_height() // self.line_height)
+
+    def set_module(self, module):
+        """切换模块筛选"""
+        self.module = module
+        self.follow = True
+        self.render()
+
+    def scroll_by(self, rows):
+        lines = self.buffer.view(self.module)
+        max_top = max(0, len(lines) - self.visible_rows())
+        self.top = max(0, min(self.top + rows, max_top))
+        self.follow = self.top >= max_top
+        self.render()
+
+    def on_scroll(self, *args):
+        """滚动条回调"""
+        rows = self.visible_rows()
+        if args[0] == "moveto":
+            total = len(self.buffer.view(self.module))
+            self.top = int(float(args[1]) * total)
+            self.scroll_by(0)
+        elif args[0] == "scroll":
+            step = int(args[1]) * (rows if args[2] == "pages" else 1)
+            self.scroll_by(step)
+
+    def on_mouse_wheel(self, event):
+        self.scroll_by(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def render(self):
+        """只渲染当前可见的日志行"""
+        lines = self.buffer.view(self.module)
+        total = len(lines)
+        rows = self.visible_rows()
+        if self.follow:
+            self.top = max(0, total - rows)
+        self.top = max(0, min(self.top, max(0, total - rows)))
+
+        visible = list(itertools.islice(lines, self.top, self.top + rows))
+        self.text.config(state=tk.NORMAL)
+        self.text.delete("1.0", tk.END)
+        self.text.insert(tk.END, "".join(visible).rstrip("\n"))
+        self.text.config(state=tk.DISABLED)
+
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+
+def write_json_atomic(path, data):
+    """将数据写为JSON文件：先写同目录下的临时文件再原子替换，写入中途崩溃不会损坏原文件
+
+    Raises:
+        OSError: 文件写入失败
+        TypeError, ValueError: 数据无法编码为JSON
+    """
+    directory = os.path.dirname(path)
+    # 确保目录存在
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory or None)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+class ConfigWriter:
+    """配置文件写入器
+    只在内容变化时写入，写入时先写临时文件再原子替换，避免保存中途崩溃导致配置文件损坏；
+    submit在后台线程写入并合并尚未写入的多次请求，write在调用线程中立即写入；
+    后台线程在持有写入锁时才取出待写入的配置，较旧的配置不会在较新的配置之后写入
+    """
+
+    # 比较配置内容时忽略的字段
+    VOLATILE_KEYS = ('last_save_time',)
+
+    def __init__(self, config_file, log_callback=None):
+        self.config_file = config_file
+        self.log_callback = log_callback
+        self._last_content = None
+        self._pending = None
+        # 加锁顺序：先_write_lock再_cond；flush持有写入锁时调用write，需要可重入
+        self._write_lock = threading.RLock()
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._writer_loop, daemon=True)
+        self._thread.start()
+        self.write_count = 0
+        self.skip_count = 0
+
+    def _log(self, message):
+        if self.log_callback:
+            self.log_callback(message)
+
+    @classmethod
+    def _content_of(cls, config):
+        """序列化配置中需要比较的内容"""
+        stable = {k: v for k, v in config.items() if k not in cls.VOLATILE_KEYS}
+        return json.dumps(stable, sort_keys=True, ensure_ascii=False, default=str)
+
+    def _load_last_content(self):
+        """首次保存前读取磁盘上的配置，用于判断内容是否变化"""
+        try:
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                return self._content_of(json.load(f))
+        except (OSError, ValueError):
+            return ""
+
+    def write(self, config):
+        """立即写入配置，内容未变化时跳过
+
+        Returns:
+            是否实际写入了文件
+        """
+        with self._write_lock:
+            try:
+                content = self._content_of(config)
+                if self._last_content is None:
+                    self._last_content = self._load_last_content()
+                if content == self._last_content:
+                    self.skip_count += 1
+                    return False
+
+                write_json_atomic(self.config_file, config)
+            except PermissionError:
+                self._log(f"没有权限写入配置文件: {self.config_file}")
+                return False
+            except (IOError, OSError) as e:
+                self._log(f"配置文件IO错误: {str(e)}")
+                return False
+            except (TypeError, ValueError) as e:
+                self._log(f"配置JSON编码错误: {str(e)}")
+                return False
+
+            self._last_content = content
+            self.write_count += 1
+            self._log("配置已保存")
+            return True
+
+    def submit(self, config):
+        """在后台写入配置，尚未写入的旧请求被新请求覆盖"""
+        with self._cond:
+            self._pending = config
+            self._cond.notify()
+
+    def _take_pending(self):
+        """取出尚未写入的配置，调用方需持有写入锁"""
+        with self._cond:
+            config = self._pending
+            self._pending = None
+        return config
+
+    def flush(self):
+        """立即写入尚未写入的配置，并等待后台线程正在进行的写入完成"""
+        with self._write_lock:
+            config = self._take_pending()
+            if config is not None:
+                self.write(config)
+
+    def _writer_loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+            with self._write_lock:
+                config = self._take_pending()
+                if config is not None:
+                    self.write(config)
+
+
+class StartupTimer:
+    """记录启动各阶段耗时，模块导入耗时作为第一个阶段"""
+
+    def __init__(self):
+        self.phases = [("模块导入", IMPORT_TIME_MS)]
+        self._last = time.perf_counter()
+
+    def mark(self, phase):
+        """结束一个阶段并记录耗时"""
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._last) * 1000))
+        self._last = now
+
+    def format(self):
+        total = sum(ms for _, ms in self.phases)
+        details = ", ".join(f"{phase}{ms:.0f}ms" for phase, ms in self.phases)
+        if LAZY_IMPORT_TIMES:
+            details += "; 延迟导入: " + ", ".join(f"{name}{ms:.0f}ms" for name, ms in LAZY_IMPORT_TIMES.items())
+        return f"启动耗时{total:.0f}ms（{details}）"
+
+
+class AutoDoorEngine:
+    """AutoDoor运行引擎
+    负责文字识别、定时按键、数字识别和按键事件处理，不依赖Tk界面；
+    运行参数来自与autodoor_config.json结构相同的配置字典，界面和无界面模式都通过apply_config下发
+    """
+
+    def __init__(self, config_file=None, log_file=None, log_level="info", ui_log_capacity=5000):
+        app_dir = os.path.dirname(os.path.abspath(__file__))
+
+        # 配置文件和日志文件路径
+        self.config_file = config_file or os.path.join(app_dir, "autodoor_config.json")
+        self.log_file = log_file or os.path.join(app_dir, "autodoor.log")
+
+        # 异步日志，工作线程只负责入队，文件和界面由后台线程和主线程批量写入
+        self.log_level = log_level
+        self.logger = AsyncLogger(self.log_file, LOG_LEVELS[self.log_level], ui_capacity=ui_log_capacity)
+        self.pending_status = None
+
+        # 文字识别配置
+        self.ocr_interval = 5
+        self.pause_duration = 180
+        self.click_delay = 0.5
+        self.custom_key = "equal"
+        self.custom_keywords = ["men", "door"]
+        self.fuzzy_match = False
+        self.keyword_matcher = KeywordMatcher(self.custom_keywords)
+        self.keyword_matcher_key = (tuple(self.custom_keywords), self.fuzzy_match)
+        self.ocr_preprocess = ImagePreprocessor.normalize_options(None)
+        self.ocr_language = "eng"
+        self.ocr_delay_min = 300
+        self.ocr_delay_max = 500
+        self.selected_region = None
+
+        # 自适应识别间隔，开启后识别间隔作为最长间隔
+        self.ocr_adaptive = False
+        self.ocr_interval_min = 0.1
+        self.ocr_poller = AdaptivePoller(self.ocr_interval_min, self.ocr_interval)
+
+        # 点击模式和坐标
+        self.click_mode = "center"
+        self.click_x = 0
+        self.click_y = 0
+
+        # 定时功能和数字识别配置，每项为一个配置字典
+        self.timed_groups = []
+        self.number_interval = 1.0
+        self.number_regions = []
+        # 数字识别的自适应间隔，数字高于阈值但相差不超过near_ratio比例时视为接近阈值
+        self.number_adaptive = False
+        self.number_interval_min = 0.1
+        self.number_near_ratio = 0.2
+        self.number_pollers = {}
+        self.number_last_trigger = {}
+
+        # 报警配置
+        self.alarm_sound = ""
+        self.alarm_volume = 70
+        self.alarm_enabled = {module: False for module in ("ocr", "timed", "number")}
+
+        # Tesseract配置，检测结果按可执行文件路径和修改时间缓存
+        self.tesseract_path = ""
+        self.tesseract_available = False
+        self.tesseract_version = ""
+        self.tesseract_probe_file = os.path.join(os.path.dirname(os.path.abspath(self.config_file)),
+                                                 ".autodoor_tesseract_probe.json")
+        # 后台检测进行中时为未设置状态
+        self.tesseract_probe_done = threading.Event()
+        self.tesseract_probe_done.set()
+
+        # 运行状态
+        self.is_running = False
+        self.is_paused = False
+        self.last_trigger_time = 0
+
+        # 线程控制，每次启动使用新的停止信号，旧线程收到信号后立即退出
+        self.ocr_thread = None
+        self.ocr_stop_event = threading.Event()
+        self.timed_stop_event = threading.Event()
+        self.number_stop_event = threading.Event()
+        self.number_futures = set()
+
+        # 定时调度器，统一驱动所有定时组和数字识别周期
+        self.timer_scheduler = TimerScheduler(log_callback=self.log_message)
+        self.timed_jobs = []
+        self.number_jobs = []
+        # 数字识别在线程池中执行，避免阻塞调度线程；线程数随OCR池大小调整
+        self.number_executor = None
+        self.number_workers = 0
+        self.number_busy = set()
+        self.number_busy_lock = threading.Lock()
+
+        # 事件队列，按模块优先级出队，合并重复按键
+        self.event_queue = EventQueue()
+        self.event_lock = threading.Lock()
+        self.event_cond = threading.Condition(self.event_lock)
+        self.is_event_running = False
+        self.event_thread = None
+        # 按住中的按键：按键弹起作为定时事件保存在最小堆中，到期时由事件线程执行
+        self.key_releases = []
+        self.held_keys = {}
+        self.key_release_seq = itertools.count()
+        # 动作序列等待结束后继续执行的定时事件：(到期时间, 序号, 事件, 下一步序号)
+        self.sequence_resumes = []
+
+        # 画面变化检测，画面未变化时复用上一次的识别结果
+        self.frame_detector = FrameChangeDetector()
+
+        # 识别到按键各阶段的耗时统计
+        self.latency = LatencyRecorder()
+
+        # 截图后端和统一截图调度，多个区域共用同一帧截图
+        self.capture_backend_name = "auto"
+        self.capture_backend = create_capture_backend(self.capture_backend_name)
+        # 输入注入后端，auto在X11会话中使用XTest，否则使用pyautogui；
+        # 首次注入时才创建，应用配置前不连接X服务器
+        self.input_backend_name = "auto"
+        self.input_backend = None
+        self.input_backend_lock = threading.Lock()
+        self.capture_scheduler = CaptureScheduler(self.grab_screen)
+
+        # OCR识别结果缓存
+        self.ocr_cache_size = 128
+        self.ocr_cache_ttl = 300
+        self.ocr_cache = OCRResultCache(self.ocr_cache_size, self.ocr_cache_ttl)
+
+        # OCR前的图像预处理，各区域单独配置
+        self.preprocessor = ImagePreprocessor()
+
+        # 数字模板识别，每个数字识别区域单独学习模板，每识别一定次数用Tesseract核对一次
+        self.digit_templates_enabled = False
+        self.digit_verify_interval = 100
+        self.digit_recognizers = {}
+
+        # 常驻OCR引擎池，文字识别和数字识别共用；单次识别超过ocr_timeout秒时终止，0表示不限制
+        self.ocr_timeout = 5.0
+        # 配置中的OCR池大小，0表示线程模式使用默认值、进程池模式按CPU核数
+        self.ocr_pool_size = 0
+        self.ocr_engine = OCREngine(self.tesseract_path, log_callback=self.log_message)
+        self.log_message(f"OCR引擎后端: {self.ocr_engine.backend}，池大小: {self.ocr_engine.pool_size}")
+        self.resize_number_executor()
+
+    def start(self):
+        """启动事件处理线程和定时调度线程"""
+        self.start_event_thread()
+        self.timer_scheduler.start()
+
+    def close(self):
+        """停止运行中的模块并释放资源，退出时各模块只停止一次"""
+        if self.is_running:
+            self.stop_monitoring()
+        if self.timed_jobs:
+            self.stop_timed_tasks()
+        if self.number_jobs:
+            self.stop_number_recognition()
+
+        # 停止事件线程
+        self.is_event_running = False
+        if self.event_thread:
+            self.add_event(('exit', None), None)
+            self.event_thread.join(timeout=1)
+
+        # 停止定时调度线程和数字识别线程池
+        self.timer_scheduler.stop()
+        with self.number_busy_lock:
+            self.number_executor.shutdown(wait=False)
+
+        # 释放常驻OCR引擎、截图后端和输入后端
+        self.ocr_engine.close()
+        self.capture_backend.close()
+        with self.input_backend_lock:
+            if self.input_backend is not None:
+                self.input_backend.close()
+
+        # 写完剩余日志
+        self.logger.close()
+
+    def start_modules(self, modules=("ocr", "timed", "number")):
+        """启动配置完整的功能模块，返回实际启动的模块列表"""
+        started = []
+        if "ocr" in modules and self.selected_region and self.start_monitoring():
+            started.append("ocr")
+        if "timed" in modules and any(group["enabled"] for group in self.timed_groups):
+            if self.start_timed_tasks():
+                started.append("timed")
+        if "number" in modules and any(region["enabled"] for region in self.number_regions):
+            if self.start_number_recognition():
+                started.append("number")
+        return started
+
+    def log_message(self, message, level=logging.INFO, module=None):
+        """记录日志信息，可在任意线程调用
+
+        Args:
+            message: 日志内容
+            level: 日志级别
+            module: 所属模块（"ocr"、"timed"或"number"），用于日志筛选
+        """
+        if self.logger.log(message, level, module) is None:
+            return
+
+        # 状态信息由界面在刷新日志时取走
+        if level >= logging.INFO:
+            self.pending_status = message.split(":")[0] if ":" in message else message
+
+    def log_debug(self, message, *args, module=None):
+        """记录调试日志，调试级别未启用时不进行格式化"""
+        if self.logger.is_enabled(logging.DEBUG):
+            self.logger.log(message.format(*args) if args else message, logging.DEBUG, module)
+
+    def set_status(self, status):
+        """更新状态信息，由界面在刷新日志时取走"""
+        self.pending_status = status
+
+    def set_log_level(self, level_name):
+        """设置日志级别"""
+        if level_name not in LOG_LEVELS:
+            return
+        self.log_level = level_name
+        self.logger.set_level(LOG_LEVELS[level_name])
+
+    def load_config_file(self, config_file=None):
+        """读取配置文件并应用，返回是否加载成功"""
+        config_file = config_file or self.config_file
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except FileNotFoundError:
+            self.log_message(f"配置文件不存在: {config_file}")
+            return False
+        except json.JSONDecodeError as e:
+            self.log_message(f"配置文件格式错误: {config_file}，错误详情: {str(e)}")
+            return False
+        except PermissionError:
+            self.log_message(f"没有权限读取配置文件: {config_file}")
+            return False
+        except IOError as e:
+            self.log_message(f"配置文件IO错误: {str(e)}")
+            return False
+
+        try:
+            self.apply_config(config)
+        except Exception as e:
+            self.log_message(f"配置加载错误: {str(e)}")
+            return False
+
+        self.log_message(f"配置加载成功: {config_file}")
+        return True
+
+    def apply_config(self, config):
+        """应用配置字典，结构与autodoor_config.json相同，兼容旧版平铺格式
+        运行中调用时，新的参数在下一次识别或触发时生效
+        """
+        # 1. Tesseract配置
+        if isinstance(config.get('tesseract'), dict):
+            tesseract_path = config['tesseract'].get('path')
+        else:
+            tesseract_path = config.get('tesseract_path')
+        if tesseract_path and tesseract_path.strip():
+            self.set_tesseract_path(tesseract_path.strip())
+
+        # 2. 文字识别配置
+        ocr_config = config.get('ocr')
+        if not isinstance(ocr_config, dict):
+            ocr_config = {
+                'interval': config.get('ocr_interval'),
+                'pause_duration': config.get('pause_duration'),
+                'selected_region': config.get('selected_region'),
+                'custom_key': config.get('custom_key'),
+                'custom_keywords': config.get('custom_keywords'),
+                'language': config.get('ocr_language')
+            }
+        if ocr_config.get('interval') is not None:
+            self.ocr_interval = ocr_config['interval']
+        if ocr_config.get('adaptive') is not None:
+            self.ocr_adaptive = bool(ocr_config['adaptive'])
+        if ocr_config.get('interval_min') is not None:
+            self.ocr_interval_min = ocr_config['interval_min']
+        self.ocr_poller.configure(self.ocr_interval_min, self.ocr_interval)
+        if ocr_config.get('pause_duration') is not None:
+            self.pause_duration = ocr_config['pause_duration']
+        region = ocr_config.get('selected_region')
+        self.selected_region = tuple(region) if region else None
+        if ocr_config.get('custom_key') is not None:
+            self.custom_key = ocr_config['custom_key']
+        keywords = [str(keyword).strip().lower() for keyword in ocr_config.get('custom_keywords') or []]
+        keywords = [keyword for keyword in keywords if keyword]
+        if keywords:
+            self.custom_keywords = keywords
+        if ocr_config.get('fuzzy_match') is not None:
+            self.fuzzy_match = bool(ocr_config['fuzzy_match'])
+        self.update_keyword_matcher()
+        if 'preprocess' in ocr_config:
+            self.ocr_preprocess = ImagePreprocessor.normalize_options(ocr_config['preprocess'])
+        if ocr_config.get('language'):
+            self.ocr_language = ocr_config['language']
+        self.ocr_delay_min = ocr_config.get('delay_min', self.ocr_delay_min)
+        self.ocr_delay_max = ocr_config.get('delay_max', self.ocr_delay_max)
+
+        # 3. 点击模式和坐标配置
+        click_config = config.get('click')
+        if not isinstance(click_config, dict):
+            click_config = {
+                'mode': config.get('click_mode'),
+                'x': config.get('click_x'),
+                'y': config.get('click_y')
+            }
+        if click_config.get('mode'):
+            self.click_mode = click_config['mode']
+        if click_config.get('x') is not None:
+            self.click_x = click_config['x']
+        if click_config.get('y') is not None:
+            self.click_y = click_config['y']
+
+        # 4. 报警配置，定时组和数字识别区域未单独配置时使用模块开关
+        alarm_config = config.get('alarm', {})
+        if 'sound' in alarm_config:
+            self.alarm_sound = alarm_config['sound']
+        if 'volume' in alarm_config:
+            self.alarm_volume = alarm_config['volume']
+        for module in self.alarm_enabled:
+            module_config = alarm_config.get(module, {})
+            if 'enabled' in module_config:
+                self.alarm_enabled[module] = bool(module_config['enabled'])
+
+        # 5. 定时功能配置，整体替换列表，调度线程读到的总是完整的配置
+        timed_groups = []
+        for i, group in enumerate(config.get('timed_key_press', {}).get('groups', [])):
+            if not isinstance(group, dict):
+                continue
+            timed_groups.append({
+                'enabled': bool(group.get('enabled', False)),
+                'interval': group.get('interval', 10 * (i + 1)),
+                'key': group.get('key', ""),
+                'delay_min': group.get('delay_min', 300),
+                'delay_max': group.get('delay_max', 500),
+                'alarm': bool(group.get('alarm', self.alarm_enabled['timed']))
+            })
+        self.timed_groups = timed_groups
+
+        # 6. 数字识别配置
+        number_config = config.get('number_recognition', {})
+        if number_config.get('interval') is not None:
+            self.number_interval = number_config['interval']
+        if number_config.get('adaptive') is not None:
+            self.number_adaptive = bool(number_config['adaptive'])
+        if number_config.get('interval_min') is not None:
+            self.number_interval_min = number_config['interval_min']
+        if number_config.get('near_ratio') is not None:
+            self.number_near_ratio = max(0.0, float(number_config['near_ratio']))
+        for poller in list(self.number_pollers.values()):
+            poller.configure(self.number_interval_min, self.number_interval)
+        number_regions = []
+        for region_config in number_config.get('regions', []):
+            if not isinstance(region_config, dict):
+                continue
+            region = region_config.get('region')
+            number_regions.append({
+                'enabled': bool(region_config.get('enabled', False)),
+                'region': tuple(region) if region else None,
+                'threshold': region_config.get('threshold', 500),
+                'key': region_config.get('key', ""),
+                'delay_min': region_config.get('delay_min', 300),
+                'delay_max': region_config.get('delay_max', 500),
+                'alarm': bool(region_config.get('alarm', self.alarm_enabled['number'])),
+                'preprocess': ImagePreprocessor.normalize_options(region_config.get('preprocess'))
+            })
+        self.number_regions = number_regions
+
+        # 7. 性能配置
+        performance_config = config.get('performance', {})
+        self.configure_cache(performance_config.get('ocr_cache_size', self.ocr_cache_size),
+                             performance_config.get('ocr_cache_ttl', self.ocr_cache_ttl))
+        if performance_config.get('capture_backend'):
+            self.set_capture_backend(performance_config['capture_backend'])
+        if performance_config.get('input_backend'):
+            self.set_input_backend(performance_config['input_backend'])
+        if 'digit_templates' in performance_config:
+            self.digit_templates_enabled = bool(performance_config['digit_templates']) and NUMPY_AVAILABLE
+        if performance_config.get('ocr_timeout') is not None:
+            self.ocr_timeout = max(0.0, float(performance_config['ocr_timeout']))
+        if performance_config.get('ocr_backend') and performance_config['ocr_backend'] != self.ocr_engine.backend_name:
+            backend = self.ocr_engine.set_backend(performance_config['ocr_backend'])
+            self.log_message(f"OCR引擎后端: {backend}")
+        if performance_config.get('ocr_executor'):
+            executor, pool_size = self.ocr_engine.executor, self.ocr_engine.pool_size
+            self.ocr_pool_size = int(performance_config.get('ocr_pool_size') or 0)
+            self.ocr_engine.configure_executor(performance_config['ocr_executor'], self.ocr_pool_size)
+            if (executor, pool_size) != (self.ocr_engine.executor, self.ocr_engine.pool_size):
+                self.log_message(f"OCR执行方式: {self.ocr_engine.executor}，池大小: {self.ocr_engine.pool_size}")
+                self.resize_number_executor()
+
+        # 8. 日志配置
+        log_config = config.get('log', {})
+        if log_config.get('level') in LOG_LEVELS:
+            self.set_log_level(log_config['level'])
+
+    def configure_cache(self, size, ttl):
+        """更新OCR识别结果缓存的容量和有效期"""
+        self.ocr_cache_size = max(0, size)
+        self.ocr_cache_ttl = max(0, ttl)
+        self.ocr_cache.configure(self.ocr_cache_size, self.ocr_cache_ttl)
+
+    def set_tesseract_path(self, tesseract_path):
+        """更新Tesseract路径，路径变化时重建OCR引擎实例"""
+        if tesseract_path == self.tesseract_path:
+            return
+        self.tesseract_path = tesseract_path
+        self.ocr_engine.set_tesseract_cmd(tesseract_path)
+
+    def get_default_tesseract_path(self):
+        """获取默认的Tesseract路径，使用项目自带的tesseract
+        支持Windows和Mac平台，同时支持打包后的环境
+        """
+
+        # 获取程序运行目录
+        if hasattr(sys, '_MEIPASS'):
+            # 打包后的环境，使用_MEIPASS获取运行目录
+            app_root = sys._MEIPASS
+        else:
+            # 开发环境，使用当前文件所在目录
+            app_root = os.path.dirname(os.path.abspath(__file__))
+
+        # 根据操作系统选择不同的tesseract路径
+        tesseract_path = ""
+        if platform.system() == "Windows":
+            # Windows平台
+            tesseract_path = os.path.join(app_root, "tesseract", "tesseract.exe")
+        elif platform.system() == "Darwin":
+            # macOS平台
+            # 检查可能的路径
+            possible_paths = [
+                os.path.join(app_root, "tesseract", "tesseract"),  # 主要路径
+                os.path.join(app_root, "tesseract"),  # 备选路径
+                os.path.join(os.path.dirname(app_root), "tesseract", "tesseract")  # 应用包外部路径
+            ]
+
+            for path in possible_paths:
+                if os.path.exists(path):
+                    tesseract_path = path
+                    break
+        else:
+            # 其他平台，返回空
+            tesseract_path = ""
+
+        self.log_message(f"默认Tesseract路径: {tesseract_path}")
+        return tesseract_path
+
+    def get_default_alarm_sound_path(self):
+        """获取默认的报警声音路径，使用项目自带的alarm.mp3
+        支持Windows和Mac平台，同时支持打包后的环境
+        """
+
+        # 获取程序运行目录
+        if hasattr(sys, '_MEIPASS'):
+            # 打包后的环境，使用_MEIPASS获取运行目录
+            app_root = sys._MEIPASS
+        else:
+            # 开发环境，使用当前文件所在目录
+            app_root = os.path.dirname(os.path.abspath(__file__))
+
+        # 构建跨平台的报警声音路径
+        alarm_path = os.path.join(app_root, "voice", "alarm.mp3")
+
+        # 确保路径格式正确
+        alarm_path = os.path.normpath(alarm_path)
+
+        self.log_message(f"默认报警声音路径: {alarm_path}")
+        return alarm_path
+
+    def check_tesseract_availability(self):
+        """检查Tesseract OCR是否可用
+        包括：路径有效性验证、版本兼容性检查、基础功能测试
+        """
+        if not self.tesseract_path:
+            self.log_message("Tesseract路径未配置")
+            return False
+
+        # 1. 路径有效性验证
+        if not os.path.exists(self.tesseract_path):
+            self.log_message(f"Tesseract路径不存在: {self.tesseract_path}")
+            return False
+
+        if not os.path.isfile(self.tesseract_path):
+            self.log_message(f"Tesseract路径不是文件: {self.tesseract_path}")
+            return False
+
+        # 根据操作系统检查可执行文件格式和权限
+        if platform.system() == "Windows":
+            if not self.tesseract_path.endswith("tesseract.exe"):
+                self.log_message(f"Tesseract路径不是可执行文件: {self.tesseract_path}")
+                return False
+        elif platform.system() == "Darwin":  # macOS
+            if not os.path.basename(self.tesseract_path) == "tesseract":
+                self.log_message(f"Tesseract路径不是可执行文件: {self.tesseract_path}")
+                return False
+
+            # 检查并修复macOS上的执行权限
+            if not os.access(self.tesseract_path, os.X_OK):
+                self.log_message(f"Tesseract文件缺少执行权限，尝试修复: {self.tesseract_path}")
+                try:
+                    # 尝试添加执行权限
+                    subprocess.run(["chmod", "+x", self.tesseract_path], 
+                                  capture_output=True, check=True, timeout=5)
+                    self.log_message("成功添加执行权限")
+                except Exception as e:
+                    self.log_message(f"添加执行权限失败: {str(e)}")
+                    return False
+        # 其他平台不做严格检查
+
+        # 同一个Tesseract可执行文件已检测通过时跳过检测
+        probe_key = self._tesseract_probe_key()
+        cached = self._load_tesseract_probe()
+        if probe_key is not None and cached.get('key') == probe_key:
+            self.tesseract_version = cached.get('version', "")
+            self.log_message(f"Tesseract检测结果已缓存，跳过检测（版本{self.tesseract_version}）")
+            return True
+
+        try:
+            # 2. 版本兼容性检查
+            version_result = subprocess.run(
+                [self.tesseract_path, "--version"],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=5
+            )
+
+            # 解析版本信息
+            version_output = version_result.stdout.strip()
+            if "tesseract" in version_output.lower():
+                # 提取版本号，格式类似 "tesseract 5.3.3"
+                version_parts = version_output.split()
+                if len(version_parts) >= 2:
+                    version_str = version_parts[1]
+                    self.tesseract_version = version_str
+                    self.log_message(f"检测到Tesseract版本: {version_str}")
+
+                    # 检查主要版本号，确保至少是4.x
+                    try:
+                        major_version = int(version_str.split('.')[0])
+                        if major_version < 4:
+                            self.log_message(f"Tesseract版本太旧 ({version_str})，建议使用4.x或更高版本")
+                            return False
+                    except (ValueError, IndexError):
+                        self.log_message(f"无法解析Tesseract版本: {version_str}")
+                        # 继续执行，不因为版本解析失败而直接返回False
+
+            # 3. 基础功能测试
+            # 创建一个简单的测试图像，通过管道传给tesseract，不写任何临时文件
+            test_image = Image.new('L', (100, 30), color=255)
+
+            # 尝试执行OCR识别
+            tesseract_pipe_image_to_string(self.tesseract_path, test_image, lang='eng', timeout=5)
+
+            # 记录检测通过的可执行文件，下次启动时跳过检测
+            if probe_key is not None:
+                self._save_tesseract_probe({'key': probe_key, 'version': self.tesseract_version})
+
+            self.log_message("Tesseract OCR引擎检测通过")
+            return True
+
+        except subprocess.TimeoutExpired:
+            self.log_message(f"Tesseract命令执行超时: {self.tesseract_path}")
+            return False
+        except subprocess.CalledProcessError as e:
+            self.log_message(f"Tesseract命令执行失败: {e}")
+            return False
+        except FileNotFoundError:
+            self.log_message(f"Tesseract可执行文件未找到: {self.tesseract_path}")
+            return False
+        except Exception as e:
+            self.log_message(f"Tesseract检测发生未知错误: {str(e)}")
+            return False
+
+    def start_tesseract_probe(self):
+        """在后台线程中检测Tesseract是否可用，检测完成后设置tesseract_probe_done"""
+        self.tesseract_probe_done.clear()
+
+        def run():
+            start = time.perf_counter()
+            try:
+                self.tesseract_available = self.check_tesseract_availability()
+            except Exception as e:
+                self.log_message(f"Tesseract检测发生未知错误: {str(e)}")
+                self.tesseract_available = False
+            finally:
+                self.log_message(f"Tesseract检测耗时{(time.perf_counter() - start) * 1000:.0f}ms")
+                self.tesseract_probe_done.set()
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _tesseract_probe_key(self):
+        """检测结果的缓存键，可执行文件被替换或升级后失效"""
+        try:
+            stat = os.stat(self.tesseract_path)
+        except OSError:
+            return None
+        return [os.path.abspath(self.tesseract_path), stat.st_mtime, stat.st_size]
+
+    def _load_tesseract_probe(self):
+        try:
+            with open(self.tesseract_probe_file, 'r', encoding='utf-8') as f:
+                cached = json.load(f)
+            return cached if isinstance(cached, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_tesseract_probe(self, result):
+        try:
+            write_json_atomic(self.tesseract_probe_file, result)
+        except (OSError, TypeError, ValueError) as e:
+            self.log_debug("保存Tesseract检测结果失败: {0}", e)
+
+    def start_monitoring(self):
+        """开始监控，返回是否成功启动"""
+        if not self.tesseract_available:
+            self.log_message("Tesseract OCR引擎不可用，无法开始监控", module="ocr")
+            return False
+
+        if not self.selected_region:
+            self.log_message("未选择监控区域，无法开始监控", module="ocr")
+            return False
+
+        # 确保上一次的OCR线程已经收到停止信号
+        self.ocr_stop_event.set()
+
+        self.is_running = True
+        self.is_paused = False
+
+        self.log_message("开始监控...", module="ocr")
+        if self.ocr_adaptive:
+            self.ocr_poller = AdaptivePoller(self.ocr_interval_min, self.ocr_interval)
+            self.log_message(f"自适应识别间隔: {self.ocr_poller.floor}-{self.ocr_poller.ceiling}秒", module="ocr")
+
+        # 登记监控区域，参与统一截图
+        self.capture_scheduler.register("ocr", self.selected_region)
+
+        # 启动OCR线程
+        self.ocr_stop_event = threading.Event()
+        self.ocr_thread = threading.Thread(target=self.ocr_loop, args=(self.ocr_stop_event,), daemon=True)
+        self.ocr_thread.start()
+        return True
+
+    def stop_monitoring(self):
+        """停止监控"""
+        self.is_running = False
+        self.ocr_stop_event.set()
+        self.capture_scheduler.unregister("ocr")
+
+        # 丢弃尚未执行的文字识别按键
+        self.discard_events("ocr")
+
+        # 等待OCR线程退出，正在进行的识别完成后线程不会再触发动作
+        if self.ocr_thread and self.ocr_thread is not threading.current_thread():
+            self.ocr_thread.join(timeout=0.5)
+            if self.ocr_thread.is_alive():
+                self.log_message("OCR线程正在完成当前识别，结束后自动退出", module="ocr")
+
+        self.log_message("已停止监控", module="ocr")
+        self.log_message(f"OCR引擎统计: {self.ocr_engine.format_stats()}", module="ocr")
+        self.log_message(f"画面变化检测统计: {self.frame_detector.format_stats()}", module="ocr")
+        self.log_message(f"截图统计: {self.capture_scheduler.format_stats()}", module="ocr")
+        if self.ocr_adaptive:
+            self.log_message(f"自适应识别间隔: {self.ocr_poller.format_stats()}", module="ocr")
+
+    def ocr_loop(self, stop_event):
+        """OCR识别循环
+
+        Args:
+            stop_event: 本次监控的停止信号，所有等待都在该信号上进行
+        """
+        while not stop_event.is_set():
+            try:
+                current_time = time.time()
+
+                # 检查是否需要暂停
+                if self.is_paused:
+                    stop_event.wait(1)
+                    continue
+
+                # 检查是否在暂停期
+                pause_duration = self.pause_duration
+                if current_time - self.last_trigger_time < pause_duration:
+                    remaining = int(pause_duration - (current_time - self.last_trigger_time))
+                    self.set_status(f"暂停中... {remaining}秒")
+                    stop_event.wait(min(1, pause_duration - (current_time - self.last_trigger_time)))
+                    continue
+
+                # 执行OCR识别
+                changed = self.perform_ocr(stop_event)
+
+                # 等待下一次识别，自适应模式下画面不变时逐渐放慢
+                if self.ocr_adaptive:
+                    stop_event.wait(self.ocr_poller.update(changed))
+                else:
+                    stop_event.wait(self.ocr_interval)
+
+            except Exception as e:
+                self.log_message(f"错误: {str(e)}", module="ocr")
+                stop_event.wait(5)
+
+    def perform_ocr(self, stop_event=None):
+        """执行OCR识别
+
+        Args:
+            stop_event: 停止信号，识别完成时若已停止则不再触发动作
+
+        Returns:
+            bool: 画面是否变化，出错时返回False
+        """
+        try:
+            # 截取屏幕区域，确保坐标是(left, top, right, bottom)格式
+            left, top, right, bottom = normalize_region(self.selected_region)
+
+            # 通过统一截图调度获取区域图像，与数字识别区域共用同一帧
+            detect_time = time.perf_counter()
+            screenshot = self.capture_scheduler.grab((left, top, right, bottom), key="ocr")
+            capture_done = time.perf_counter()
+            self.latency.record("ocr", 0, "capture", (capture_done - detect_time) * 1000)
+
+            # 转换为灰度图像以提高识别率
+            screenshot = screenshot.convert('L')
+            self.latency.record("ocr", 0, "grayscale", (time.perf_counter() - capture_done) * 1000)
+
+            current_lang = self.ocr_language
+
+            # 画面未变化时复用上一次的识别结果
+            frame_key = ("ocr", (left, top, right, bottom), current_lang)
+            hit, cached = self.frame_detector.lookup(frame_key, screenshot)
+            if hit:
+                text = cached
+                self.log_debug("识别结果(画面未变化): '{0}'", text.strip(), module="ocr")
+            else:
+                # 先查询识别结果缓存，未命中时进行OCR识别
+                preprocess = self.ocr_preprocess
+                cache_key = OCRResultCache.make_key(screenshot, current_lang, ImagePreprocessor.signature(preprocess))
+                text = self.ocr_cache.get(cache_key)
+                if text is not None:
+                    self.log_debug("识别结果(缓存): '{0}'", text.strip(), module="ocr")
+                else:
+                    ocr_image = self.preprocess_image("ocr", 0, screenshot, preprocess)
+                    try:
+                        text = self.ocr_engine.image_to_string(ocr_image, lang=current_lang, timeout=self.ocr_timeout or None,
+                                                               cancel_event=stop_event)
+                        self.ocr_cache.put(cache_key, text)
+                        self.latency.record("ocr", 0, "ocr", self.ocr_engine.last_latency_ms)
+                        self.log_message(f"识别结果: '{text.strip()}'（耗时{self.ocr_engine.last_latency_ms:.0f}ms）", module="ocr")
+                    except OCRTimeout:
+                        text = self.record_ocr_timeout("ocr", 0)
+                self.frame_detector.store(frame_key, text)
+
+            # 识别期间监控已停止时不再触发动作
+            if stop_event is not None and stop_event.is_set():
+                return not hit
+
+            # 检查是否包含关键词（关键词可能已修改，复用结果时也重新匹配）
+            match_start = time.perf_counter()
+            match = self.match_keywords(text)
+            self.latency.record("ocr", 0, "match", (time.perf_counter() - match_start) * 1000)
+            if match:
+                fuzzy_note = f"，编辑距离{match.distance}" if match.distance else ""
+                self.log_message(f"匹配到关键词'{match.keyword}'：位置{match.start}，识别文字'{match.text}'{fuzzy_note}",
+                                 module="ocr")
+                self.trigger_action(detect_time)
+            return not hit
+
+        except OCRCancelled:
+            self.log_debug("监控已停止，取消本次识别", module="ocr")
+            return False
+        except Exception as e:
+            self.log_message(f"OCR错误: {str(e)}", module="ocr")
+            return False
+
+    def update_keyword_matcher(self):
+        """关键词或匹配方式变化时重新编译关键词匹配器"""
+        key = (tuple(self.custom_keywords), self.fuzzy_match)
+        if key != self.keyword_matcher_key:
+            self.keyword_matcher = KeywordMatcher(self.custom_keywords, self.fuzzy_match)
+            self.keyword_matcher_key = key
+
+    def match_keywords(self, text):
+        """检查识别结果是否包含任一关键词（不区分大小写）
+
+        Returns:
+            KeywordMatch或None
+        """
+        return self.keyword_matcher.search(text)
+
+    def trigger_action(self, detect_time=None):
+        """触发动作序列
+
+        Args:
+            detect_time: 开始截图的时间（time.perf_counter），用于统计识别到按键的总耗时
+        """
+        self.log_message("检测到关键词，执行动作...", module="ocr")
+
+        # 播放OCR模块报警声音
+        self.play_alarm_sound(self.alarm_enabled["ocr"])
+
+        # 获取自定义按键
+        custom_key = self.custom_key
+
+        # 只有当按键不为空时才执行按键操作
+        if custom_key:
+            # 计算点击位置
+            click_x, click_y = self.calculate_click_position()
+
+            # 点击指定位置、等待固定时间（无需用户修改）、按下自定义按键，
+            # 作为一个动作序列交给事件线程执行，识别线程直接继续截图
+            steps = (('click', (click_x, click_y)), ('wait', self.click_delay), ('keypress', custom_key))
+            self.add_event(('sequence', steps), ('ocr', 0), detect_time)
+
+            # 记录触发时间
+            self.last_trigger_time = time.time()
+        else:
+            self.log_message("按键配置为空，仅执行报警操作", module="ocr")
+
+    def calculate_click_position(self):
+        """计算点击位置"""
+        mode = self.click_mode
+
+        if mode == "custom":
+            # 使用自定义坐标（相对于选择区域左上角）
+            x_offset = self.click_x
+            y_offset = self.click_y
+
+            # 计算实际屏幕坐标
+            click_x = self.selected_region[0] + x_offset
+            click_y = self.selected_region[1] + y_offset
+
+            # 确保坐标在选择区域内
+            click_x = max(self.selected_region[0], min(click_x, self.selected_region[2]))
+            click_y = max(self.selected_region[1], min(click_y, self.selected_region[3]))
+        else:
+            # 计算区域中心
+            click_x = (self.selected_region[0] + self.selected_region[2]) // 2
+            click_y = (self.selected_region[1] + self.selected_region[3]) // 2
+
+        return click_x, click_y
+
+    def start_event_thread(self):
+        """启动事件处理线程"""
+        self.is_event_running = True
+        self.event_thread = threading.Thread(target=self.process_events, daemon=True)
+        self.event_thread.start()
+        self.log_message("事件处理线程已启动")
+
+    def process_events(self):
+        """处理事件队列中的事件
+        按下按键后不在事件线程中等待，弹起按键作为定时事件到期时执行，按住期间继续处理其他按键；
+        同一按键按住期间的新事件留在队列中，弹起后再执行。
+        动作序列中的等待同样不阻塞事件线程，到期后从下一步继续执行
+        """
+        try:
+            while self.is_event_running:
+                try:
+                    with self.event_cond:
+                        while True:
+                            now = time.monotonic()
+                            release = resume = event_data = None
+                            if self.key_releases and self.key_releases[0][0] <= now:
+                                release = heapq.heappop(self.key_releases)
+                                break
+                            if self.sequence_resumes and self.sequence_resumes[0][0] <= now:
+                                resume = heapq.heappop(self.sequence_resumes)
+                                break
+                            event_data = self.pop_ready_event()
+                            if event_data is not None:
+                                break
+                            timers = [heap[0][0] for heap in (self.key_releases, self.sequence_resumes) if heap]
+                            self.event_cond.wait(min(timers) - now if timers else None)
+
+                    # 执行到期的按键弹起、动作序列的后续步骤或事件
+                    if release is not None:
+                        self.release_key(release)
+                    elif resume is not None:
+                        self.run_sequence(resume[2], resume[3])
+                    else:
+                        self.execute_event(event_data)
+                except Exception as e:
+                    self.log_message(f"事件处理错误: {str(e)}")
+                    time.sleep(1)
+        finally:
+            # 事件线程退出时弹起所有仍按住的按键，未完成的动作序列不再继续
+            with self.event_cond:
+                releases = sorted(self.key_releases)
+                self.key_releases = []
+                self.sequence_resumes = []
+            for release in releases:
+                self.release_key(release)
+
+    def pop_ready_event(self):
+        """按优先级取出第一个可以执行的事件，按键仍按住时跳过该按键的事件；需持有event_cond"""
+        return self.event_queue.pop(lambda item: item[0][0] == 'keypress' and item[0][1] in self.held_keys)
+
+    def format_event_queue_stats(self):
+        """格式化事件队列统计"""
+        with self.event_cond:
+            return self.event_queue.format_stats()
+
+    def release_key(self, release):
+        """弹起按键"""
+        _, _, key, module_info, delay = release
+        module = module_info[0] if module_info else None
+        try:
+            keyup_start = time.perf_counter()
+            self.get_input_backend().key_up(key)
+            if module_info:
+                self.latency.record(module, module_info[1], "keyup", (time.perf_counter() - keyup_start) * 1000)
+            self.log_message(f"按下了 {key} 键，延迟 {delay*1000:.0f} 毫秒", module=module)
+        except Exception as e:
+            self.log_message(f"按键执行错误: {str(e)}", module=module)
+        finally:
+            with self.event_cond:
+                self.held_keys.pop(key, None)
+
+    def add_event(self, event, module_info=None, detect_time=None):
+        """添加事件到队列，同一模块区域的同一按键尚未执行时合并到已有事件
+
+        Args:
+            event: (事件类型, 数据)
+            module_info: (模块, 区域序号)
+            detect_time: 触发该事件的识别开始时间（time.perf_counter），用于统计总耗时
+        """
+        enqueue_time = time.perf_counter()
+        item = (event, module_info, detect_time, enqueue_time)
+        with self.event_cond:
+            result, dropped = self.event_queue.push(item)
+            if result != "coalesced" and dropped is not item:
+                self.event_cond.notify()
+        if result == "coalesced":
+            self.log_debug("事件{0}尚未执行，合并重复事件", event, module=module_info[0] if module_info else None)
+            return
+        if dropped is not None:
+            self.log_message(f"事件队列已满，丢弃事件: {dropped[0]}", level=logging.WARNING,
+                             module=dropped[1][0] if dropped[1] else None)
+            if dropped is item:
+                return
+        if module_info:
+            self.latency.record(module_info[0], module_info[1], "enqueue", (time.perf_counter() - enqueue_time) * 1000)
+
+    def discard_events(self, module_type):
+        """丢弃指定模块尚未执行的事件和未完成的动作序列，模块停止时调用"""
+        with self.event_cond:
+            discarded = self.event_queue.discard(lambda item: bool(item[1]) and item[1][0] == module_type)
+            resumes = [resume for resume in self.sequence_resumes
+                       if not (resume[2][1] and resume[2][1][0] == module_type)]
+            discarded += len(self.sequence_resumes) - len(resumes)
+            heapq.heapify(resumes)
+            self.sequence_resumes = resumes
+        if discarded:
+            self.log_message(f"已丢弃{discarded}个未执行的{module_type}模块事件")
+
+    def execute_event(self, event_data):
+        """执行具体事件"""
+        event, module_info, detect_time, enqueue_time = event_data
+        event_type, data = event
+
+        if event_type == 'keypress':
+            self.press_key(data, module_info, detect_time, enqueue_time)
+        elif event_type == 'sequence':
+            if module_info:
+                self.latency.record(module_info[0], module_info[1], "queue_wait",
+                                    (time.perf_counter() - enqueue_time) * 1000)
+            self.run_sequence(event_data, 0)
+        elif event_type == 'exit':
+            # 退出事件，什么都不做
+            pass
+        # 其他事件类型...
+
+    def run_sequence(self, event_data, index):
+        """从第index步开始执行动作序列
+        步骤为('click', (x, y))、('wait', 秒)或('keypress', 按键)；
+        遇到等待时把后续步骤作为定时事件，到期后由事件线程继续执行；
+        要按下的按键仍按住时，等到该按键弹起后再继续
+        """
+        event, module_info, detect_time, enqueue_time = event_data
+        steps = event[1]
+        module = module_info[0] if module_info else None
+        try:
+            while index < len(steps):
+                action, value = steps[index]
+                if action == 'click':
+                    click_start = time.perf_counter()
+                    self.get_input_backend().click(*value)
+                    if module_info:
+                        self.latency.record(module, module_info[1], "click", (time.perf_counter() - click_start) * 1000)
+                    self.log_message(f"点击位置: ({value[0]}, {value[1]})", module=module)
+                elif action == 'wait':
+                    with self.event_cond:
+                        heapq.heappush(self.sequence_resumes, (time.monotonic() + value, next(self.key_release_seq),
+                                                               event_data, index + 1))
+                    return
+                elif action == 'keypress':
+                    with self.event_cond:
+                        release_due = next((release[0] for release in self.key_releases if release[2] == value), None)
+                        if release_due is not None:
+                            heapq.heappush(self.sequence_resumes, (release_due, next(self.key_release_seq),
+                                                                   event_data, index))
+                            return
+                    self.press_key(value, module_info, detect_time, enqueue_time, wait_stage="sequence")
+                index += 1
+        except Exception as e:
+            self.log_message(f"动作执行错误: {str(e)}", module=module)
+
+    def press_key(self, key, module_info, detect_time, enqueue_time, wait_stage="queue_wait"):
+        """按下按键，并安排按键时长到期后弹起
+
+        Args:
+            wait_stage: 从入队到按下按键的耗时记录到的阶段，动作序列中的按键记录为sequence
+        """
+        try:
+            # 按下前确定按键时长，按下后不再有可能失败的步骤，避免按键按下后无人弹起
+            delay_min, delay_max = self.get_key_delay_range(module_info)
+
+            # 确保延迟范围有效
+            delay_min = max(1, delay_min)  # 至少1ms
+            delay_max = max(delay_min, delay_max)  # 确保max不小于min
+
+            # 生成随机延迟
+            delay = random.randint(delay_min, delay_max) / 1000  # 转换为秒
+
+            # 立即按下按键
+            keydown_start = time.perf_counter()
+            self.get_input_backend().key_down(key)
+            keydown_done = time.perf_counter()
+            if module_info:
+                module_type, module_index = module_info
+                self.latency.record(module_type, module_index, wait_stage, (keydown_start - enqueue_time) * 1000)
+                self.latency.record(module_type, module_index, "keydown", (keydown_done - keydown_start) * 1000)
+                if detect_time is not None:
+                    self.latency.record(module_type, module_index, "total", (keydown_done - detect_time) * 1000)
+
+            # 延迟后弹起按键，按住期间事件线程继续处理其他按键
+            with self.event_cond:
+                self.held_keys[key] = module_info
+                heapq.heappush(self.key_releases, (time.monotonic() + delay, next(self.key_release_seq),
+                                                   key, module_info, delay))
+        except Exception as e:
+            self.log_message(f"按键执行错误: {str(e)}", module=module_info[0] if module_info else None)
+
+    def get_key_delay_range(self, module_info):
+        """获取模块的按键时长范围（毫秒），模块已被删除或没有模块信息时使用默认值"""
+        # 默认延迟
+        delay_min, delay_max = 300, 500
+        if module_info:
+            module_type, module_index = module_info
+            try:
+                if module_type == 'ocr':
+                    delay_min = self.ocr_delay_min
+                    delay_max = self.ocr_delay_max
+                elif module_type == 'timed':
+                    delay_min = self.timed_groups[module_index]['delay_min']
+                    delay_max = self.timed_groups[module_index]['delay_max']
+                elif module_type == 'number':
+                    delay_min = self.number_regions[module_index]['delay_min']
+                    delay_max = self.number_regions[module_index]['delay_max']
+            except (IndexError, KeyError):
+                # 事件排队期间配置已修改，组或区域已不存在
+                pass
+        return delay_min, delay_max
+
+    def start_timed_tasks(self):
+        """开始定时任务，返回启动的定时组数量"""
+        # 停止现有的定时任务
+        self.stop_timed_tasks()
+
+        self.log_message("开始定时任务", module="timed")
+
+        # 本次启动的停止信号
+        self.timed_stop_event = threading.Event()
+        stop_event = self.timed_stop_event
+
+        # 统计要启动的定时组数量
+        start_count = 0
+        for i, group in enumerate(self.timed_groups):
+            if group["enabled"]:
+                interval = max(0.1, group["interval"])
+                key = group["key"]
+                # 由定时调度器统一驱动，立即触发一次后按间隔重复
+                job_id = ("timed", i)
+                self.timer_scheduler.schedule(job_id, interval,
+                                              lambda i=i, key=key: self.timed_task_tick(i, key, stop_event))
+                self.timed_jobs.append(job_id)
+                start_count += 1
+
+        if start_count == 0:
+            self.log_message("没有启用任何定时组", module="timed")
+        return start_count
+
+    def stop_timed_tasks(self):
+        """停止定时任务"""
+        # 停止所有定时任务
+        self.log_message("停止所有定时任务", module="timed")
+        self.timed_stop_event.set()
+
+        # 取消调度器中的定时任务
+        if self.timed_jobs:
+            self.log_message(f"停止{len(self.timed_jobs)}个定时任务", module="timed")
+            for job_id in self.timed_jobs:
+                self.timer_scheduler.cancel(job_id)
+            self.timed_jobs.clear()
+
+        # 丢弃尚未执行的定时按键
+        self.discard_events("timed")
+
+        self.log_message("已停止定时任务", module="timed")
+
+    def timed_task_tick(self, group_index, key, stop_event):
+        """定时任务单次触发，由定时调度器调用"""
+        if stop_event.is_set():
+            return
+
+        # 定时组被禁用或删除时取消任务
+        timed_groups = self.timed_groups
+        if group_index >= len(timed_groups) or not timed_groups[group_index]["enabled"]:
+            self.timer_scheduler.cancel(("timed", group_index))
+            return
+
+        try:
+            # 播放定时模块报警声音
+            self.play_alarm_sound(timed_groups[group_index]["alarm"])
+
+            # 只有当按键不为空时才执行按键操作
+            if key:
+                self.add_event(('keypress', key), ('timed', group_index), time.perf_counter())
+                self.log_message(f"定时任务{group_index+1}触发按键: {key}", module="timed")
+            else:
+                self.log_message(f"定时任务{group_index+1}按键配置为空，仅执行报警操作", module="timed")
+        except Exception as e:
+            self.log_message(f"定时任务{group_index+1}错误: {str(e)}", module="timed")
+            self.timer_scheduler.cancel(("timed", group_index))
 
-# 导入pygame用于音频播放
-try:
-    import pygame
-    pygame.mixer.init()
-    PYGAME_AVAILABLE = True
-except ImportError:
-    PYGAME_AVAILABLE = False
+    def start_number_recognition(self):
+        """开始数字识别，返回启动的区域数量，有启用的区域未选择时返回None"""
+        # 启用的区域必须都已选择
+        for i, region_config in enumerate(self.number_regions):
+            if region_config["enabled"] and not region_config["region"]:
+                self.log_message(f"数字识别区域{i+1}未选择区域，无法开始数字识别", module="number")
+                return None
 
-# 全局版本号配置
-VERSION = "1.2.0"
+        # 停止现有的数字识别任务
+        self.stop_number_recognition()
+
+        self.log_message("开始数字识别", module="number")
+
+        interval = max(0.05, self.number_interval)
+
+        # 本次启动的停止信号，旧的识别任务收到信号后不再触发按键
+        self.number_stop_event = threading.Event()
+        stop_event = self.number_stop_event
+
+        # 每次启动重新开始自适应间隔和按键计时
+        self.number_pollers = {}
+        self.number_last_trigger = {}
+
+        # 统计要启动的数字识别区域数量
+        start_count = 0
+        for i, region_config in enumerate(self.number_regions):
+            if region_config["enabled"]:
+                region = region_config["region"]
+                threshold = region_config["threshold"]
+                key = region_config["key"]
+                self.capture_scheduler.register(("number", i), region)
+                # 所有区域使用相同的触发时间，同一周期共用一次截图
+                job_id = ("number", i)
+                self.timer_scheduler.schedule(job_id, interval,
+                                              lambda i=i, r=region, t=threshold, k=key: self.submit_number_tick(i, r, t, k, stop_event))
+                self.number_jobs.append(job_id)
+                start_count += 1
+
+        if start_count == 0:
+            self.log_message("没有启用任何数字识别区域", module="number")
+        elif self.number_adaptive:
+            self.log_message(f"自适应识别间隔: {self.number_interval_min}-{interval}秒", module="number")
+        return start_count
+
+    def stop_number_recognition(self):
+        """停止数字识别"""
+        self.number_stop_event.set()
+
+        # 取消调度器中的数字识别任务
+        if self.number_jobs:
+            self.log_message(f"停止{len(self.number_jobs)}个数字识别任务", module="number")
+            for job_id in self.number_jobs:
+                self.timer_scheduler.cancel(job_id)
+            self.number_jobs.clear()
+
+            # 等待正在进行的识别结束
+            with self.number_busy_lock:
+                futures = list(self.number_futures)
+            done, not_done = futures_wait(futures, timeout=0.5)
+            if not_done:
+                self.log_message(f"{len(not_done)}个数字识别正在完成当前识别，结束后自动退出", module="number")
+            self.log_message(f"OCR引擎统计: {self.ocr_engine.format_stats()}", module="number")
+            self.log_message(f"画面变化检测统计: {self.frame_detector.format_stats()}", module="number")
+            if self.digit_templates_enabled:
+                self.log_message(f"数字模板识别统计: {self.format_digit_template_stats()}", module="number")
+            self.log_message(f"截图统计: {self.capture_scheduler.format_stats()}", module="number")
+            for region_index, poller in sorted(self.number_pollers.items()):
+                self.log_message(f"数字识别区域{region_index+1}自适应间隔: {poller.format_stats()}", module="number")
+
+        # 移除数字识别区域的截图登记
+        for i in range(len(self.number_regions)):
+            self.capture_scheduler.unregister(("number", i))
+
+        # 丢弃尚未执行的数字识别按键
+        self.discard_events("number")
+
+        self.log_message("已停止数字识别", module="number")
+
+    def get_number_poller(self, region_index):
+        """获取数字识别区域的自适应间隔控制器"""
+        poller = self.number_pollers.get(region_index)
+        if poller is None:
+            poller = self.number_pollers.setdefault(
+                region_index, AdaptivePoller(self.number_interval_min, max(0.05, self.number_interval)))
+        return poller
+
+    def format_polling_stats(self):
+        """格式化自适应识别间隔的实际频率，未开启自适应的模块不显示"""
+        parts = []
+        if self.ocr_adaptive and self.is_running:
+            parts.append(f"文字识别: {self.ocr_poller.format_stats()}")
+        if self.number_adaptive and self.number_jobs:
+            for region_index, poller in sorted(self.number_pollers.items()):
+                parts.append(f"数字识别区域{region_index+1}: {poller.format_stats()}")
+        return " | ".join(parts)
+
+    def submit_number_tick(self, region_index, region, threshold, key, stop_event):
+        """将一次数字识别提交到线程池，由定时调度器调用
+        上一次识别尚未完成时跳过本周期
+        """
+        if stop_event.is_set():
+            return
+        with self.number_busy_lock:
+            if region_index in self.number_busy:
+                return
+            self.number_busy.add(region_index)
+
+        def run():
+            try:
+                self.number_recognition_tick(region_index, region, threshold, key, stop_event)
+            finally:
+                with self.number_busy_lock:
+                    self.number_busy.discard(region_index)
+
+        with self.number_busy_lock:
+            future = self.number_executor.submit(run)
+            self.number_futures.add(future)
+        future.add_done_callback(self._discard_number_future)
+
+    def resize_number_executor(self):
+        """按OCR池大小调整数字识别线程池，每个区域同时只有一次识别，
+        区域较多时可同时识别的区域数随OCR池扩大，而不是固定为4个
+        """
+        workers = max(4, self.ocr_engine.pool_size)
+        if workers == self.number_workers:
+            return
+        with self.number_busy_lock:
+            old_executor = self.number_executor
+            self.number_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="number")
+            self.number_workers = workers
+        if old_executor is not None:
+            # 正在进行的识别完成后旧线程自行退出
+            old_executor.shutdown(wait=False)
+
+    def _discard_number_future(self, future):
+        with self.number_busy_lock:
+            self.number_futures.discard(future)
+
+    def number_recognition_tick(self, region_index, region, threshold, key, stop_event):
+        """单次数字识别"""
+        job_id = ("number", region_index)
+
+        # 已停止或数字识别区域被禁用时不再执行
+        if stop_event.is_set():
+            return
+        number_regions = self.number_regions
+        if region_index >= len(number_regions) or not number_regions[region_index]["enabled"]:
+            self.timer_scheduler.cancel(job_id)
+            return
+
+        try:
+            # 截图并识别数字
+            detect_time = time.perf_counter()
+            screenshot = self.take_screenshot(region, job_id)
+            capture_done = time.perf_counter()
+            self.latency.record("number", region_index, "capture", (capture_done - detect_time) * 1000)
+
+            # 转换为灰度图像，画面比较和识别都使用灰度图像
+            screenshot = screenshot.convert('L')
+            self.latency.record("number", region_index, "grayscale", (time.perf_counter() - capture_done) * 1000)
+
+            # 画面未变化时复用上一次的识别和解析结果
+            frame_key = ("number", region_index, region)
+            hit, cached = self.frame_detector.lookup(frame_key, screenshot)
+            if hit:
+                text, number = cached
+                self.log_debug("数字识别{0}结果(画面未变化): '{1}'", region_index + 1, text, module="number")
+            else:
+                ocr_start = time.perf_counter()
+                try:
+                    text = self.ocr_number(screenshot, region_index, stop_event)
+                except OCRTimeout:
+                    text = self.record_ocr_timeout("number", region_index)
+                ocr_done = time.perf_counter()
+                ocr_ms = (ocr_done - ocr_start) * 1000
+                self.latency.record("number", region_index, "ocr", ocr_ms)
+                self.log_message(f"数字识别{region_index+1}结果: '{text}'（耗时{ocr_ms:.0f}ms）", module="number")
+
+                number = self.parse_number(text)
+                self.latency.record("number", region_index, "parse", (time.perf_counter() - ocr_done) * 1000)
+                self.frame_detector.store(frame_key, (text, number))
+
+            # 自适应模式下按画面是否变化、数字是否接近阈值决定下一次识别时间
+            if self.number_adaptive:
+                near = number is not None and threshold <= number <= threshold * (1 + self.number_near_ratio)
+                self.timer_scheduler.postpone(job_id, self.get_number_poller(region_index).update(not hit, near))
+
+            # 识别期间已停止时不再触发按键
+            if stop_event.is_set():
+                return
+
+            if number is not None:
+                self.log_message(f"数字识别{region_index+1}解析结果: {number}", module="number")
+                if number < threshold:
+                    # 播放数字识别模块报警声音
+                    self.play_alarm_sound(number_regions[region_index]["alarm"])
+
+                    # 只有当按键不为空时才执行按键操作
+                if key:
+                    # 自适应模式下识别更频繁，按键频率仍不超过识别间隔的设置
+                    now = time.monotonic()
+                    if self.number_adaptive and now - self.number_last_trigger.get(region_index, float('-inf')) < self.number_interval:
+                        self.log_debug("数字识别{0}距上次按键不足{1}秒，跳过按键", region_index + 1, self.number_interval,
+                                       module="number")
+                    else:
+                        self.number_last_trigger[region_index] = now
+                        self.add_event(('keypress', key), ('number', region_index), detect_time)
+                        self.log_message(f"数字识别{region_index+1}触发按键: {key}", module="number")
+                else:
+                    self.log_message(f"数字识别{region_index+1}按键配置为空，仅执行报警操作", module="number")
+        except OCRCancelled:
+            self.log_debug("数字识别{0}已停止，取消本次识别", region_index + 1, module="number")
+        except Exception as e:
+            self.log_message(f"数字识别{region_index+1}错误: {str(e)}", module="number")
+            # 出错后暂停5秒再继续
+            self.timer_scheduler.postpone(job_id, 5)
+
+    def parse_number(self, text):
+        """解析数字，支持X/Y格式
+        详细日志使用调试级别，需要排查问题时在日志标签页切换到debug
+        """
+        # 打印当前识别到的文字内容
+        self.log_debug("数字识别解析: 当前文字内容为 '{0}'", text, module="number")
+
+        # 移除可能的空格和换行符
+        text = text.strip()
+
+        # 检查是否为X/Y格式
+        if '/' in text:
+            self.log_debug("数字识别解析: 检测到X/Y格式文字 '{0}'", text, module="number")
+            parts = text.split('/')
+            self.log_debug("数字识别解析: 分割结果为 {0}", parts, module="number")
+
+            if len(parts) == 2:
+                # 尝试解析X部分
+                x_part = parts[0].strip()
+                self.log_debug("数字识别解析: 尝试解析X部分 '{0}'", x_part, module="number")
+                try:
+                    x_number = int(x_part)
+                    self.log_debug("数字识别解析: 成功解析X部分为 {0}", x_number, module="number")
+                    return x_number
+                except ValueError as e:
+                    self.log_debug("数字识别解析: 无法解析X部分 '{0}'，错误: {1}", x_part, e, module="number")
+                    # 尝试清理X部分，移除非数字字符
+                    cleaned_x = ''.join(filter(str.isdigit, x_part))
+                    if cleaned_x:
+                        self.log_debug("数字识别解析: 清理后X部分为 '{0}'", cleaned_x, module="number")
+                        try:
+                            return int(cleaned_x)
+                        except ValueError:
+                            self.log_debug("数字识别解析: 清理后仍无法解析X部分 '{0}'", cleaned_x, module="number")
+        else:
+            self.log_debug("数字识别解析: 未检测到X/Y格式，尝试直接解析数字 '{0}'", text, module="number")
+
+        # 尝试直接解析为数字
+        try:
+            # 清理文字，移除非数字字符
+            cleaned_text = ''.join(filter(str.isdigit, text))
+            if cleaned_text:
+                self.log_debug("数字识别解析: 清理后文字为 '{0}'", cleaned_text, module="number")
+                number = int(cleaned_text)
+                self.log_debug("数字识别解析: 成功解析为数字 {0}", number, module="number")
+                return number
+            else:
+                self.log_debug("数字识别解析: 清理后无数字字符", module="number")
+                return None
+        except ValueError as e:
+            self.log_debug("数字识别解析: 无法直接解析为数字，错误: {0}", e, module="number")
+            return None
+
+    def take_screenshot(self, region, key=None):
+        """截取指定区域的屏幕，同一周期内多个区域共用一次截图，key为使用方，同一使用方每次都拿到新截图"""
+        return self.capture_scheduler.grab(region, key)
+
+    def grab_screen(self, bbox):
+        """实际执行截图，bbox为(left, top, right, bottom)"""
+        backend = self.capture_backend
+        try:
+            return backend.grab(bbox)
+        except Exception as e:
+            if isinstance(backend, (ImageGrabBackend, FileReplayBackend)):
+                raise
+            # 高速截图后端不可用时回退到ImageGrab
+            self.log_message(f"{backend.name}截图失败，回退到ImageGrab: {str(e)}")
+            self.capture_backend = ImageGrabBackend()
+            backend.close()
+            return self.capture_backend.grab(bbox)
+
+    def set_capture_backend(self, name):
+        """切换截图后端"""
+        if name == self.capture_backend_name:
+            return
+        try:
+            backend = create_capture_backend(name)
+        except Exception as e:
+            self.log_message(f"截图后端创建失败: {str(e)}")
+            return
+        old_backend = self.capture_backend
+        self.capture_backend = backend
+        self.capture_backend_name = name
+        old_backend.close()
+        self.log_message(f"截图后端: {backend.name}")
+
+    def get_input_backend(self):
+        """返回输入注入后端，尚未创建时按当前名称创建，创建失败时使用pyautogui"""
+        with self.input_backend_lock:
+            if self.input_backend is None:
+                try:
+                    self.input_backend = create_input_backend(self.input_backend_name)
+                except Exception as e:
+                    self.log_message(f"输入后端创建失败，使用pyautogui: {str(e)}")
+                    self.input_backend = PyAutoGUIBackend()
+                self.log_message(f"输入后端: {self.input_backend.name}")
+            return self.input_backend
+
+    def set_input_backend(self, name):
+        """切换输入注入后端"""
+        if name == self.input_backend_name:
+            return
+        try:
+            backend = create_input_backend(name)
+        except Exception as e:
+            self.log_message(f"输入后端创建失败: {str(e)}")
+            return
+        with self.input_backend_lock:
+            old_backend = self.input_backend
+            self.input_backend = backend
+            self.input_backend_name = name
+        if old_backend is not None:
+            old_backend.close()
+        self.log_message(f"输入后端: {backend.name}")
+
+    def benchmark_capture(self):
+        """在后台测试各截图后端的速度"""
+        region = self.selected_region or (0, 0, 400, 200)
+
+        def run():
+            results = benchmark_capture_backends(normalize_region(region))
+            for name, result in results.items():
+                if "error" in result:
+                    self.log_message(f"截图后端{name}测试失败: {result['error']}")
+                else:
+                    self.log_message(f"截图后端{name}: 平均{result['avg_ms']:.1f}ms, "
+                                     f"最快{result['min_ms']:.1f}ms, 约{result['fps']:.0f}帧/秒")
+
+        self.log_message("开始测试截图后端速度...")
+        threading.Thread(target=run, daemon=True).start()
+
+    def record_ocr_timeout(self, module, region_index):
+        """记录一次识别超时，返回空的识别结果
+        超时的画面按空结果保存到画面变化检测中，画面不变时不再重复交给Tesseract
+        """
+        self.latency.record(module, region_index, "ocr_timeout", self.ocr_timeout * 1000)
+        name = "文字识别" if module == "ocr" else f"数字识别{region_index+1}"
+        self.log_message(f"{name}超过{self.ocr_timeout}秒未完成，已终止本次识别（累计超时{self.ocr_engine.timeout_count}次）",
+                         level=logging.WARNING, module=module)
+        return ""
+
+    def preprocess_image(self, module, region_index, image, options):
+        """按区域配置预处理截图并记录耗时，未启用预处理时原样返回"""
+        if not options['enabled']:
+            return image
+        start_time = time.perf_counter()
+        image = self.preprocessor.process((module, region_index), image, options)
+        self.latency.record(module, region_index, "preprocess", (time.perf_counter() - start_time) * 1000)
+        return image
+
+    def get_digit_recognizer(self, region_index):
+        """获取数字识别区域的模板识别器"""
+        recognizer = self.digit_recognizers.get(region_index)
+        if recognizer is None:
+            recognizer = self.digit_recognizers.setdefault(region_index, DigitTemplateRecognizer())
+        return recognizer
+
+    def format_digit_template_stats(self):
+        """格式化所有数字识别区域的模板识别统计"""
+        recognizers = list(self.digit_recognizers.values())
+        hits = sum(recognizer.hits for recognizer in recognizers)
+        fallbacks = sum(recognizer.fallbacks for recognizer in recognizers)
+        return f"命中{hits}次, 回退Tesseract{fallbacks}次"
+
+    def ocr_number(self, image, region_index=None, stop_event=None):
+        """识别数字，支持X/Y格式
+        优先使用数字模板识别，置信度不足时使用Tesseract并用其结果学习模板；
+        简化图像预处理，保留字符白名单以避免'ee'错误识别
+
+        Args:
+            image: 数字区域截图
+            region_index: 数字识别区域序号，每个区域单独学习模板和配置预处理
+            stop_event: 停止信号，设置后取消正在进行的Tesseract识别
+
+        Raises:
+            OCRTimeout: Tesseract识别超过ocr_timeout秒
+            OCRCancelled: stop_event被设置
+        """
+        # 1. 转换为灰度图像
+        image = image.convert('L')
+
+        # 数字模板识别，亚毫秒级完成；定期仍交给Tesseract核对
+        recognizer = None
+        template_text = None
+        if self.digit_templates_enabled:
+            recognizer = self.get_digit_recognizer(region_index)
+            template_text = recognizer.recognize(image)
+            if template_text is not None and recognizer.hits % self.digit_verify_interval != 0:
+                return template_text
+
+        # 2. 默认不做预处理，保留更多原始信息；区域开启预处理时，
+        # 交给Tesseract的是裁剪、缩放并二值化后的白底黑字图像
+
+        # 3. 优化OCR配置，平衡识别率和错误率
+        # 使用--psm 7（单行文本）和--oem 3（默认OCR引擎模式）
+        # 添加字符白名单，只识别数字和/符号，防止'ee'错误
+        config = '--psm 7 --oem 3 -c tessedit_char_whitelist=0123456789/'
+
+        # 数字在少数几个值之间循环，优先使用缓存的识别结果，命中时也省去预处理
+        if region_index is not None and region_index < len(self.number_regions):
+            preprocess = self.number_regions[region_index]['preprocess']
+        else:
+            preprocess = ImagePreprocessor.normalize_options(None)
+        cache_key = OCRResultCache.make_key(image, 'eng', config + ImagePreprocessor.signature(preprocess))
+        text = self.ocr_cache.get(cache_key)
+        if text is None:
+            ocr_image = self.preprocess_image("number", region_index, image, preprocess)
+            text = self.ocr_engine.image_to_string(ocr_image, lang='eng', config=config, timeout=self.ocr_timeout or None,
+                                                   cancel_event=stop_event)
+            self.ocr_cache.put(cache_key, text)
+
+        # 4. 额外的文本清理，移除可能的换行符和空格
+        text = text.strip().replace('\n', '').replace('\r', '')
+
+        # 用Tesseract的结果核对并学习模板，核对不一致时丢弃已学习的模板
+        if recognizer is not None:
+            if template_text is not None and template_text != text.replace(' ', ''):
+                self.log_message(f"数字模板识别结果'{template_text}'与Tesseract结果'{text}'不一致，重新学习模板",
+                                 level=logging.WARNING, module="number")
+                recognizer.reset()
+            recognizer.learn(image, text)
+
+        return text
+
+    def play_alarm_sound(self, enabled):
+        """播放报警声音
+
+        Args:
+            enabled: 报警开关是否启用
+        """
+        if not PYGAME_AVAILABLE:
+            self.log_message("pygame库未安装，无法播放报警声音")
+            return
+
+        if not enabled:
+            return
+
+        sound_file = self.alarm_sound
+        if not sound_file or not os.path.exists(sound_file):
+            self.log_message("未设置有效的全局报警声音文件")
+            return
+
+        try:
+            pygame.mixer.music.load(sound_file)
+            pygame.mixer.music.set_volume(self.alarm_volume / 100)  # 设置音量
+            pygame.mixer.music.play()
+            self.log_message("报警声音已播放")
+        except Exception as e:
+            self.log_message(f"播放报警声音失败: {str(e)}")
 
-# 尝试导入screeninfo库，如果不可用则提供安装提示
-try:
-    import screeninfo
-except ImportError:
-    screeninfo = None
 
 class AutoDoorOCR:
     def __init__(self):
-        # 禁用PyAutoGUI的故障安全机制，防止鼠标移动到屏幕角落时触发异常
-        pyautogui.FAILSAFE = False
+        startup_timer = StartupTimer()
         
         self.root = tk.Tk()
         self.root.title(f"AutoDoor OCR 识别系统 v{VERSION}")
@@ -45,7 +4008,6 @@ class AutoDoorOCR:
         # 配置参数
         self.ocr_interval = 5
         self.pause_duration = 180
-        self.click_delay = 0.5
         self.custom_key = "equal"
         
         # 关键词配置
@@ -59,28 +4021,21 @@ class AutoDoorOCR:
         
         # 状态变量
         self.selected_region = None
-        self.is_running = False
-        self.is_paused = False
         self.is_selecting = False
-        self.last_trigger_time = 0
         
         # 配置文件路径
         self.config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "autodoor_config.json")
+        self.config_writer = None
+        self.pending_save_id = None
         
         # 日志文件路径
         self.log_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "autodoor.log")
+        # 日志标签页保留的最大日志条数
+        self.log_view_capacity = 5000
         
-        # 线程控制
-        self.ocr_thread = None
-        self.timed_threads = []
-        self.number_threads = []
-        
-        # 事件队列
-        self.event_queue = deque()
-        self.event_lock = threading.Lock()
-        self.event_cond = threading.Condition(self.event_lock)
-        self.is_event_running = False
-        self.event_thread = None
+        # 运行引擎，识别、定时、按键等逻辑都在引擎中执行，界面只负责编辑配置并下发给引擎
+        self.engine = AutoDoorEngine(self.config_file, self.log_file, ui_log_capacity=self.log_view_capacity)
+        startup_timer.mark("引擎初始化")
         
         # 定时功能相关
         self.timed_enabled_var = None
@@ -91,10 +4046,6 @@ class AutoDoorOCR:
         self.number_regions = []
         self.current_number_region = None
         
-        # 初始化Tesseract相关变量
-        self.tesseract_path = ""
-        self.tesseract_available = False
-        
         # 报警功能相关
         self.alarm_enabled = {}
         self.alarm_sound = tk.StringVar(value="")  # 全局报警声音
@@ -111,208 +4062,66 @@ class AutoDoorOCR:
         
         # 先创建界面元素，确保所有UI变量都被初始化
         self.create_widgets()
+        startup_timer.mark("创建界面")
         
-        # 加载配置（包括Tesseract路径和报警设置）
-        self.load_config()
-        
-        # 如果配置中没有Tesseract路径，使用项目自带的tesseract
-        config_updated = False
-        if not self.tesseract_path:
-            self.tesseract_path = self.get_default_tesseract_path()
-            config_updated = True
-        
-        # 如果配置中没有报警声音路径，使用项目自带的alarm.mp3
-        if not self.alarm_sound.get():
-            self.alarm_sound.set(self.get_default_alarm_sound_path())
-            config_updated = True
-        
-        # 执行Tesseract引擎的存在性检测和可用性验证
-        self.tesseract_available = self.check_tesseract_availability()
-        
-        # 如果使用了默认Tesseract路径，将其保存到配置文件
-        if config_updated:
-            self.save_config()
-        
-        # 检查tesseract可用性
-        if not self.tesseract_available:
-            messagebox.showwarning("警告", "未检测到Tesseract OCR引擎，请先安装并配置环境变量！")
-            self.status_var.set("Tesseract未安装")
-        
-        # 设置配置监听器
-        self.setup_config_listeners()
-        
-        # 启动事件处理线程
-        self.start_event_thread()
-    
-
-    
-    def get_default_tesseract_path(self):
-        """获取默认的Tesseract路径，使用项目自带的tesseract
-        支持Windows和Mac平台，同时支持打包后的环境
-        """
+        # 主线程定期批量刷新界面日志
+        self.flush_log_ui()
         
-        # 获取程序运行目录
-        if hasattr(sys, '_MEIPASS'):
-            # 打包后的环境，使用_MEIPASS获取运行目录
-            app_root = sys._MEIPASS
-        else:
-            # 开发环境，使用当前文件所在目录
-            app_root = os.path.dirname(os.path.abspath(__file__))
+        # 配置写入器，合并频繁的保存请求并原子写入
+        self.config_writer = ConfigWriter(self.config_file, log_callback=self.log_message)
         
-        # 根据操作系统选择不同的tesseract路径
-        tesseract_path = ""
-        if platform.system() == "Windows":
-            # Windows平台
-            tesseract_path = os.path.join(app_root, "tesseract", "tesseract.exe")
-        elif platform.system() == "Darwin":
-            # macOS平台
-            # 检查可能的路径
-            possible_paths = [
-                os.path.join(app_root, "tesseract", "tesseract"),  # 主要路径
-                os.path.join(app_root, "tesseract"),  # 备选路径
-                os.path.join(os.path.dirname(app_root), "tesseract", "tesseract")  # 应用包外部路径
-            ]
-            
-            for path in possible_paths:
-                if os.path.exists(path):
-                    tesseract_path = path
-                    break
-        else:
-            # 其他平台，返回空
-            tesseract_path = ""
+        # 加载配置（包括Tesseract路径和报警设置）
+        self.load_config()
         
-        self.log_message(f"默认Tesseract路径: {tesseract_path}")
-        return tesseract_path
-    
-    def get_default_alarm_sound_path(self):
-        """获取默认的报警声音路径，使用项目自带的alarm.mp3
-        支持Windows和Mac平台，同时支持打包后的环境
-        """
+        # 如果配置中没有Tesseract路径，使用项目自带的tesseract
+        config_updated = False
+        if not self.engine.tesseract_path:
+            self.engine.set_tesseract_path(self.engine.get_default_tesseract_path())
+            config_updated = True
         
-        # 获取程序运行目录
-        if hasattr(sys, '_MEIPASS'):
-            # 打包后的环境，使用_MEIPASS获取运行目录
-            app_root = sys._MEIPASS
-        else:
-            # 开发环境，使用当前文件所在目录
-            app_root = os.path.dirname(os.path.abspath(__file__))
+        # 如果配置中没有报警声音路径，使用项目自带的alarm.mp3
+        if not self.alarm_sound.get():
+            self.alarm_sound.set(self.engine.get_default_alarm_sound_path())
+            config_updated = True
         
-        # 构建跨平台的报警声音路径
-        alarm_path = os.path.join(app_root, "voice", "alarm.mp3")
+        # 如果使用了默认Tesseract路径，将其保存到配置文件
+        if config_updated:
+            self.save_config()
         
-        # 确保路径格式正确
-        alarm_path = os.path.normpath(alarm_path)
+        # 将界面配置下发给引擎
+        self.sync_engine()
+        startup_timer.mark("加载配置")
         
-        self.log_message(f"默认报警声音路径: {alarm_path}")
-        return alarm_path
-    
-    def check_tesseract_availability(self):
-        """检查Tesseract OCR是否可用
-        包括：路径有效性验证、版本兼容性检查、基础功能测试
-        """
-        if not self.tesseract_path:
-            self.log_message("Tesseract路径未配置")
-            return False
+        # 在后台执行Tesseract引擎的存在性检测和可用性验证，不阻塞窗口显示
+        self.engine.start_tesseract_probe()
+        self.root.after(100, self.check_tesseract_probe)
         
-        # 1. 路径有效性验证
-        if not os.path.exists(self.tesseract_path):
-            self.log_message(f"Tesseract路径不存在: {self.tesseract_path}")
-            return False
+        # 设置配置监听器
+        self.setup_config_listeners()
         
-        if not os.path.isfile(self.tesseract_path):
-            self.log_message(f"Tesseract路径不是文件: {self.tesseract_path}")
-            return False
+        # 启动事件处理线程和定时调度线程
+        self.engine.start()
         
-        # 根据操作系统检查可执行文件格式和权限
-        if platform.system() == "Windows":
-            if not self.tesseract_path.endswith("tesseract.exe"):
-                self.log_message(f"Tesseract路径不是可执行文件: {self.tesseract_path}")
-                return False
-        elif platform.system() == "Darwin":  # macOS
-            if not os.path.basename(self.tesseract_path) == "tesseract":
-                self.log_message(f"Tesseract路径不是可执行文件: {self.tesseract_path}")
-                return False
-            
-            # 检查并修复macOS上的执行权限
-            if not os.access(self.tesseract_path, os.X_OK):
-                self.log_message(f"Tesseract文件缺少执行权限，尝试修复: {self.tesseract_path}")
-                try:
-                    # 尝试添加执行权限
-                    subprocess.run(["chmod", "+x", self.tesseract_path], 
-                                  capture_output=True, check=True, timeout=5)
-                    self.log_message("成功添加执行权限")
-                except Exception as e:
-                    self.log_message(f"添加执行权限失败: {str(e)}")
-                    return False
-        # 其他平台不做严格检查
+        # 窗口显示后记录启动耗时
+        def log_startup_time():
+            startup_timer.mark("显示窗口")
+            self.log_message(startup_timer.format())
         
-        try:
-            # 2. 版本兼容性检查
-            version_result = subprocess.run(
-                [self.tesseract_path, "--version"],
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=5
-            )
-            
-            # 解析版本信息
-            version_output = version_result.stdout.strip()
-            if "tesseract" in version_output.lower():
-                # 提取版本号，格式类似 "tesseract 5.3.3"
-                version_parts = version_output.split()
-                if len(version_parts) >= 2:
-                    version_str = version_parts[1]
-                    self.log_message(f"检测到Tesseract版本: {version_str}")
-                    
-                    # 检查主要版本号，确保至少是4.x
-                    try:
-                        major_version = int(version_str.split('.')[0])
-                        if major_version < 4:
-                            self.log_message(f"Tesseract版本太旧 ({version_str})，建议使用4.x或更高版本")
-                            return False
-                    except (ValueError, IndexError):
-                        self.log_message(f"无法解析Tesseract版本: {version_str}")
-                        # 继续执行，不因为版本解析失败而直接返回False
-            
-            # 3. 基础功能测试
-            # 配置pytesseract使用找到的路径
-            pytesseract.pytesseract.tesseract_cmd = self.tesseract_path
-            
-            # 创建一个简单的测试图像
-            test_image = Image.new('RGB', (100, 30), color='white')
-            test_image.save('test_tesseract.png')
-            
-            # 尝试执行OCR识别
-            test_result = pytesseract.image_to_string('test_tesseract.png', lang='eng', timeout=5)
-            
-            # 清理测试文件
-            if os.path.exists('test_tesseract.png'):
-                os.remove('test_tesseract.png')
-            
-            # 配置界面中的路径变量
-            if hasattr(self, 'tesseract_path_var'):
-                self.tesseract_path_var.set(self.tesseract_path)
-            
-            self.log_message("Tesseract OCR引擎检测通过")
-            return True
-            
-        except subprocess.TimeoutExpired:
-            self.log_message(f"Tesseract命令执行超时: {self.tesseract_path}")
-            return False
-        except subprocess.CalledProcessError as e:
-            self.log_message(f"Tesseract命令执行失败: {e}")
-            return False
-        except FileNotFoundError:
-            self.log_message(f"Tesseract可执行文件未找到: {self.tesseract_path}")
-            return False
-        except pytesseract.TesseractError as e:
-            self.log_message(f"Tesseract OCR测试失败: {e}")
-            return False
-        except Exception as e:
-            self.log_message(f"Tesseract检测发生未知错误: {str(e)}")
-            return False
+        self.root.after_idle(log_startup_time)
+    
+    def check_tesseract_probe(self):
+        """等待后台的Tesseract检测完成，不可用时提示用户"""
+        if not self.engine.tesseract_probe_done.is_set():
+            self.root.after(100, self.check_tesseract_probe)
+            return
         
+        self.tesseract_path_var.set(self.engine.tesseract_path)
+        if not self.engine.tesseract_available:
+            messagebox.showwarning("警告", "未检测到Tesseract OCR引擎，请先安装并配置环境变量！")
+            self.status_var.set("Tesseract未安装")
+    
+
+    
     def create_widgets(self):
         # 设置全局样式
         style = ttk.Style()
@@ -366,6 +4175,12 @@ class AutoDoorOCR:
         notebook.add(log_frame, text="日志")
         self.create_log_tab(log_frame)
         
+        # 性能标签页
+        self.notebook = notebook
+        self.performance_frame = ttk.Frame(notebook)
+        notebook.add(self.performance_frame, text="性能")
+        self.create_performance_tab(self.performance_frame)
+        
         # 控制按钮区域
         control_frame = ttk.Frame(main_frame, padding="10 5 10 0")
         control_frame.pack(fill=tk.X, pady=(10, 0))
@@ -427,6 +4242,12 @@ class AutoDoorOCR:
         ocr_interval_entry = ttk.Entry(interval_frame, textvariable=self.ocr_interval_var, width=15)
         ocr_interval_entry.pack(fill=tk.X)
         
+        # 自适应间隔：画面变化时按最短间隔识别，画面不变时逐渐放慢到识别间隔，最短间隔在配置文件中设置
+        self.ocr_polling_options = {'interval_min': self.engine.ocr_interval_min}
+        self.ocr_adaptive_var = tk.BooleanVar(value=self.engine.ocr_adaptive)
+        ocr_adaptive_check = ttk.Checkbutton(interval_frame, text="自适应", variable=self.ocr_adaptive_var)
+        ocr_adaptive_check.pack(anchor=tk.W, pady=(5, 0))
+        
         # 暂停时长
         pause_frame = ttk.Frame(row1_frame)
         pause_frame.pack(side=tk.LEFT, padx=(0, 20))
@@ -527,7 +4348,18 @@ class AutoDoorOCR:
         # 关键词输入框
         self.keywords_var = tk.StringVar(value=",".join(self.custom_keywords))
         self.keywords_entry = ttk.Entry(keyword_row, textvariable=self.keywords_var, width=20)
-        self.keywords_entry.pack(side=tk.LEFT)
+        self.keywords_entry.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # 模糊匹配：容忍OCR常见混淆字符（如d00r、rnen）和一个字符的错误
+        self.fuzzy_match_var = tk.BooleanVar(value=self.engine.fuzzy_match)
+        fuzzy_match_check = ttk.Checkbutton(keyword_row, text="模糊匹配", variable=self.fuzzy_match_var)
+        fuzzy_match_check.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # 图像预处理，阈值方式和目标文字高度在配置文件中设置
+        self.ocr_preprocess_options = dict(self.engine.ocr_preprocess)
+        self.ocr_preprocess_var = tk.BooleanVar(value=self.ocr_preprocess_options['enabled'])
+        ocr_preprocess_check = ttk.Checkbutton(keyword_row, text="图像预处理", variable=self.ocr_preprocess_var)
+        ocr_preprocess_check.pack(side=tk.LEFT)
         
         # 语言设置行
         language_row = ttk.Frame(keyword_language_frame)
@@ -588,7 +4420,7 @@ class AutoDoorOCR:
             interval_label = ttk.Label(group_frame, text="间隔(秒):", width=10)
             interval_label.pack(side=tk.LEFT)
             
-            interval_var = tk.IntVar(value=10*(i+1))
+            interval_var = tk.DoubleVar(value=10*(i+1))
             interval_entry = ttk.Entry(group_frame, textvariable=interval_var, width=10)
             interval_entry.pack(side=tk.LEFT, padx=(0, 10))
             
@@ -713,6 +4545,11 @@ class AutoDoorOCR:
             region_label = ttk.Label(row1_frame, textvariable=region_var, width=25)  # 设置固定宽度
             region_label.pack(side=tk.LEFT, padx=(0, 10))
             
+            # 图像预处理开关，阈值方式和目标文字高度在配置文件中设置
+            preprocess_var = tk.BooleanVar(value=False)
+            preprocess_switch = ttk.Checkbutton(row1_frame, text="图像预处理", variable=preprocess_var)
+            preprocess_switch.pack(side=tk.LEFT, padx=(0, 10))
+            
             # 第二行：阈值设置、按键设置、延迟配置、报警开关
             row2_frame = ttk.Frame(region_frame)
             row2_frame.pack(fill=tk.X)
@@ -807,13 +4644,28 @@ class AutoDoorOCR:
                 "key": key_var,
                 "delay_min": delay_min_var,
                 "delay_max": delay_max_var,
-                "alarm": alarm_var
+                "alarm": alarm_var,
+                "preprocess": preprocess_var,
+                "preprocess_options": ImagePreprocessor.normalize_options(None)
             })
         
         # 操作按钮
         action_frame = ttk.Frame(number_frame)
         action_frame.pack(fill=tk.X, pady=(10, 10))
         
+        # 识别间隔，所有区域共用，支持小数
+        ttk.Label(action_frame, text="识别间隔(秒):").pack(side=tk.LEFT)
+        self.number_interval_var = tk.DoubleVar(value=1.0)
+        number_interval_entry = ttk.Entry(action_frame, textvariable=self.number_interval_var, width=6)
+        number_interval_entry.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # 自适应间隔：数字变化或接近阈值时加快识别，最短间隔和接近阈值的比例在配置文件中设置
+        self.number_polling_options = {'interval_min': self.engine.number_interval_min,
+                                       'near_ratio': self.engine.number_near_ratio}
+        self.number_adaptive_var = tk.BooleanVar(value=self.engine.number_adaptive)
+        number_adaptive_check = ttk.Checkbutton(action_frame, text="自适应", variable=self.number_adaptive_var)
+        number_adaptive_check.pack(side=tk.LEFT, padx=(0, 10))
+        
         self.start_number_btn = ttk.Button(action_frame, text="开始数字识别", command=self.start_number_recognition, state="normal")
         self.start_number_btn.pack(side=tk.LEFT, padx=(0, 10))
         
@@ -837,7 +4689,7 @@ class AutoDoorOCR:
         path_frame = ttk.Frame(tesseract_frame)
         path_frame.pack(fill=tk.X, pady=(0, 10))
         
-        self.tesseract_path_var = tk.StringVar(value=self.tesseract_path)
+        self.tesseract_path_var = tk.StringVar(value=self.engine.tesseract_path)
         self.tesseract_path_entry = ttk.Entry(path_frame, textvariable=self.tesseract_path_var)
         self.tesseract_path_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 5))
         
@@ -923,6 +4775,50 @@ class AutoDoorOCR:
         volume_percent_label = ttk.Label(volume_frame, text="%")
         volume_percent_label.pack(side=tk.LEFT)
         
+        # 性能设置
+        performance_frame = ttk.LabelFrame(basic_frame, text="性能设置", padding="10")
+        performance_frame.pack(fill=tk.X, pady=(0, 10))
+        
+        cache_size_label = ttk.Label(performance_frame, text="OCR缓存条数:", width=12, anchor=tk.W)
+        cache_size_label.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.ocr_cache_size_var = tk.IntVar(value=self.engine.ocr_cache_size)
+        cache_size_entry = ttk.Entry(performance_frame, textvariable=self.ocr_cache_size_var, width=8)
+        cache_size_entry.pack(side=tk.LEFT, padx=(0, 20))
+        
+        cache_ttl_label = ttk.Label(performance_frame, text="缓存有效期(秒):")
+        cache_ttl_label.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.ocr_cache_ttl_var = tk.IntVar(value=self.engine.ocr_cache_ttl)
+        cache_ttl_entry = ttk.Entry(performance_frame, textvariable=self.ocr_cache_ttl_var, width=8)
+        cache_ttl_entry.pack(side=tk.LEFT, padx=(0, 20))
+        
+        capture_label = ttk.Label(performance_frame, text="截图后端:")
+        capture_label.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.capture_backend_var = tk.StringVar(value=self.engine.capture_backend_name)
+        capture_combobox = ttk.Combobox(performance_frame, textvariable=self.capture_backend_var,
+                                        values=CAPTURE_BACKENDS, width=10, state="readonly")
+        capture_combobox.pack(side=tk.LEFT, padx=(0, 10))
+        
+        capture_bench_btn = ttk.Button(performance_frame, text="测试速度", command=self.benchmark_capture)
+        capture_bench_btn.pack(side=tk.LEFT, padx=(0, 20))
+        
+        input_label = ttk.Label(performance_frame, text="输入后端:")
+        input_label.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.input_backend_var = tk.StringVar(value=self.engine.input_backend_name)
+        input_combobox = ttk.Combobox(performance_frame, textvariable=self.input_backend_var,
+                                      values=INPUT_BACKENDS, width=10, state="readonly")
+        input_combobox.pack(side=tk.LEFT, padx=(0, 20))
+        
+        # 数字模板识别依赖numpy，未安装时禁用
+        self.digit_templates_var = tk.BooleanVar(value=self.engine.digit_templates_enabled)
+        digit_templates_check = ttk.Checkbutton(performance_frame, text="数字模板识别", variable=self.digit_templates_var)
+        digit_templates_check.pack(side=tk.LEFT)
+        if not NUMPY_AVAILABLE:
+            digit_templates_check.config(state="disabled")
+        
         # 配置管理
         config_frame = ttk.Frame(basic_frame)
         config_frame.pack(fill=tk.X, pady=(0, 10))
@@ -940,21 +4836,138 @@ class AutoDoorOCR:
         log_frame = ttk.Frame(parent, padding="10")
         log_frame.pack(fill=tk.BOTH, expand=True)
         
-        # 日志文本框
-        self.log_text = tk.Text(log_frame, height=20, width=80, font=("Arial", 9), state=tk.DISABLED)
-        self.log_text.pack(fill=tk.BOTH, expand=True, side=tk.LEFT)
-        
-        # 滚动条
-        log_scrollbar = ttk.Scrollbar(log_frame, orient=tk.VERTICAL, command=self.log_text.yview)
-        log_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.log_text.configure(yscrollcommand=log_scrollbar.set)
-        
-        # 清除日志按钮
-        clear_btn = ttk.Button(parent, text="清除日志", command=self.clear_log)
-        clear_btn.pack(side=tk.BOTTOM, pady=5, anchor=tk.E)
+        # 日志视图，只保留最近的日志并只渲染可见行
+        self.log_buffer = LogBuffer(self.log_view_capacity)
+        self.log_view = VirtualLogView(log_frame, self.log_buffer)
+        
+        # 底部：缓存统计和清除日志按钮
+        bottom_frame = ttk.Frame(parent)
+        bottom_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10)
+        
+        self.cache_stats_var = tk.StringVar(value="")
+        cache_stats_label = ttk.Label(bottom_frame, textvariable=self.cache_stats_var, foreground="gray")
+        cache_stats_label.pack(side=tk.LEFT)
+        
+        clear_btn = ttk.Button(bottom_frame, text="清除日志", command=self.clear_log)
+        clear_btn.pack(side=tk.RIGHT, pady=5)
+        
+        # 日志级别
+        self.log_level_var = tk.StringVar(value=self.engine.log_level)
+        log_level_combobox = ttk.Combobox(bottom_frame, textvariable=self.log_level_var,
+                                          values=list(LOG_LEVELS.keys()), width=8, state="readonly")
+        log_level_combobox.pack(side=tk.RIGHT, padx=(0, 10))
+        ttk.Label(bottom_frame, text="日志级别:").pack(side=tk.RIGHT)
+        
+        # 模块筛选
+        self.log_filter_var = tk.StringVar(value="全部")
+        log_filter_combobox = ttk.Combobox(bottom_frame, textvariable=self.log_filter_var,
+                                           values=["全部", "ocr", "timed", "number"], width=8, state="readonly")
+        log_filter_combobox.pack(side=tk.RIGHT, padx=(0, 10))
+        log_filter_combobox.bind("<<ComboboxSelected>>", lambda e: self.log_view.set_module(
+            None if self.log_filter_var.get() == "全部" else self.log_filter_var.get()))
+        ttk.Label(bottom_frame, text="模块:").pack(side=tk.RIGHT)
+        
+        # 定时刷新缓存统计
+        self.update_cache_stats()
     
 
         
+    def create_performance_tab(self, parent):
+        """创建性能标签页，显示识别到按键各阶段的耗时分布"""
+        performance_frame = ttk.Frame(parent, padding="10")
+        performance_frame.pack(fill=tk.BOTH, expand=True)
+        
+        ttk.Label(performance_frame, text="最近1000次的耗时分布（毫秒），每秒刷新", foreground="gray").pack(anchor=tk.W, pady=(0, 5))
+        
+        # 各阶段耗时表格
+        table_frame = ttk.Frame(performance_frame)
+        table_frame.pack(fill=tk.BOTH, expand=True)
+        
+        columns = ("module", "region", "stage", "count", "p50", "p95", "p99", "max")
+        headings = ("模块", "区域", "阶段", "样本数", "p50", "p95", "p99", "最大")
+        self.latency_tree = ttk.Treeview(table_frame, columns=columns, show="headings", height=15)
+        for column, heading in zip(columns, headings):
+            self.latency_tree.heading(column, text=heading)
+            self.latency_tree.column(column, width=70 if column not in ("region", "stage") else 100, anchor=tk.CENTER)
+        
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.latency_tree.yview)
+        self.latency_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.latency_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        # 底部：导出和重置按钮
+        bottom_frame = ttk.Frame(parent)
+        bottom_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=10)
+        
+        # 事件队列统计和自适应识别间隔的实际识别频率
+        self.event_queue_stats_var = tk.StringVar(value="")
+        ttk.Label(bottom_frame, textvariable=self.event_queue_stats_var, foreground="gray").pack(side=tk.LEFT, pady=5)
+        self.polling_stats_var = tk.StringVar(value="")
+        ttk.Label(bottom_frame, textvariable=self.polling_stats_var, foreground="gray").pack(side=tk.LEFT, padx=(10, 0), pady=5)
+        
+        reset_btn = ttk.Button(bottom_frame, text="重置统计", command=self.reset_latency_stats)
+        reset_btn.pack(side=tk.RIGHT, pady=5)
+        
+        export_btn = ttk.Button(bottom_frame, text="导出JSON", command=self.export_latency_stats)
+        export_btn.pack(side=tk.RIGHT, padx=(0, 10), pady=5)
+        
+        # 定时刷新耗时统计
+        self.update_latency_view()
+    
+    def update_latency_view(self):
+        """刷新性能标签页中的耗时分布，标签页不可见时跳过"""
+        if self.notebook.select() == str(self.performance_frame):
+            region_names = {"ocr": "监控区域", "timed": "定时组{0}", "number": "区域{0}"}
+            self.latency_tree.delete(*self.latency_tree.get_children())
+            for row in self.engine.latency.snapshot():
+                region = region_names.get(row['module'], "{0}").format(row['region'] + 1)
+                stage = LatencyRecorder.STAGE_NAMES.get(row['stage'], row['stage'])
+                self.latency_tree.insert("", tk.END, values=(
+                    row['module'], region, stage, row['count'],
+                    f"{row['p50']:.1f}", f"{row['p95']:.1f}", f"{row['p99']:.1f}", f"{row['max']:.1f}"))
+            self.polling_stats_var.set(self.engine.format_polling_stats())
+            self.event_queue_stats_var.set(f"事件队列: {self.engine.format_event_queue_stats()}")
+        self.root.after(1000, self.update_latency_view)
+    
+    def export_latency_stats(self):
+        """导出各阶段耗时分布到JSON文件"""
+        filename = filedialog.asksaveasfilename(
+            title="导出耗时统计",
+            defaultextension=".json",
+            initialfile="autodoor_latency.json",
+            filetypes=[("JSON文件", "*.json"), ("所有文件", "*.*")]
+        )
+        if not filename:
+            return
+        try:
+            self.engine.latency.export_json(filename)
+            self.log_message(f"耗时统计已导出: {filename}")
+        except (IOError, OSError) as e:
+            messagebox.showerror("错误", f"导出耗时统计失败: {str(e)}")
+    
+    def reset_latency_stats(self):
+        """清空耗时统计"""
+        self.engine.latency.reset()
+        self.latency_tree.delete(*self.latency_tree.get_children())
+        self.log_message("已重置耗时统计")
+    
+    def update_cache_stats(self):
+        """刷新日志标签页中的缓存命中统计"""
+        engine = self.engine
+        self.cache_stats_var.set(f"{engine.ocr_cache.format_stats()} | 画面检测: {engine.frame_detector.format_stats()}"
+                                 f" | 数字模板: {engine.format_digit_template_stats()}")
+        self.root.after(2000, self.update_cache_stats)
+    
+    def apply_cache_settings(self):
+        """将界面中的缓存设置应用到OCR缓存"""
+        try:
+            size = self.ocr_cache_size_var.get()
+            ttl = self.ocr_cache_ttl_var.get()
+        except (tk.TclError, ValueError):
+            # 输入框内容不完整时忽略
+            return
+        self.engine.configure_cache(size, ttl)
+    
     def update_axis_inputs(self):
         """根据点击模式更新坐标轴输入状态"""
         mode = self.click_mode_var.get()
@@ -1146,220 +5159,117 @@ class AutoDoorOCR:
     
     def load_config(self):
         """加载配置
-        增强错误处理，能够处理文件不存在、格式错误或路径配置缺失等异常情况
-        确保加载所有前端设置，包括新增功能的相关配置
-        支持新旧配置格式的兼容处理
+        配置文件由引擎读取和解析（兼容旧版平铺格式），界面再根据引擎中的配置更新各控件
         """
-        # 初始化配置加载结果
-        config_loaded = False
-        
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                
-                self.log_message(f"开始加载配置: {self.config_file}")
-                
-                # 获取配置版本，默认为1.0.0
-                config_version = config.get('version', '1.0.0')
-                self.log_message(f"配置版本: {config_version}")
-                
-                # 1. 加载Tesseract配置
-                # 兼容旧格式和新格式
-                tesseract_path = None
-                if 'tesseract' in config and isinstance(config['tesseract'], dict):
-                    # 新格式
-                    tesseract_path = config['tesseract'].get('path')
-                else:
-                    # 旧格式
-                    tesseract_path = config.get('tesseract_path')
-                
-                if tesseract_path and tesseract_path.strip():
-                    temp_path = tesseract_path.strip()
-                    # 检查路径是否存在
-                    if os.path.exists(temp_path):
-                        self.tesseract_path = temp_path
-                        self.log_message(f"从配置文件加载Tesseract路径: {self.tesseract_path}")
-                    else:
-                        self.log_message(f"配置文件中的Tesseract路径不存在: {temp_path}")
-                
-                # 2. 加载基本OCR配置
-                ocr_config = {}
-                if 'ocr' in config and isinstance(config['ocr'], dict):
-                    # 新格式
-                    ocr_config = config['ocr']
-                else:
-                    # 旧格式
-                    ocr_config = {
-                        'interval': config.get('ocr_interval'),
-                        'pause_duration': config.get('pause_duration'),
-                        'selected_region': config.get('selected_region'),
-                        'custom_key': config.get('custom_key'),
-                        'custom_keywords': config.get('custom_keywords'),
-                        'language': config.get('ocr_language')
-                    }
-                
-                # 加载时间间隔
-                if 'interval' in ocr_config and ocr_config['interval'] is not None:
-                    self.ocr_interval = ocr_config['interval']
-                    self.ocr_interval_var.set(self.ocr_interval)
-                
-                if 'pause_duration' in ocr_config and ocr_config['pause_duration'] is not None:
-                    self.pause_duration = ocr_config['pause_duration']
-                    self.pause_duration_var.set(self.pause_duration)
-                
-                # 加载选择区域
-                if 'selected_region' in ocr_config and ocr_config['selected_region'] is not None:
-                    try:
-                        self.selected_region = tuple(ocr_config['selected_region'])
-                        self.region_var.set(f"区域: {self.selected_region[0]},{self.selected_region[1]} - {self.selected_region[2]},{self.selected_region[3]}")
-                        self.start_btn.config(state="normal")
-                    except (TypeError, ValueError):
-                        self.log_message(f"配置文件中的选择区域格式错误: {ocr_config['selected_region']}")
-                
-                # 加载自定义按键
-                if 'custom_key' in ocr_config:
-                    self.custom_key = ocr_config['custom_key']
-                    self.key_var.set(self.custom_key)
-                
-                # 加载关键词
-                if 'custom_keywords' in ocr_config and ocr_config['custom_keywords']:
-                    self.custom_keywords = ocr_config['custom_keywords']
-                    self.keywords_var.set(",".join(self.custom_keywords))
-                
-                # 加载语言设置
-                if 'language' in ocr_config:
-                    self.ocr_language = ocr_config['language']
-                    self.language_var.set(self.ocr_language)
-                
-                # 加载按键延迟配置
-                if 'delay_min' in ocr_config:
-                    self.ocr_delay_min.set(ocr_config['delay_min'])
-                if 'delay_max' in ocr_config:
-                    self.ocr_delay_max.set(ocr_config['delay_max'])
-                
-                # 3. 加载点击模式和坐标配置
-                click_config = {}
-                if 'click' in config and isinstance(config['click'], dict):
-                    # 新格式
-                    click_config = config['click']
-                else:
-                    # 旧格式
-                    click_config = {
-                        'mode': config.get('click_mode'),
-                        'x': config.get('click_x'),
-                        'y': config.get('click_y')
-                    }
-                
-                if 'mode' in click_config:
-                    self.click_mode_var.set(click_config['mode'])
-                if 'x' in click_config and click_config['x'] is not None:
-                    self.x_coord_var.set(click_config['x'])
-                if 'y' in click_config and click_config['y'] is not None:
-                    self.y_coord_var.set(click_config['y'])
-                
-                # 4. 加载定时功能配置
-                timed_config = config.get('timed_key_press', {})
-                if 'groups' in timed_config and isinstance(timed_config['groups'], list):
-                    groups = timed_config['groups']
-                    for i, group in enumerate(groups[:3]):
-                        if i < len(self.timed_groups) and isinstance(group, dict):
-                            if 'enabled' in group:
-                                self.timed_groups[i]['enabled'].set(group['enabled'])
-                            if 'interval' in group:
-                                self.timed_groups[i]['interval'].set(group['interval'])
-                            if 'key' in group:
-                                self.timed_groups[i]['key'].set(group['key'])
-                            if 'delay_min' in group:
-                                self.timed_groups[i]['delay_min'].set(group['delay_min'])
-                            if 'delay_max' in group:
-                                self.timed_groups[i]['delay_max'].set(group['delay_max'])
-                
-                # 5. 加载数字识别配置
-                number_config = config.get('number_recognition', {})
-                if 'regions' in number_config and isinstance(number_config['regions'], list):
-                    regions = number_config['regions']
-                    for i, region_config in enumerate(regions[:2]):
-                        if i < len(self.number_regions) and isinstance(region_config, dict):
-                            if 'enabled' in region_config:
-                                self.number_regions[i]['enabled'].set(region_config['enabled'])
-                            if 'region' in region_config and region_config['region'] is not None:
-                                try:
-                                    region = tuple(region_config['region'])
-                                    self.number_regions[i]['region'] = region
-                                    self.number_regions[i]['region_var'].set(f"区域: {region[0]},{region[1]} - {region[2]},{region[3]}")
-                                except (TypeError, ValueError):
-                                    self.log_message(f"配置文件中的数字识别区域格式错误: {region_config['region']}")
-                            if 'threshold' in region_config:
-                                self.number_regions[i]['threshold'].set(region_config['threshold'])
-                            if 'key' in region_config:
-                                self.number_regions[i]['key'].set(region_config['key'])
-                            if 'delay_min' in region_config:
-                                self.number_regions[i]['delay_min'].set(region_config['delay_min'])
-                            if 'delay_max' in region_config:
-                                self.number_regions[i]['delay_max'].set(region_config['delay_max'])
-                
-                # 6. 加载报警配置
-                alarm_config = config.get('alarm', {})
-                
-                # 加载全局报警声音
-                if 'sound' in alarm_config:
-                    self.alarm_sound.set(alarm_config['sound'])
-                
-                # 加载报警音量
-                if 'volume' in alarm_config:
-                    self.alarm_volume.set(alarm_config['volume'])
-                    self.alarm_volume_str.set(str(alarm_config['volume']))
-                
-                # 加载各模块报警开关状态
-                for module in ["ocr", "timed", "number"]:
-                    module_config = alarm_config.get(module, {})
-                    if 'enabled' in module_config:
-                        self.alarm_enabled[module].set(module_config['enabled'])
-                
-                # 更新界面控件状态
-                self.update_axis_inputs()
-                
-                self.log_message("配置加载成功")
-                config_loaded = True
-                
-            except json.JSONDecodeError as e:
-                self.log_message(f"配置文件格式错误: {self.config_file}，错误详情: {str(e)}")
-            except PermissionError:
-                self.log_message(f"没有权限读取配置文件: {self.config_file}")
-            except IOError as e:
-                self.log_message(f"配置文件IO错误: {str(e)}")
-            except Exception as e:
-                self.log_message(f"配置加载错误: {str(e)}")
-        else:
-            self.log_message(f"配置文件不存在: {self.config_file}")
+        config_loaded = self.engine.load_config_file(self.config_file)
+        if config_loaded:
+            # 配置中的Tesseract路径不存在时使用项目自带的tesseract
+            tesseract_path = self.engine.tesseract_path
+            if tesseract_path and not os.path.exists(tesseract_path):
+                self.log_message(f"配置文件中的Tesseract路径不存在: {tesseract_path}")
+                self.engine.set_tesseract_path("")
+            self.load_widgets_from_engine()
         
         # 无论配置是否加载成功，都更新界面中的Tesseract路径变量
         if hasattr(self, 'tesseract_path_var'):
-            self.tesseract_path_var.set(self.tesseract_path)
+            self.tesseract_path_var.set(self.engine.tesseract_path)
             
         return config_loaded
     
-
+    def load_widgets_from_engine(self):
+        """根据引擎中的配置更新界面控件，界面只显示前几个定时组和数字识别区域"""
+        engine = self.engine
+        
+        # 1. 基本OCR配置
+        self.ocr_interval = engine.ocr_interval
+        self.ocr_interval_var.set(self.ocr_interval)
+        self.ocr_adaptive_var.set(engine.ocr_adaptive)
+        self.ocr_polling_options['interval_min'] = engine.ocr_interval_min
+        self.pause_duration = engine.pause_duration
+        self.pause_duration_var.set(self.pause_duration)
+        self.selected_region = engine.selected_region
+        if self.selected_region:
+            self.region_var.set(f"区域: {self.selected_region[0]},{self.selected_region[1]} - {self.selected_region[2]},{self.selected_region[3]}")
+            self.start_btn.config(state="normal")
+        self.custom_key = engine.custom_key
+        self.key_var.set(self.custom_key)
+        self.custom_keywords = list(engine.custom_keywords)
+        self.keywords_var.set(",".join(self.custom_keywords))
+        self.fuzzy_match_var.set(engine.fuzzy_match)
+        self.ocr_preprocess_options = dict(engine.ocr_preprocess)
+        self.ocr_preprocess_var.set(self.ocr_preprocess_options['enabled'])
+        self.ocr_language = engine.ocr_language
+        self.language_var.set(self.ocr_language)
+        self.ocr_delay_min.set(engine.ocr_delay_min)
+        self.ocr_delay_max.set(engine.ocr_delay_max)
+        
+        # 2. 点击模式和坐标
+        self.click_mode_var.set(engine.click_mode)
+        self.x_coord_var.set(engine.click_x)
+        self.y_coord_var.set(engine.click_y)
+        
+        # 3. 定时功能
+        for group, group_config in zip(self.timed_groups, engine.timed_groups):
+            for option in ('enabled', 'interval', 'key', 'delay_min', 'delay_max', 'alarm'):
+                group[option].set(group_config[option])
+        
+        # 4. 数字识别
+        self.number_interval_var.set(engine.number_interval)
+        self.number_adaptive_var.set(engine.number_adaptive)
+        self.number_polling_options['interval_min'] = engine.number_interval_min
+        self.number_polling_options['near_ratio'] = engine.number_near_ratio
+        for region_config, engine_region in zip(self.number_regions, engine.number_regions):
+            for option in ('enabled', 'threshold', 'key', 'delay_min', 'delay_max', 'alarm'):
+                region_config[option].set(engine_region[option])
+            region = engine_region['region']
+            if region:
+                region_config['region'] = region
+                region_config['region_var'].set(f"区域: {region[0]},{region[1]} - {region[2]},{region[3]}")
+            region_config['preprocess_options'] = dict(engine_region['preprocess'])
+            region_config['preprocess'].set(engine_region['preprocess']['enabled'])
+        
+        # 5. 报警
+        self.alarm_sound.set(engine.alarm_sound)
+        self.alarm_volume.set(engine.alarm_volume)
+        self.alarm_volume_str.set(str(engine.alarm_volume))
+        for module, enabled_var in self.alarm_enabled.items():
+            enabled_var.set(engine.alarm_enabled[module])
+        
+        # 6. 性能和日志
+        self.ocr_cache_size_var.set(engine.ocr_cache_size)
+        self.ocr_cache_ttl_var.set(engine.ocr_cache_ttl)
+        self.capture_backend_var.set(engine.capture_backend_name)
+        self.input_backend_var.set(engine.input_backend_name)
+        self.digit_templates_var.set(engine.digit_templates_enabled)
+        self.log_level_var.set(engine.log_level)
+        
+        # 更新界面控件状态
+        self.update_axis_inputs()
     
     def setup_config_listeners(self):
         """为配置变量添加监听器，自动保存配置"""
-        # 通用的延迟保存函数，避免频繁保存
+        # 通用的延迟保存函数，连续输入时只在停止输入后下发给引擎并保存一次
         def delayed_save(*args):
-            self.root.after(1000, self.save_config)
+            self.schedule_save(1000)
         
-        # 即时保存函数
+        # 开关等单次修改，短延迟后下发给引擎并保存，同时合并连续的多次修改
         def immediate_save(*args):
-            self.save_config()
+            self.schedule_save(100)
         
         # 1. 基本OCR配置监听器
         self.ocr_interval_var.trace_add("write", delayed_save)
         self.pause_duration_var.trace_add("write", delayed_save)
         self.key_var.trace_add("write", immediate_save)
         self.language_var.trace_add("write", immediate_save)
+        self.ocr_delay_min.trace_add("write", delayed_save)
+        self.ocr_delay_max.trace_add("write", delayed_save)
         
         # 2. 关键词配置监听器
         self.keywords_var.trace_add("write", delayed_save)
+        self.fuzzy_match_var.trace_add("write", immediate_save)
+        self.ocr_adaptive_var.trace_add("write", immediate_save)
+        self.number_adaptive_var.trace_add("write", immediate_save)
+        self.ocr_preprocess_var.trace_add("write", immediate_save)
         
         # 3. 点击模式和坐标监听器
         self.click_mode_var.trace_add("write", immediate_save)
@@ -1371,18 +5281,57 @@ class AutoDoorOCR:
             group["enabled"].trace_add("write", immediate_save)
             group["interval"].trace_add("write", delayed_save)
             group["key"].trace_add("write", immediate_save)
+            group["delay_min"].trace_add("write", delayed_save)
+            group["delay_max"].trace_add("write", delayed_save)
+            group["alarm"].trace_add("write", immediate_save)
         
         # 5. 数字识别配置监听器
         for i, region_config in enumerate(self.number_regions):
             region_config["enabled"].trace_add("write", immediate_save)
             region_config["threshold"].trace_add("write", delayed_save)
             region_config["key"].trace_add("write", immediate_save)
+            region_config["delay_min"].trace_add("write", delayed_save)
+            region_config["delay_max"].trace_add("write", delayed_save)
+            region_config["alarm"].trace_add("write", immediate_save)
+            region_config["preprocess"].trace_add("write", immediate_save)
+        self.number_interval_var.trace_add("write", delayed_save)
+        
+        # 6. 性能配置监听器
+        def on_cache_setting_change(*args):
+            self.apply_cache_settings()
+            delayed_save()
+        
+        self.ocr_cache_size_var.trace_add("write", on_cache_setting_change)
+        self.ocr_cache_ttl_var.trace_add("write", on_cache_setting_change)
+        
+        def on_capture_backend_change(*args):
+            self.set_capture_backend(self.capture_backend_var.get())
+            immediate_save()
+        
+        self.capture_backend_var.trace_add("write", on_capture_backend_change)
+        
+        def on_input_backend_change(*args):
+            self.set_input_backend(self.input_backend_var.get())
+            immediate_save()
+        
+        self.input_backend_var.trace_add("write", on_input_backend_change)
+        self.digit_templates_var.trace_add("write", immediate_save)
+        
+        # 7. 日志级别监听器
+        def on_log_level_change(*args):
+            self.set_log_level(self.log_level_var.get())
+            immediate_save()
+        
+        self.log_level_var.trace_add("write", on_log_level_change)
+        
+        # 8. 报警配置监听器
+        self.alarm_sound.trace_add("write", immediate_save)
+        self.alarm_volume.trace_add("write", delayed_save)
     
     def clear_log(self):
         """清除日志"""
-        self.log_text.config(state=tk.NORMAL)
-        self.log_text.delete("1.0", tk.END)
-        self.log_text.config(state=tk.DISABLED)
+        self.log_buffer.clear()
+        self.log_view.render()
         self.log_message("已清除日志")
     
     def set_tesseract_path(self):
@@ -1417,9 +5366,8 @@ class AutoDoorOCR:
             )
             
             # 更新路径和配置
-            self.tesseract_path = new_path
-            pytesseract.pytesseract.tesseract_cmd = new_path
-            self.tesseract_available = True
+            self.engine.set_tesseract_path(new_path)
+            self.engine.tesseract_available = True
             
             self.log_message(f"已设置Tesseract路径: {new_path}")
             self.status_var.set("就绪")
@@ -1432,28 +5380,33 @@ class AutoDoorOCR:
             messagebox.showwarning("警告", "无法使用指定的Tesseract路径！")
             return
         
-    def log_message(self, message):
-        """记录日志信息"""
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] {message}\n"
-        
-        # 写入日志文件
-        try:
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(log_entry)
-        except Exception as e:
-            print(f"写入日志文件失败: {str(e)}")
-        
-        # 只有当log_text已经创建时才写入界面日志
-        if hasattr(self, 'log_text'):
-            self.log_text.config(state=tk.NORMAL)
-            self.log_text.insert(tk.END, log_entry)
-            self.log_text.see(tk.END)
-            self.log_text.config(state=tk.DISABLED)
-        
-        # 更新状态标签（仅当status_var已创建）
-        if hasattr(self, 'status_var'):
-            self.status_var.set(message.split(":")[0] if ":" in message else message)
+    def log_message(self, message, level=logging.INFO, module=None):
+        """记录日志信息，可在任意线程调用，状态标签由主线程在刷新日志时更新"""
+        self.engine.log_message(message, level, module)
+    
+    def set_status(self, status):
+        """更新状态标签，工作线程中调用时由主线程延后刷新"""
+        self.engine.set_status(status)
+    
+    def flush_log_ui(self):
+        """在主线程中批量刷新界面日志和状态标签"""
+        entries = self.engine.logger.drain_ui()
+        if entries:
+            for entry, module in entries:
+                self.log_buffer.append(entry, module)
+            if hasattr(self, 'log_view'):
+                self.log_view.render()
+        
+        status = self.engine.pending_status
+        if status is not None and hasattr(self, 'status_var'):
+            self.engine.pending_status = None
+            self.status_var.set(status)
+        
+        self.root.after(100, self.flush_log_ui)
+    
+    def set_log_level(self, level_name):
+        """设置日志级别"""
+        self.engine.set_log_level(level_name)
     
     def start_region_selection(self):
         """开始区域选择"""
@@ -1471,7 +5424,7 @@ class AutoDoorOCR:
         self.current_number_region = region_index
         
         # 检查screeninfo库是否可用
-        if screeninfo is None:
+        if not screeninfo.available:
             messagebox.showerror("错误", "screeninfo库未安装，无法支持多显示器选择。请运行 'pip install screeninfo' 安装该库。")
             return
         
@@ -1576,7 +5529,11 @@ class AutoDoorOCR:
     
     def start_monitoring(self):
         """开始监控"""
-        if not self.tesseract_available:
+        if not self.engine.tesseract_probe_done.is_set():
+            messagebox.showinfo("提示", "正在检测Tesseract OCR引擎，请稍后再试")
+            return
+        
+        if not self.engine.tesseract_available:
             messagebox.showwarning("警告", "Tesseract OCR引擎不可用，请先安装并配置环境变量！")
             return
             
@@ -1584,410 +5541,206 @@ class AutoDoorOCR:
             messagebox.showwarning("警告", "请先选择监控区域")
             return
         
-        self.is_running = True
-        self.is_paused = False
+        # 使用界面中最新的配置启动
+        self.sync_engine()
+        if not self.engine.start_monitoring():
+            return
         
         # 更新按钮状态
         self.start_btn.config(state="disabled")
         self.stop_btn.config(state="normal")
-        
-        self.log_message("开始监控...")
-        
-        # 启动OCR线程
-        self.ocr_thread = threading.Thread(target=self.ocr_loop, daemon=True)
-        self.ocr_thread.start()
     
     def stop_monitoring(self):
         """停止监控"""
-        self.is_running = False
+        self.engine.stop_monitoring()
         
         # 更新按钮状态
         self.start_btn.config(state="normal")
         self.stop_btn.config(state="disabled")
+    
+    def save_config(self):
+        """保存配置
+        保存所有前端用户设置，包括新增功能的相关配置
+        内容未变化时跳过写入，写入通过临时文件原子替换
+        """
+        # 取消尚未执行的延迟保存
+        if self.pending_save_id is not None:
+            self.root.after_cancel(self.pending_save_id)
+            self.pending_save_id = None
+        
+        try:
+            config = self.build_config()
+        except Exception as e:
+            self.log_message(f"配置保存错误: {str(e)}")
+            return
+        self.engine.apply_config(config)
         
-        self.log_message("已停止监控")
+        # 丢弃后台尚未写入的旧配置，直接写入最新配置
+        self.config_writer.flush()
+        self.config_writer.write(config)
     
-    def ocr_loop(self):
-        """OCR识别循环"""
-        while self.is_running:
-            try:
-                current_time = time.time()
-                
-                # 检查是否需要暂停
-                if self.is_paused:
-                    time.sleep(1)
-                    continue
-                
-                # 检查是否在暂停期
-                pause_duration = self.pause_duration_var.get()
-                if current_time - self.last_trigger_time < pause_duration:
-                    remaining = int(pause_duration - (current_time - self.last_trigger_time))
-                    self.status_var.set(f"暂停中... {remaining}秒")
-                    time.sleep(1)
-                    continue
-                
-                # 执行OCR识别
-                self.perform_ocr()
-                
-                # 等待下一次识别
-                ocr_interval = self.ocr_interval_var.get()
-                for _ in range(ocr_interval):
-                    if not self.is_running:
-                        break
-                    time.sleep(1)
-                    
-            except Exception as e:
-                self.log_message(f"错误: {str(e)}")
-                time.sleep(5)
+    def schedule_save(self, delay=1000):
+        """延迟下发配置并保存，短时间内的多次修改只生成和应用一次配置，写入在后台线程进行"""
+        if self.pending_save_id is not None:
+            self.root.after_cancel(self.pending_save_id)
+        self.pending_save_id = self.root.after(delay, self._save_config_async)
+    
+    def _save_config_async(self):
+        self.pending_save_id = None
+        try:
+            config = self.build_config()
+        except Exception as e:
+            # 输入框内容不完整时，等待下一次修改再保存
+            self.log_message(f"配置保存错误: {str(e)}")
+            return
+        self.engine.apply_config(config)
+        self.config_writer.submit(config)
     
-    def perform_ocr(self):
-        """执行OCR识别"""
+    def sync_engine(self):
+        """将界面中的配置立即下发给引擎，输入框内容不完整时忽略"""
         try:
-            # 截取屏幕区域
-            x1, y1, x2, y2 = self.selected_region
+            config = self.build_config()
+        except (tk.TclError, ValueError):
+            return None
+        self.engine.apply_config(config)
+        return config
+    
+    def build_config(self):
+        """根据界面设置生成完整的配置数据"""
+        # 1. 保存定时功能配置
+        timed_groups_config = []
+        for group in self.timed_groups:
+            timed_groups_config.append({
+                'enabled': group['enabled'].get(),
+                'interval': group['interval'].get(),
+                'key': group['key'].get(),
+                'delay_min': group['delay_min'].get(),
+                'delay_max': group['delay_max'].get(),
+                'alarm': group['alarm'].get()
+            })
+        
+        # 2. 保存数字识别配置
+        number_regions_config = []
+        for region_config in self.number_regions:
+            number_regions_config.append({
+                'enabled': region_config['enabled'].get(),
+                'region': list(region_config['region']) if region_config['region'] else None,
+                'threshold': region_config['threshold'].get(),
+                'key': region_config['key'].get(),
+                'delay_min': region_config['delay_min'].get(),
+                'delay_max': region_config['delay_max'].get(),
+                'alarm': region_config['alarm'].get(),
+                'preprocess': dict(region_config['preprocess_options'], enabled=region_config['preprocess'].get())
+            })
+        
+        # 3. 确保关键词列表是最新的
+        keywords_str = self.keywords_var.get().strip()
+        current_keywords = [keyword.strip().lower() for keyword in keywords_str.split(",") if keyword.strip()]
+        if not current_keywords:
+            current_keywords = self.custom_keywords  # 保留原有关键词作为备份
+        
+        # 更新内部关键词列表，确保一致性
+        self.custom_keywords = current_keywords
+        
+        # 4. 完整的配置数据结构，确保所有配置项都被保存
+        config = {
+            'version': '1.0.1',  # 版本升级，支持更完整的配置保存
+            'last_save_time': datetime.datetime.now().isoformat(),
             
-            # 确保坐标是(left, top, right, bottom)格式，且left < right, top < bottom
-            left = min(x1, x2)
-            top = min(y1, y2)
-            right = max(x1, x2)
-            bottom = max(y1, y2)
+            # 基本OCR配置
+            'ocr': {
+                'interval': self.ocr_interval_var.get(),
+                'adaptive': self.ocr_adaptive_var.get(),
+                'interval_min': self.ocr_polling_options['interval_min'],
+                'pause_duration': self.pause_duration_var.get(),
+                'selected_region': list(self.selected_region) if self.selected_region else None,
+                'custom_key': self.key_var.get(),
+                'custom_keywords': current_keywords,
+                'fuzzy_match': self.fuzzy_match_var.get(),
+                'preprocess': dict(self.ocr_preprocess_options, enabled=self.ocr_preprocess_var.get()),
+                'language': self.language_var.get(),
+                'delay_min': self.ocr_delay_min.get(),
+                'delay_max': self.ocr_delay_max.get()
+            },
             
-            # 使用PIL的ImageGrab.grab()方法，设置all_screens=True捕获所有屏幕
-            screenshot = ImageGrab.grab(bbox=(left, top, right, bottom), all_screens=True)
+            # Tesseract配置
+            'tesseract': {
+                'path': self.engine.tesseract_path
+            },
             
-            # 转换为灰度图像以提高识别率
-            screenshot = screenshot.convert('L')
+            # 坐标模式配置
+            'click': {
+                'mode': self.click_mode_var.get(),
+                'x': self.x_coord_var.get(),
+                'y': self.y_coord_var.get()
+            },
             
-            # 进行OCR识别
-            current_lang = self.language_var.get()
-            text = pytesseract.image_to_string(screenshot, lang=current_lang)
+            # 定时功能配置
+            'timed_key_press': {
+                'groups': timed_groups_config
+            },
             
-            self.log_message(f"识别结果: '{text.strip()}'")
+            # 数字识别配置
+            'number_recognition': {
+                'interval': self.number_interval_var.get(),
+                'adaptive': self.number_adaptive_var.get(),
+                'interval_min': self.number_polling_options['interval_min'],
+                'near_ratio': self.number_polling_options['near_ratio'],
+                'regions': number_regions_config
+            },
             
-            # 检查是否包含关键词
-            lower_text = text.lower()
-            if any(keyword in lower_text for keyword in self.custom_keywords):
-                self.trigger_action()
-                
-        except Exception as e:
-            self.log_message(f"OCR错误: {str(e)}")
-    
-    def save_config(self):
-        """保存配置
-        保存所有前端用户设置，包括新增功能的相关配置
-        确保数据结构完整、一致，并处理边界情况
-        """
-        try:
-            # 1. 保存定时功能配置
-            timed_groups_config = []
-            for group in self.timed_groups:
-                timed_groups_config.append({
-                    'enabled': group['enabled'].get(),
-                    'interval': group['interval'].get(),
-                    'key': group['key'].get(),
-                    'delay_min': group['delay_min'].get(),
-                    'delay_max': group['delay_max'].get()
-                })
-            
-            # 2. 保存数字识别配置
-            number_regions_config = []
-            for region_config in self.number_regions:
-                number_regions_config.append({
-                    'enabled': region_config['enabled'].get(),
-                    'region': list(region_config['region']) if region_config['region'] else None,
-                    'threshold': region_config['threshold'].get(),
-                    'key': region_config['key'].get(),
-                    'delay_min': region_config['delay_min'].get(),
-                    'delay_max': region_config['delay_max'].get()
-                })
-            
-            # 3. 确保关键词列表是最新的
-            keywords_str = self.keywords_var.get().strip()
-            current_keywords = [keyword.strip().lower() for keyword in keywords_str.split(",") if keyword.strip()]
-            if not current_keywords:
-                current_keywords = self.custom_keywords  # 保留原有关键词作为备份
-            
-            # 更新内部关键词列表，确保一致性
-            self.custom_keywords = current_keywords
-            
-            # 4. 完整的配置数据结构，确保所有配置项都被保存
-            config = {
-                'version': '1.0.1',  # 版本升级，支持更完整的配置保存
-                'last_save_time': datetime.datetime.now().isoformat(),
-                
-                # 基本OCR配置
+            # 报警功能配置
+            'alarm': {
+                'sound': self.alarm_sound.get(),
+                'volume': self.alarm_volume.get(),
                 'ocr': {
-                    'interval': self.ocr_interval_var.get(),
-                    'pause_duration': self.pause_duration_var.get(),
-                    'selected_region': list(self.selected_region) if self.selected_region else None,
-                    'custom_key': self.key_var.get(),
-                    'custom_keywords': current_keywords,
-                    'language': self.language_var.get(),
-                    'delay_min': self.ocr_delay_min.get(),
-                    'delay_max': self.ocr_delay_max.get()
-                },
-                
-                # Tesseract配置
-                'tesseract': {
-                    'path': self.tesseract_path
+                    'enabled': self.alarm_enabled['ocr'].get()
                 },
-                
-                # 坐标模式配置
-                'click': {
-                    'mode': self.click_mode_var.get(),
-                    'x': self.x_coord_var.get(),
-                    'y': self.y_coord_var.get()
-                },
-                
-                # 定时功能配置
-                'timed_key_press': {
-                    'groups': timed_groups_config
-                },
-                
-                # 数字识别配置
-                'number_recognition': {
-                    'regions': number_regions_config
+                'timed': {
+                    'enabled': self.alarm_enabled['timed'].get()
                 },
-                
-                # 报警功能配置
-                'alarm': {
-                    'sound': self.alarm_sound.get(),
-                    'volume': self.alarm_volume.get(),
-                    'ocr': {
-                        'enabled': self.alarm_enabled['ocr'].get()
-                    },
-                    'timed': {
-                        'enabled': self.alarm_enabled['timed'].get()
-                    },
-                    'number': {
-                        'enabled': self.alarm_enabled['number'].get()
-                    }
+                'number': {
+                    'enabled': self.alarm_enabled['number'].get()
                 }
-            }
-            
-            # 5. 确保配置文件目录存在
-            os.makedirs(os.path.dirname(self.config_file), exist_ok=True)
-            
-            # 6. 写入配置文件，使用更紧凑的格式
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2, ensure_ascii=False, default=str)
-            
-            self.log_message("配置已保存")
-            
-        except PermissionError:
-            self.log_message(f"没有权限写入配置文件: {self.config_file}")
-        except IOError as e:
-            self.log_message(f"配置文件IO错误: {str(e)}")
-        except json.JSONDecodeError as e:
-            self.log_message(f"配置JSON编码错误: {str(e)}")
-        except Exception as e:
-            self.log_message(f"配置保存错误: {str(e)}")
-    
-    def trigger_action(self):
-        """触发动作序列"""
-        self.log_message("检测到关键词，执行动作...")
-        
-        # 播放OCR模块报警声音
-        self.play_alarm_sound(self.alarm_enabled["ocr"])
-        
-        # 获取自定义按键
-        custom_key = self.key_var.get()
-        
-        # 只有当按键不为空时才执行按键操作
-        if custom_key:
-            # 计算点击位置
-            click_x, click_y = self.calculate_click_position()
-            
-            try:
-                # 1. 鼠标左键点击指定位置
-                pyautogui.click(click_x, click_y)
-                self.log_message(f"点击位置: ({click_x}, {click_y})")
-                
-                # 2. 等待固定时间（无需用户修改）
-                time.sleep(self.click_delay)
-                
-                # 3. 通过事件队列按下自定义按键
-                self.add_event(('keypress', custom_key), ('ocr', 0))
-                
-                # 记录触发时间
-                self.last_trigger_time = time.time()
-                
-            except Exception as e:
-                self.log_message(f"动作执行错误: {str(e)}")
-        else:
-            self.log_message("按键配置为空，仅执行报警操作")
-    
-    def calculate_click_position(self):
-        """计算点击位置"""
-        mode = self.click_mode_var.get()
-        
-        if mode == "custom":
-            # 使用自定义坐标（相对于选择区域左上角）
-            x_offset = self.x_coord_var.get()
-            y_offset = self.y_coord_var.get()
+            },
             
-            # 计算实际屏幕坐标
-            click_x = self.selected_region[0] + x_offset
-            click_y = self.selected_region[1] + y_offset
+            # 性能配置
+            'performance': {
+                'ocr_cache_size': self.ocr_cache_size_var.get(),
+                'ocr_cache_ttl': self.ocr_cache_ttl_var.get(),
+                'capture_backend': self.capture_backend_var.get(),
+                'input_backend': self.input_backend_var.get(),
+                'digit_templates': self.digit_templates_var.get(),
+                'ocr_backend': self.engine.ocr_engine.backend_name,
+                'ocr_timeout': self.engine.ocr_timeout,
+                'ocr_executor': self.engine.ocr_engine.executor,
+                'ocr_pool_size': self.engine.ocr_pool_size
+            },
             
-            # 确保坐标在选择区域内
-            click_x = max(self.selected_region[0], min(click_x, self.selected_region[2]))
-            click_y = max(self.selected_region[1], min(click_y, self.selected_region[3]))
-        else:
-            # 计算区域中心
-            click_x = (self.selected_region[0] + self.selected_region[2]) // 2
-            click_y = (self.selected_region[1] + self.selected_region[3]) // 2
-        
-        return click_x, click_y
-    
-    def start_event_thread(self):
-        """启动事件处理线程"""
-        self.is_event_running = True
-        self.event_thread = threading.Thread(target=self.process_events, daemon=True)
-        self.event_thread.start()
-        self.log_message("事件处理线程已启动")
-    
-    def process_events(self):
-        """处理事件队列中的事件"""
-        while self.is_event_running:
-            try:
-                with self.event_cond:
-                    while not self.event_queue:
-                        self.event_cond.wait()
-                    event_data = self.event_queue.popleft()
-                
-                # 执行事件
-                self.execute_event(event_data)
-            except Exception as e:
-                self.log_message(f"事件处理错误: {str(e)}")
-                time.sleep(1)
-    
-    def add_event(self, event, module_info=None):
-        """添加事件到队列"""
-        with self.event_cond:
-            self.event_queue.append((event, module_info))
-            self.event_cond.notify()
-    
-    def execute_event(self, event_data):
-        """执行具体事件"""
-        event, module_info = event_data
-        event_type, data = event
+            # 日志配置
+            'log': {
+                'level': self.log_level_var.get()
+            }
+        }
         
-        if event_type == 'keypress':
-            key = data
-            try:
-                # 立即按下按键
-                pyautogui.keyDown(key)
-                
-                # 根据模块信息获取延迟范围
-                if module_info:
-                    module_type, module_index = module_info
-                    if module_type == 'ocr':
-                        delay_min = self.ocr_delay_min.get()
-                        delay_max = self.ocr_delay_max.get()
-                    elif module_type == 'timed':
-                        delay_min = self.timed_groups[module_index]['delay_min'].get()
-                        delay_max = self.timed_groups[module_index]['delay_max'].get()
-                    elif module_type == 'number':
-                        delay_min = self.number_regions[module_index]['delay_min'].get()
-                        delay_max = self.number_regions[module_index]['delay_max'].get()
-                    else:
-                        delay_min = 300
-                        delay_max = 500
-                else:
-                    # 默认延迟
-                    delay_min = 300
-                    delay_max = 500
-                
-                # 确保延迟范围有效
-                delay_min = max(1, delay_min)  # 至少1ms
-                delay_max = max(delay_min, delay_max)  # 确保max不小于min
-                
-                # 生成随机延迟
-                delay = random.randint(delay_min, delay_max) / 1000  # 转换为秒
-                
-                # 延迟等待（不会影响UI主线程，因为事件处理在单独线程中）
-                time.sleep(delay)
-                
-                # 延迟后弹起按键
-                pyautogui.keyUp(key)
-                
-                self.log_message(f"按下了 {key} 键，延迟 {delay*1000:.0f} 毫秒")
-            except Exception as e:
-                self.log_message(f"按键执行错误: {str(e)}")
-        elif event_type == 'exit':
-            # 退出事件，什么都不做
-            pass
-        # 其他事件类型...
+        return config
     
     def start_timed_tasks(self):
         """开始定时任务"""
-        # 停止现有的定时任务
-        self.stop_timed_tasks()
-        
-        self.log_message("开始定时任务")
-        
-        # 统计要启动的定时组数量
-        start_count = 0
-        for i, group in enumerate(self.timed_groups):
-            if group["enabled"].get():
-                interval = group["interval"].get()
-                key = group["key"].get()
-                # 创建线程并存储
-                thread = threading.Thread(target=self.timed_task_loop, args=(i, interval, key), daemon=True)
-                self.timed_threads.append(thread)
-                thread.start()
-                start_count += 1
+        self.sync_engine()
+        self.engine.start_timed_tasks()
         
         # 更新按钮状态
         self.start_timed_btn.config(state="disabled")
         self.stop_timed_btn.config(state="normal")
-        
-        if start_count == 0:
-            self.log_message("没有启用任何定时组")
     
     def stop_timed_tasks(self):
         """停止定时任务"""
-        # 停止所有定时任务
-        self.log_message("停止所有定时任务")
-        
-        # 清空线程列表
-        if self.timed_threads:
-            self.log_message(f"停止{len(self.timed_threads)}个定时任务线程")
-            self.timed_threads.clear()
+        self.engine.stop_timed_tasks()
         
         # 更新按钮状态
         self.start_timed_btn.config(state="normal")
         self.stop_timed_btn.config(state="disabled")
-        
-        self.log_message("已停止定时任务")
-    
-    def timed_task_loop(self, group_index, interval, key):
-        """定时任务循环"""
-        current_thread = threading.current_thread()
-        
-        # 检查线程是否在timed_threads列表中，以及定时组是否启用
-        while current_thread in self.timed_threads and self.timed_groups[group_index]["enabled"].get():
-            try:
-                # 播放定时模块报警声音
-                self.play_alarm_sound(self.timed_groups[group_index]["alarm"])
-                
-                # 只有当按键不为空时才执行按键操作
-                if key:
-                    self.add_event(('keypress', key), ('timed', group_index))
-                    self.log_message(f"定时任务{group_index+1}触发按键: {key}")
-                else:
-                    self.log_message(f"定时任务{group_index+1}按键配置为空，仅执行报警操作")
-                
-                # 等待指定的时间间隔
-                for _ in range(interval):
-                    time.sleep(1)
-                    # 每秒钟检查一次线程是否仍在列表中
-                    if current_thread not in self.timed_threads:
-                        return
-            except Exception as e:
-                self.log_message(f"定时任务{group_index+1}错误: {str(e)}")
-                break
     
     def start_number_region_selection(self, region_index):
         """开始数字识别区域选择"""
@@ -2026,186 +5779,50 @@ class AutoDoorOCR:
     
     def start_number_recognition(self):
         """开始数字识别"""
-        # 停止现有的数字识别任务
-        self.stop_number_recognition()
-        
-        self.log_message("开始数字识别")
-        
-        # 统计要启动的数字识别区域数量
-        start_count = 0
         for i, region_config in enumerate(self.number_regions):
-            if region_config["enabled"].get():
-                region = region_config["region"]
-                if not region:
-                    messagebox.showwarning("警告", f"请先为数字识别区域{i+1}选择区域")
-                    return
-                
-                threshold = region_config["threshold"].get()
-                key = region_config["key"].get()
-                thread = threading.Thread(target=self.number_recognition_loop, args=(i, region, threshold, key), daemon=True)
-                self.number_threads.append(thread)
-                thread.start()
-                start_count += 1
+            if region_config["enabled"].get() and not region_config["region"]:
+                messagebox.showwarning("警告", f"请先为数字识别区域{i+1}选择区域")
+                return
+        
+        self.sync_engine()
+        if self.engine.start_number_recognition() is None:
+            return
         
         # 更新按钮状态
         self.start_number_btn.config(state="disabled")
         self.stop_number_btn.config(state="normal")
-        
-        if start_count == 0:
-            self.log_message("没有启用任何数字识别区域")
     
     def stop_number_recognition(self):
         """停止数字识别"""
-        # 清空线程列表
-        if self.number_threads:
-            self.log_message(f"停止{len(self.number_threads)}个数字识别线程")
-            self.number_threads.clear()
+        self.engine.stop_number_recognition()
         
         # 更新按钮状态
         self.start_number_btn.config(state="normal")
         self.stop_number_btn.config(state="disabled")
-        
-        self.log_message("已停止数字识别")
-    
-    def number_recognition_loop(self, region_index, region, threshold, key):
-        """数字识别循环"""
-        current_thread = threading.current_thread()
-        
-        # 检查线程是否在number_threads列表中，以及数字识别区域是否启用
-        while current_thread in self.number_threads and self.number_regions[region_index]["enabled"].get():
-            try:
-                # 截图并识别数字
-                screenshot = self.take_screenshot(region)
-                text = self.ocr_number(screenshot)
-                self.log_message(f"数字识别{region_index+1}结果: '{text}'")
-                
-                number = self.parse_number(text)
-                if number is not None:
-                    self.log_message(f"数字识别{region_index+1}解析结果: {number}")
-                    if number < threshold:
-                        # 播放数字识别模块报警声音
-                        self.play_alarm_sound(self.number_regions[region_index]["alarm"])
-                        
-                        # 只有当按键不为空时才执行按键操作
-                    if key:
-                        self.add_event(('keypress', key), ('number', region_index))
-                        self.log_message(f"数字识别{region_index+1}触发按键: {key}")
-                    else:
-                        self.log_message(f"数字识别{region_index+1}按键配置为空，仅执行报警操作")
-                
-                time.sleep(1)  # 1秒间隔
-            except Exception as e:
-                self.log_message(f"数字识别{region_index+1}错误: {str(e)}")
-                time.sleep(5)
     
     def parse_number(self, text):
-        """解析数字，支持X/Y格式
-        打印详细日志以帮助排查问题
-        """
-        # 打印当前识别到的文字内容
-        self.log_message(f"数字识别解析: 当前文字内容为 '{text}'")
-        
-        # 移除可能的空格和换行符
-        text = text.strip()
-        
-        # 检查是否为X/Y格式
-        if '/' in text:
-            self.log_message("数字识别解析: 检测到X/Y格式文字 '{0}'".format(text))
-            parts = text.split('/')
-            self.log_message("数字识别解析: 分割结果为 {0}".format(parts))
-            
-            if len(parts) == 2:
-                # 尝试解析X部分
-                x_part = parts[0].strip()
-                self.log_message("数字识别解析: 尝试解析X部分 '{0}'".format(x_part))
-                try:
-                    x_number = int(x_part)
-                    self.log_message("数字识别解析: 成功解析X部分为 {0}".format(x_number))
-                    return x_number
-                except ValueError as e:
-                    self.log_message("数字识别解析: 无法解析X部分 '{0}'，错误: {1}".format(x_part, str(e)))
-                    # 尝试清理X部分，移除非数字字符
-                    cleaned_x = ''.join(filter(str.isdigit, x_part))
-                    if cleaned_x:
-                        self.log_message("数字识别解析: 清理后X部分为 '{0}'".format(cleaned_x))
-                        try:
-                            return int(cleaned_x)
-                        except ValueError:
-                            self.log_message("数字识别解析: 清理后仍无法解析X部分 '{0}'".format(cleaned_x))
-        else:
-            self.log_message("数字识别解析: 未检测到X/Y格式，尝试直接解析数字 '{0}'".format(text))
-            
-        # 尝试直接解析为数字
-        try:
-            # 清理文字，移除非数字字符
-            cleaned_text = ''.join(filter(str.isdigit, text))
-            if cleaned_text:
-                self.log_message(f"数字识别解析: 清理后文字为 '{cleaned_text}'")
-                number = int(cleaned_text)
-                self.log_message(f"数字识别解析: 成功解析为数字 {number}")
-                return number
-            else:
-                self.log_message(f"数字识别解析: 清理后无数字字符")
-                return None
-        except ValueError as e:
-            self.log_message(f"数字识别解析: 无法直接解析为数字，错误: {str(e)}")
-            return None
+        """解析数字，支持X/Y格式"""
+        return self.engine.parse_number(text)
     
-    def take_screenshot(self, region):
-        """截取指定区域的屏幕"""
-        x1, y1, x2, y2 = region
-        left = min(x1, x2)
-        top = min(y1, y2)
-        right = max(x1, x2)
-        bottom = max(y1, y2)
-        return ImageGrab.grab(bbox=(left, top, right, bottom), all_screens=True)
+    def take_screenshot(self, region, key=None):
+        """截取指定区域的屏幕，同一周期内多个区域共用一次截图"""
+        return self.engine.take_screenshot(region, key)
     
-    def ocr_number(self, image):
-        """识别数字，支持X/Y格式
-        简化图像预处理，保留字符白名单以避免'ee'错误识别
-        """
-        # 1. 转换为灰度图像
-        image = image.convert('L')
-        
-        # 2. 不使用复杂的OpenCV预处理，只使用基本的阈值处理
-        # 这样可以保留更多原始信息，提高识别率
-        
-        # 3. 优化OCR配置，平衡识别率和错误率
-        # 使用--psm 7（单行文本）和--oem 3（默认OCR引擎模式）
-        # 添加字符白名单，只识别数字和/符号，防止'ee'错误
-        config = '--psm 7 --oem 3 -c tessedit_char_whitelist=0123456789/'
-        text = pytesseract.image_to_string(image, lang='eng', config=config)
-        
-        # 4. 额外的文本清理，移除可能的换行符和空格
-        text = text.strip().replace('\n', '').replace('\r', '')
-        
-        return text
+    def set_capture_backend(self, name):
+        """切换截图后端"""
+        self.engine.set_capture_backend(name)
     
-    def play_alarm_sound(self, alarm_var):
-        """播放报警声音
-        
-        Args:
-            alarm_var: 报警开关的BooleanVar变量
-        """
-        if not PYGAME_AVAILABLE:
-            self.log_message("pygame库未安装，无法播放报警声音")
-            return
-        
-        if not alarm_var.get():
-            return
-        
-        sound_file = self.alarm_sound.get()
-        if not sound_file or not os.path.exists(sound_file):
-            self.log_message("未设置有效的全局报警声音文件")
-            return
-        
-        try:
-            pygame.mixer.music.load(sound_file)
-            pygame.mixer.music.set_volume(self.alarm_volume.get() / 100)  # 设置音量
-            pygame.mixer.music.play()
-            self.log_message("报警声音已播放")
-        except Exception as e:
-            self.log_message(f"播放报警声音失败: {str(e)}")
+    def set_input_backend(self, name):
+        """切换输入注入后端"""
+        self.engine.set_input_backend(name)
+    
+    def benchmark_capture(self):
+        """在后台测试各截图后端的速度"""
+        self.engine.benchmark_capture()
+    
+    def ocr_number(self, image):
+        """识别数字，支持X/Y格式"""
+        return self.engine.ocr_number(image)
     
     def select_alarm_sound(self):
         """选择全局报警声音文件
@@ -2238,16 +5855,13 @@ class AutoDoorOCR:
     
     def exit_program(self):
         """退出程序"""
-        if self.is_running:
-            self.stop_monitoring()
-        self.stop_timed_tasks()
-        self.stop_number_recognition()
+        # 写入尚未保存的配置
+        if self.pending_save_id is not None:
+            self.save_config()
+        self.config_writer.flush()
         
-        # 停止事件线程
-        self.is_event_running = False
-        if self.event_thread:
-            self.add_event(('exit', None), None)
-            self.event_thread.join(timeout=1)
+        # 由引擎停止运行中的模块和各个线程并释放资源，最后写完剩余日志
+        self.engine.close()
         
         self.root.destroy()
     
@@ -2256,9 +5870,87 @@ class AutoDoorOCR:
         self.root.mainloop()
 
 def main():
-    """主函数，用于命令行调用"""
+    """主函数，用于命令行调用，带--headless参数时以无界面模式运行"""
+    if "--headless" in sys.argv[1:]:
+        sys.exit(main_headless([arg for arg in sys.argv[1:] if arg != "--headless"]))
+    
     app = AutoDoorOCR()
     app.run()
 
+def main_headless(argv=None):
+    """无界面运行入口，读取配置文件后直接运行各功能模块，适合无显示器的识别机或进程守护程序"""
+    parser = argparse.ArgumentParser(prog="autodoor-headless", description="AutoDoor OCR 无界面运行模式")
+    parser.add_argument("--config", help="配置文件路径，默认使用程序目录下的autodoor_config.json")
+    parser.add_argument("--log-file", help="日志文件路径，默认使用程序目录下的autodoor.log")
+    parser.add_argument("--modules", default="ocr,timed,number",
+                        help="要启动的模块，逗号分隔，可选ocr、timed、number，默认全部")
+    parser.add_argument("--capture-backend", help="覆盖配置中的截图后端，如mss、imagegrab或replay:图片目录")
+    parser.add_argument("--input-backend", help="覆盖配置中的输入后端，如xtest、pyautogui或record（只记录不注入）")
+    parser.add_argument("--log-level", choices=list(LOG_LEVELS), help="覆盖配置中的日志级别")
+    parser.add_argument("--duration", type=float, default=0, help="运行指定秒数后退出，默认一直运行")
+    parser.add_argument("--quiet", action="store_true", help="不在终端输出日志")
+    parser.add_argument("--latency-json", help="退出时将各阶段耗时分布导出到指定JSON文件")
+    args = parser.parse_args(argv)
+
+    startup_timer = StartupTimer()
+    # 无界面模式没有日志标签页，日志只输出到终端，--quiet时不保留
+    engine = AutoDoorEngine(config_file=args.config, log_file=args.log_file,
+                            ui_log_capacity=0 if args.quiet else 5000)
+    startup_timer.mark("引擎初始化")
+    engine.load_config_file()
+    if args.capture_backend:
+        engine.set_capture_backend(args.capture_backend)
+    if args.input_backend:
+        engine.set_input_backend(args.input_backend)
+    if args.log_level:
+        engine.set_log_level(args.log_level)
+    if not engine.tesseract_path:
+        engine.set_tesseract_path(engine.get_default_tesseract_path())
+    startup_timer.mark("加载配置")
+    # 与界面相同，在后台检测Tesseract，检测结果已缓存时不再启动tesseract进程
+    engine.start_tesseract_probe()
+
+    engine.start()
+    modules = [module.strip() for module in args.modules.split(",") if module.strip()]
+    # 定时任务不依赖Tesseract，立即启动；文字识别和数字识别在检测完成后启动
+    started = engine.start_modules([module for module in modules if module == "timed"])
+    pending = [module for module in modules if module != "timed"]
+    startup_timer.mark("启动模块")
+    engine.log_message(f"无界面模式{startup_timer.format()}，运行模块: {', '.join(started) if started else '无'}"
+                       + (f"，Tesseract检测完成后启动: {', '.join(pending)}" if pending else ""))
+
+    # 收到SIGINT或SIGTERM时停止所有模块后退出
+    stop_event = threading.Event()
+    previous_handlers = {}
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        previous_handlers[sig] = signal.signal(sig, lambda signum, frame: stop_event.set())
+
+    def print_logs():
+        for entry, _ in engine.logger.drain_ui():
+            sys.stdout.write(entry)
+        sys.stdout.flush()
+
+    deadline = time.monotonic() + args.duration if args.duration > 0 else None
+    try:
+        while (started or pending) and not stop_event.wait(0.1):
+            if pending and engine.tesseract_probe_done.is_set():
+                started += engine.start_modules(pending)
+                engine.log_message(f"Tesseract检测完成，运行模块: {', '.join(started) if started else '无'}")
+                pending = []
+            print_logs()
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+    finally:
+        engine.close()
+        print_logs()
+        if args.latency_json:
+            engine.latency.export_json(args.latency_json)
+        for sig, handler in previous_handlers.items():
+            signal.signal(sig, handler)
+
+    return 0 if started else 1
+
 if __name__ == "__main__":
+    # 打包后的程序启动OCR进程池的工作进程时需要
+    multiprocessing.freeze_support()
     main()
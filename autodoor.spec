@@ -45,7 +45,9 @@ a = Analysis(
     pathex=[project_root],
     binaries=[],
     datas=data_files,
-    hiddenimports=[],
+    # 以下模块在autodoor.py中延迟导入，需要显式声明
+    hiddenimports=['pyautogui', 'pytesseract', 'pygame', 'screeninfo', 'mss', 'PIL.ImageGrab',
+                   'numpy', 'tesserocr', 'Xlib', 'Xlib.display', 'Xlib.ext.xtest'],
     hookspath=[],
     hooksconfig={},
 
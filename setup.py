@@ -35,6 +35,7 @@ setup(
     entry_points={
         'console_scripts': [
             'autodoor=autodoor:main',
+            'autodoor-headless=autodoor:main_headless',
         ],
     },
     classifiers=[
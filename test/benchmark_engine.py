@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+引擎性能基准测试脚本
+使用合成图像测量截图、图像预处理、图像编码、数字识别（Tesseract和数字模板）、文字识别、数字解析、关键词匹配和事件队列的耗时与吞吐量，
+结果与基准文件比较并标记性能退化，无需显示器即可在Linux上运行
+
+用法:
+    python test/benchmark_engine.py                     # 运行并与基准比较
+    python test/benchmark_engine.py --update-baseline   # 运行并保存为新的基准
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import io
+import platform
+
+# 添加仓库根目录（autodoor）和当前目录（测试辅助函数）到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from autodoor import (AutoDoorEngine, ImagePreprocessor, KeywordMatcher, LatencyRecorder, NUMPY_AVAILABLE, OCREngine,
+                      encode_pnm)
+from test_number_recognition import create_test_image
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# 数字识别区域和文字识别区域在合成整屏截图中的位置
+NUMBER_REGION = (10, 10, 110, 40)
+OCR_REGION = (10, 60, 310, 100)
+
+PARSE_SAMPLES = ["123/456", " 2864 / 2864 ", "5/6", "1234/5678", "28642864", "l23/4S6", "", "abc"]
+MATCH_SAMPLES = [
+    "The door is closed",
+    "Men at work, please wait",
+    "Nothing interesting on the screen right now",
+    "门已开启",
+    "",
+]
+
+def create_frames(count):
+    """创建合成整屏截图，每帧的数字和文字都不同，避免命中画面未变化的复用"""
+    frames = []
+    for i in range(count):
+        frame = create_test_image("", size=(400, 120))
+        frame.paste(create_test_image(f"{i * 7 % 1000}/{1000}", size=(100, 30)), NUMBER_REGION[:2])
+        frame.paste(create_test_image(f"Round {i} door status", size=(300, 40)), OCR_REGION[:2])
+        frames.append(frame)
+    return frames
+
+def summarize(samples, elapsed):
+    """汇总一组耗时样本（毫秒）"""
+    ordered = sorted(samples)
+    return {
+        "rounds": len(ordered),
+        "p50": round(LatencyRecorder.percentile(ordered, 50), 4),
+        "p95": round(LatencyRecorder.percentile(ordered, 95), 4),
+        "max": round(ordered[-1], 4),
+        "ops_per_sec": round(len(ordered) / elapsed, 1) if elapsed > 0 else 0.0
+    }
+
+def measure(func, rounds, setup=None):
+    """重复执行func并记录每次耗时，setup在每次计时前执行且不计入耗时"""
+    samples = []
+    elapsed = 0.0
+    for i in range(rounds):
+        if setup is not None:
+            setup(i)
+        start = time.perf_counter()
+        func(i)
+        duration = time.perf_counter() - start
+        elapsed += duration
+        samples.append(duration * 1000)
+    return summarize(samples, elapsed)
+
+def create_engine(temp_dir, frames, tesseract_path=None):
+    """创建使用回放截图后端的引擎，不加载界面"""
+    engine = AutoDoorEngine(config_file=os.path.join(temp_dir, "autodoor_config.json"),
+                            log_file=os.path.join(temp_dir, "autodoor.log"), ui_log_capacity=0)
+    engine.apply_config({
+        'ocr': {'selected_region': list(OCR_REGION), 'custom_key': '', 'custom_keywords': ['men', 'door', '门']},
+        'alarm': {'ocr': {'enabled': False}, 'timed': {'enabled': False}, 'number': {'enabled': False}}
+    })
+    # 合成截图保存为图片后通过回放后端读取，与无界面模式的--capture-backend replay:目录相同
+    frame_dir = os.path.join(temp_dir, "frames")
+    os.makedirs(frame_dir)
+    for i, frame in enumerate(frames):
+        frame.save(os.path.join(frame_dir, f"frame_{i:04d}.png"))
+    engine.set_capture_backend("replay:" + frame_dir)
+    engine.set_tesseract_path(tesseract_path or engine.get_default_tesseract_path())
+    return engine
+
+def run_benchmarks(rounds=200, ocr_rounds=20, tesseract_path=None):
+    """运行全部基准测试，返回{名称: 统计}，无法运行的项目记录跳过原因"""
+    results = {}
+    frames = create_frames(max(ocr_rounds, 2))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = create_engine(temp_dir, frames, tesseract_path)
+        engine.start()
+        try:
+            # 1. 截图：回放后端 + 统一截图调度，与数字识别区域相同每次都重新截图，不复用缓存的帧
+            results["capture"] = measure(lambda i: engine.take_screenshot(NUMBER_REGION, ("number", 0)), rounds)
+
+            # 截图后端本身的耗时，不经过统一截图调度的帧复用
+            results["grab_screen"] = measure(lambda i: engine.grab_screen(NUMBER_REGION), rounds)
+
+            # 2. 数字解析
+            results["parse_number"] = measure(lambda i: engine.parse_number(PARSE_SAMPLES[i % len(PARSE_SAMPLES)]),
+                                              rounds * 10)
+
+            # 3. 关键词匹配
+            results["match_keywords"] = measure(lambda i: engine.match_keywords(MATCH_SAMPLES[i % len(MATCH_SAMPLES)]),
+                                                rounds * 10)
+            fuzzy_matcher = KeywordMatcher(engine.custom_keywords, fuzzy=True)
+            results["match_keywords_fuzzy"] = measure(lambda i: fuzzy_matcher.search(MATCH_SAMPLES[i % len(MATCH_SAMPLES)]),
+                                                      rounds * 10)
+
+            # 数字模板识别：用合成图像的真实文字学习模板，只测量模板识别本身，不回退到Tesseract
+            number_images = [frame.crop(NUMBER_REGION).convert('L') for frame in frames]
+            if NUMPY_AVAILABLE:
+                recognizer = engine.get_digit_recognizer(0)
+                recognizer.learn(create_test_image("0123456789/", size=(120, 30)), "0123456789/")
+                results["ocr_number_template"] = measure(
+                    lambda i: recognizer.recognize(number_images[i % len(number_images)]), rounds)
+            else:
+                results["ocr_number_template"] = {"skipped": "numpy不可用"}
+
+            # OCR前的图像预处理
+            preprocess = ImagePreprocessor.normalize_options({'enabled': True})
+            results["preprocess"] = measure(
+                lambda i: engine.preprocessor.process(("number", 0), number_images[i % len(number_images)], preprocess),
+                rounds)
+
+            # 传给tesseract前的图像编码：管道使用未压缩PNM，pytesseract使用临时PNG文件
+            def encode_png(image):
+                buffer = io.BytesIO()
+                image.save(buffer, format="PNG")
+                return buffer.getvalue()
+            ocr_images = [frame.crop(OCR_REGION).convert('L') for frame in frames]
+            results["encode_pnm"] = measure(lambda i: encode_pnm(ocr_images[i % len(ocr_images)]), rounds)
+            results["encode_png"] = measure(lambda i: encode_png(ocr_images[i % len(ocr_images)]), rounds)
+
+            # 4. 事件队列：入队到事件线程取出的耗时，'exit'事件不会按下按键
+            def enqueue_and_wait(i):
+                engine.add_event(('exit', None))
+                while engine.event_queue:
+                    time.sleep(0)
+            results["event_queue"] = measure(enqueue_and_wait, rounds)
+
+            # 5. 需要Tesseract的项目
+            if engine.check_tesseract_availability():
+                # 只测量Tesseract，不使用数字模板
+                engine.digit_templates_enabled = False
+
+                # 数字识别（不使用缓存）
+                results["ocr_number"] = measure(lambda i: engine.ocr_number(number_images[i % len(number_images)]),
+                                                ocr_rounds, setup=lambda i: engine.ocr_cache.clear())
+
+                # 数字识别（缓存命中）
+                engine.ocr_number(number_images[0])
+                results["ocr_number_cached"] = measure(lambda i: engine.ocr_number(number_images[0]), rounds)
+
+                # 文字识别完整流程：截图、灰度、OCR和关键词匹配
+                def reset_ocr_state(i):
+                    engine.frame_detector.reset()
+                    engine.ocr_cache.clear()
+                results["perform_ocr"] = measure(lambda i: engine.perform_ocr(), ocr_rounds, setup=reset_ocr_state)
+
+                # 调用tesseract进程的两种方式：管道传递PNM和经临时PNG文件
+                for backend in ("pipe", "pytesseract"):
+                    ocr_engine = OCREngine(engine.tesseract_path, backend=backend)
+                    if ocr_engine.backend != backend:
+                        results["ocr_" + backend] = {"skipped": f"{backend}不可用"}
+                        continue
+                    results["ocr_" + backend] = measure(
+                        lambda i: ocr_engine.image_to_string(ocr_images[i % len(ocr_images)], lang='eng', config='--psm 7'),
+                        ocr_rounds)
+
+                # 多个区域同时识别的总吞吐量：线程模式和按CPU核数创建的进程池
+                batch = [ocr_images[i % len(ocr_images)] for i in range(2 * (os.cpu_count() or 1))]
+                for executor in ("thread", "process"):
+                    ocr_engine = OCREngine(engine.tesseract_path, pool_size=0, executor=executor)
+                    try:
+                        def run_batch(i):
+                            futures = [ocr_engine.submit(image, lang='eng', config='--psm 7') for image in batch]
+                            for future in futures:
+                                future.result()
+                        run_batch(0)  # 预先启动工作进程
+                        stats = measure(run_batch, max(2, ocr_rounds // 4))
+                        stats["frames_per_sec"] = round(stats["ops_per_sec"] * len(batch), 1)
+                        results["ocr_batch_" + executor] = stats
+                    finally:
+                        ocr_engine.close()
+            else:
+                for name in ("ocr_number", "ocr_number_cached", "perform_ocr", "ocr_pipe", "ocr_pytesseract",
+                             "ocr_batch_thread", "ocr_batch_process"):
+                    results[name] = {"skipped": "Tesseract不可用"}
+        finally:
+            engine.close()
+
+    return results
+
+def compare(results, baseline, threshold=0.2, min_delta_ms=0.05):
+    """与基准比较，p50变慢超过threshold比例且绝对差值超过min_delta_ms时视为退化
+
+    Returns:
+        list: [(名称, 基准p50, 当前p50, 变化比例)]
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous or "p50" not in current or "p50" not in previous:
+            continue
+        base_p50 = previous["p50"]
+        delta = current["p50"] - base_p50
+        ratio = delta / base_p50 if base_p50 > 0 else 0.0
+        if delta > min_delta_ms and ratio > threshold:
+            regressions.append((name, base_p50, current["p50"], ratio))
+    return regressions
+
+def load_baseline(path):
+    """读取基准文件，不存在时返回None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_baseline(path, results):
+    """保存基准文件，附带运行环境便于判断基准是否可比"""
+    data = {
+        "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def print_results(results, baseline_results=None):
+    """输出结果表格"""
+    print(f"{'项目':<20}{'次数':>8}{'p50(ms)':>12}{'p95(ms)':>12}{'最大(ms)':>12}{'次/秒':>12}{'基准p50':>12}")
+    for name, stats in results.items():
+        if "skipped" in stats:
+            print(f"{name:<20}跳过: {stats['skipped']}")
+            continue
+        base = (baseline_results or {}).get(name, {}).get("p50")
+        base_text = f"{base:.4f}" if base is not None else "-"
+        print(f"{name:<20}{stats['rounds']:>8}{stats['p50']:>12.4f}{stats['p95']:>12.4f}"
+              f"{stats['max']:>12.4f}{stats['ops_per_sec']:>12.1f}{base_text:>12}")
+        if "frames_per_sec" in stats:
+            print(f"{'':<20}每批{stats['frames_per_sec'] / stats['ops_per_sec']:.0f}张，合计{stats['frames_per_sec']:.1f}帧/秒")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AutoDoor 引擎性能基准测试")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="基准文件路径")
+    parser.add_argument("--update-baseline", action="store_true", help="将本次结果保存为新的基准")
+    parser.add_argument("--rounds", type=int, default=200, help="快速项目的测量次数")
+    parser.add_argument("--ocr-rounds", type=int, default=20, help="需要Tesseract的项目的测量次数")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p50变慢超过该比例视为退化，默认0.2")
+    parser.add_argument("--tesseract", help="Tesseract可执行文件路径，默认自动查找")
+    args = parser.parse_args(argv)
+
+    print("=== 开始引擎性能基准测试 ===")
+    results = run_benchmarks(args.rounds, args.ocr_rounds, args.tesseract)
+
+    baseline = load_baseline(args.baseline)
+    baseline_results = baseline["results"] if baseline else None
+    print_results(results, baseline_results)
+
+    exit_code = 0
+    if baseline_results is None:
+        print(f"\n未找到基准文件: {args.baseline}")
+    else:
+        regressions = compare(results, baseline_results, args.threshold)
+        if regressions:
+            print("\n检测到性能退化:")
+            for name, base_p50, p50, ratio in regressions:
+                print(f"✗ {name}: p50 {base_p50:.4f}ms -> {p50:.4f}ms（+{ratio * 100:.0f}%）")
+            exit_code = 1
+        else:
+            print(f"\n✓ 与基准（{baseline['created_at']}）相比没有性能退化")
+
+    if args.update_baseline or baseline_results is None:
+        save_baseline(args.baseline, results)
+        print(f"✓ 已保存基准: {args.baseline}")
+
+    print("\n=== 引擎性能基准测试完成 ===")
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+动作序列测试脚本
+用于验证文字识别触发的点击、等待、按键由事件线程异步执行，等待期间不阻塞识别线程和其他按键，以及动作序列耗时统计
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from autodoor import AutoDoorEngine
+
+def create_engine(temp_dir):
+    engine = AutoDoorEngine(config_file=os.path.join(temp_dir, "autodoor_config.json"),
+                            log_file=os.path.join(temp_dir, "autodoor.log"), ui_log_capacity=0)
+    engine.apply_config({
+        'ocr': {'selected_region': [100, 100, 300, 200], 'custom_key': 'equal', 'delay_min': 50, 'delay_max': 50},
+        'click': {'mode': 'center'},
+        'number_recognition': {'regions': [
+            {'enabled': False, 'region': [0, 0, 100, 30], 'threshold': 100, 'key': 'f2', 'delay_min': 50, 'delay_max': 50}]},
+        'alarm': {'ocr': {'enabled': False}, 'timed': {'enabled': False}, 'number': {'enabled': False}}
+    })
+    engine.click_delay = 0.3
+    # 只记录点击和按键的时间，不真正注入
+    engine.set_input_backend("record")
+    return engine
+
+def test_action_sequence():
+    """测试动作序列"""
+    print("=== 开始测试动作序列 ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = create_engine(temp_dir)
+        recorder = engine.input_backend
+        engine.start()
+        try:
+            # 1. 识别线程触发后立即返回，点击、等待、按键由事件线程执行
+            start = time.perf_counter()
+            engine.trigger_action(detect_time=start)
+            returned = time.perf_counter() - start
+            assert returned < 0.05, f"触发动作阻塞了识别线程: {returned*1000:.0f}ms"
+
+            # 等待期间其他模块的按键照常执行
+            time.sleep(0.05)
+            engine.add_event(('keypress', 'f2'), ('number', 0))
+            time.sleep(0.5)
+            click = recorder.times("click", (200, 150))
+            key_down = recorder.times("down", "equal")
+            f2_down = recorder.times("down", "f2")
+            assert len(click) == 1 and len(key_down) == 1, f"动作执行错误: {recorder.actions}"
+            wait = key_down[0] - click[0]
+            assert 0.28 < wait < 0.4, f"点击后等待时间错误: {wait*1000:.0f}ms"
+            assert click[0] < f2_down[0] < key_down[0], "等待期间其他按键应照常执行"
+            print(f"✓ 触发后{returned*1000:.1f}ms返回，点击{wait*1000:.0f}ms后按键，等待期间f2照常按下")
+
+            # 2. 动作序列的耗时记录到统计中
+            stages = {row['stage']: row for row in engine.latency.snapshot() if row['module'] == 'ocr'}
+            assert {"queue_wait", "sequence", "keydown", "total"} <= set(stages), f"缺少耗时阶段: {sorted(stages)}"
+            assert stages["sequence"]["p50"] >= 280, f"动作序列耗时错误: {stages['sequence']}"
+            print(f"✓ 动作序列耗时 {stages['sequence']['p50']:.0f}ms，识别到按键 {stages['total']['p50']:.0f}ms")
+
+            # 3. 要按下的按键仍按住时，等弹起后再按下
+            recorder.clear()
+            engine.ocr_delay_min = engine.ocr_delay_max = 500
+            engine.add_event(('keypress', 'equal'), ('ocr', 0))
+            time.sleep(0.05)
+            engine.trigger_action()
+            time.sleep(0.8)
+            downs = recorder.times("down", "equal")
+            ups = recorder.times("up", "equal")
+            assert len(downs) == 2 and downs[1] >= ups[0], f"按键仍按住时不应再次按下: {recorder.actions}"
+            print("✓ 按键弹起后再执行动作序列中的按键")
+
+            # 4. 模块停止时丢弃未完成的动作序列
+            recorder.clear()
+            engine.trigger_action()
+            time.sleep(0.1)
+            engine.discard_events('ocr')
+            time.sleep(0.4)
+            assert len(recorder.times("click", (200, 150))) == 1 and not recorder.times("down", "equal"), \
+                f"丢弃后仍按下了按键: {recorder.actions}"
+            print("✓ 模块停止时丢弃未完成的动作序列")
+        finally:
+            engine.close()
+
+    print("\n=== 动作序列测试完成 ===")
+
+if __name__ == "__main__":
+    test_action_sequence()
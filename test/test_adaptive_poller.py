@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+自适应识别间隔测试脚本
+用于验证画面不变时间隔逐渐放慢、画面变化或数字接近阈值时立即恢复最短间隔、画面持续变化时保持最短间隔以及实际频率统计
+"""
+
+import os
+import sys
+import time
+import itertools
+
+from PIL import Image
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from autodoor import AdaptivePoller, CaptureScheduler, FrameChangeDetector
+
+def test_adaptive_poller():
+    """测试自适应识别间隔"""
+    print("=== 开始测试自适应识别间隔 ===")
+
+    # 1. 画面不变时按倍数放慢，不超过最长间隔
+    poller = AdaptivePoller(floor=0.1, ceiling=1.0)
+    intervals = [poller.update(False) for _ in range(6)]
+    assert intervals[:4] == [0.2, 0.4, 0.8, 1.0], f"间隔增长错误: {intervals}"
+    assert intervals[-1] == 1.0, "间隔不应超过最长间隔"
+    print(f"✓ 画面不变时间隔逐渐放慢: {intervals}")
+
+    # 2. 画面变化或接近阈值时恢复最短间隔
+    assert poller.update(True) == 0.1, "画面变化后应恢复最短间隔"
+    poller.update(False)
+    assert poller.update(False, urgent=True) == 0.1, "接近阈值时应使用最短间隔"
+    print("✓ 画面变化和接近阈值时恢复最短间隔")
+
+    # 3. 更新配置时最短间隔不超过最长间隔，当前间隔限制在新范围内
+    poller.configure(5.0, 2.0)
+    assert poller.floor == poller.ceiling == 2.0, f"配置限制错误: {poller.floor}-{poller.ceiling}"
+    assert poller.interval == 2.0, f"当前间隔未限制在新范围内: {poller.interval}"
+    poller.configure(0.05, 0.5)
+    assert poller.interval == 0.5, f"当前间隔未限制在新范围内: {poller.interval}"
+    print("✓ 配置更新后间隔范围正确")
+
+    # 4. 实际识别频率
+    poller = AdaptivePoller(floor=0.01, ceiling=0.1)
+    assert poller.rate() == 0.0, "没有识别记录时频率应为0"
+    for _ in range(11):
+        poller.update(True)
+        time.sleep(0.02)
+    rate = poller.rate()
+    assert 20 <= rate <= 60, f"实际频率统计错误: {rate:.1f}"
+    assert "次/秒" in poller.format_stats()
+    print(f"✓ 实际识别频率: {poller.format_stats()}")
+
+    # 5. 画面每帧都变化时，每次轮询都拿到新截图，间隔保持在最短间隔
+    colors = itertools.cycle(range(0, 250, 50))
+    grabbed = []
+
+    def grab_func(bbox):
+        grabbed.append(bbox)
+        return Image.new('L', (bbox[2] - bbox[0], bbox[3] - bbox[1]), color=next(colors))
+
+    scheduler = CaptureScheduler(grab_func)
+    scheduler.register("ocr", (0, 0, 100, 30))
+    detector = FrameChangeDetector()
+    poller = AdaptivePoller(floor=0.02, ceiling=1.0)
+    intervals = []
+    for _ in range(13):
+        screenshot = scheduler.grab((0, 0, 100, 30), key="ocr")
+        hit, _ = detector.lookup("ocr", screenshot)
+        detector.store("ocr", "")
+        intervals.append(poller.update(not hit))
+        time.sleep(poller.interval)
+    assert len(grabbed) == 13, f"轮询拿到了重复的帧: 轮询13次，实际截图{len(grabbed)}次"
+    assert set(intervals) == {0.02}, f"画面持续变化时间隔应保持最短: {intervals}"
+    print(f"✓ 画面持续变化时每次轮询都重新截图，间隔保持{poller.floor}秒")
+
+    print("\n=== 自适应识别间隔测试完成 ===")
+
+if __name__ == "__main__":
+    test_adaptive_poller()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+截图后端和统一截图调度测试脚本
+使用文件回放后端，无需真实屏幕即可运行
+"""
+
+import os
+import sys
+import stat
+import time
+import platform
+import tempfile
+from PIL import Image, ImageDraw
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from autodoor import AutoDoorEngine, FileReplayBackend, CaptureScheduler, benchmark_capture_backends
+
+# 模拟的tesseract：立即输出固定的数字
+FAKE_TESSERACT = """#!/bin/sh
+cat > /dev/null
+echo "12/34"
+"""
+
+def create_test_frame(color):
+    """创建模拟的整屏截图，两个数字区域位于不同位置"""
+    image = Image.new('RGB', (400, 200), color='white')
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((10, 10, 110, 40), fill=color)
+    draw.rectangle((200, 100, 300, 130), fill=color)
+    return image
+
+def test_capture_backend():
+    """测试回放后端和统一截图调度"""
+    print("=== 开始测试截图后端 ===")
+
+    frames = [create_test_frame('red'), create_test_frame('blue')]
+    backend = FileReplayBackend(frames)
+
+    # 1. 回放后端按顺序循环返回帧，并按区域裁剪
+    first = backend.grab((10, 10, 110, 40))
+    second = backend.grab((10, 10, 110, 40))
+    assert first.size == (100, 30), f"裁剪尺寸错误: {first.size}"
+    assert first.getpixel((50, 15)) == (255, 0, 0) and second.getpixel((50, 15)) == (0, 0, 255), "回放顺序错误"
+    print("✓ 回放后端按顺序回放")
+
+    # 2. 原始缓冲接口
+    raw, size, mode = backend.grab_raw((0, 0, 400, 200))
+    assert size == (400, 200) and mode == 'RGB' and len(raw) == 400 * 200 * 3, "原始缓冲错误"
+    print("✓ 原始缓冲接口正确")
+
+    # 3. 同一周期内多个区域只截图一次
+    grabbed = []
+
+    def grab_func(bbox):
+        grabbed.append(bbox)
+        return backend.grab(bbox)
+
+    scheduler = CaptureScheduler(grab_func, max_age=60)
+    scheduler.register(("number", 0), (10, 10, 110, 40))
+    scheduler.register(("number", 1), (200, 100, 300, 130))
+    crop0 = scheduler.grab((10, 10, 110, 40))
+    crop1 = scheduler.grab((300, 130, 200, 100))
+    assert len(grabbed) == 1, f"应只截图一次，实际截图{len(grabbed)}次"
+    assert grabbed[0] == (10, 10, 300, 130), f"外接矩形错误: {grabbed[0]}"
+    assert crop0.size == (100, 30) and crop1.size == (100, 30), "裁剪尺寸错误"
+    assert crop0.getpixel((50, 15)) == crop1.getpixel((50, 15)), "两个区域应来自同一帧"
+    print(f"✓ 统一截图: {scheduler.format_stats()}")
+
+    # 4. 基准测试
+    results = benchmark_capture_backends((0, 0, 400, 200), rounds=5, backends=[backend])
+    assert "replay" in results and "avg_ms" in results["replay"], f"基准测试结果错误: {results}"
+    print(f"回放后端平均耗时: {results['replay']['avg_ms']:.3f}ms")
+
+    print("\n=== 截图后端测试完成 ===")
+
+def test_number_fresh_frames():
+    """测试数字识别每次都拿到新截图，间隔0.05秒时实际截图约20帧/秒"""
+    print("=== 开始测试数字识别截图频率 ===")
+
+    if platform.system() == "Windows":
+        print("跳过: 模拟的tesseract需要sh")
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tesseract_cmd = os.path.join(temp_dir, "tesseract")
+        with open(tesseract_cmd, 'w') as f:
+            f.write(FAKE_TESSERACT)
+        os.chmod(tesseract_cmd, os.stat(tesseract_cmd).st_mode | stat.S_IEXEC)
+
+        engine = AutoDoorEngine(config_file=os.path.join(temp_dir, "autodoor_config.json"),
+                                log_file=os.path.join(temp_dir, "autodoor.log"), ui_log_capacity=0)
+        engine.apply_config({
+            'number_recognition': {'interval': 0.05, 'adaptive': False, 'regions': [
+                {'enabled': True, 'region': [10, 10, 110, 40], 'threshold': 5, 'key': ''},
+                {'enabled': True, 'region': [200, 100, 300, 130], 'threshold': 5, 'key': ''}]},
+            'alarm': {'ocr': {'enabled': False}, 'timed': {'enabled': False}, 'number': {'enabled': False}}
+        })
+        engine.capture_backend.close()
+        engine.capture_backend = FileReplayBackend([create_test_frame('red'), create_test_frame('blue')])
+        engine.set_tesseract_path(tesseract_cmd)
+        engine.tesseract_available = True
+        engine.start()
+        try:
+            engine.start_number_recognition()
+            time.sleep(1.0)
+            engine.stop_number_recognition()
+        finally:
+            engine.close()
+
+        scheduler = engine.capture_scheduler
+        ticks = [row['count'] for row in engine.latency.snapshot()
+                 if row['module'] == 'number' and row['stage'] == 'capture']
+        assert len(ticks) == 2 and min(ticks) >= 15, f"识别次数不足: {ticks}"
+        assert scheduler.grab_count >= 15, f"实际截图帧率过低: {scheduler.format_stats()}"
+        assert scheduler.grab_count < sum(ticks), "同一周期的两个区域应共用一次截图"
+        print(f"✓ 1秒内两个区域各识别{ticks}次，{scheduler.format_stats()}")
+
+    print("\n=== 数字识别截图频率测试完成 ===")
+
+if __name__ == "__main__":
+    test_capture_backend()
+    test_number_fresh_frames()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置写入器测试脚本
+用于验证内容未变化时跳过写入、原子替换、后台合并保存请求、flush等待正在进行的写入以及保存Tesseract检测结果
+"""
+
+import os
+import sys
+import json
+import time
+import tempfile
+import threading
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import autodoor
+from autodoor import AutoDoorEngine, ConfigWriter
+
+def test_config_writer():
+    """测试配置写入器"""
+    print("=== 开始测试配置写入器 ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_file = os.path.join(temp_dir, "autodoor_config.json")
+        messages = []
+        writer = ConfigWriter(config_file, log_callback=messages.append)
+
+        # 1. 首次保存写入文件
+        config = {'version': '1.0.0', 'last_save_time': 1, 'ocr': {'keywords': ['men']}}
+        assert writer.write(config), "首次保存应写入文件"
+        with open(config_file, 'r', encoding='utf-8') as f:
+            assert json.load(f) == config, "写入内容错误"
+        print("✓ 首次保存写入文件")
+
+        # 2. 只有保存时间变化时跳过写入
+        mtime = os.path.getmtime(config_file)
+        assert not writer.write(dict(config, last_save_time=2)), "内容未变化时应跳过写入"
+        assert os.path.getmtime(config_file) == mtime, "跳过写入时不应修改文件"
+        print("✓ 内容未变化时跳过写入")
+
+        # 3. 新写入器与磁盘上的配置比较
+        other = ConfigWriter(config_file)
+        assert not other.write(dict(config, last_save_time=3)), "磁盘内容相同时应跳过写入"
+        print("✓ 与磁盘上的配置比较")
+
+        # 4. 写入后不留下临时文件
+        assert writer.write(dict(config, ocr={'keywords': ['door']})), "内容变化时应写入"
+        assert os.listdir(temp_dir) == ["autodoor_config.json"], f"残留临时文件: {os.listdir(temp_dir)}"
+        print("✓ 原子替换后无残留临时文件")
+
+        # 5. 连续提交只写入最新配置
+        count = writer.write_count
+        for i in range(50):
+            writer.submit(dict(config, ocr={'keywords': [f'k{i}']}))
+        deadline = time.time() + 2
+        while time.time() < deadline:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                if json.load(f)['ocr']['keywords'] == ['k49']:
+                    break
+            time.sleep(0.01)
+        writer.flush()
+        with open(config_file, 'r', encoding='utf-8') as f:
+            assert json.load(f)['ocr']['keywords'] == ['k49'], "应写入最后提交的配置"
+        assert writer.write_count - count < 50, "连续提交应被合并"
+        print(f"✓ 50次提交合并为{writer.write_count - count}次写入")
+
+        # 6. 无法序列化的内容不破坏原文件
+        assert not writer.write({'bad': {(1, 2): 'tuple key'}}), "无法序列化的配置不应写入"
+        with open(config_file, 'r', encoding='utf-8') as f:
+            assert json.load(f)['ocr']['keywords'] == ['k49'], "原文件被破坏"
+        assert os.listdir(temp_dir) == ["autodoor_config.json"], "写入失败后残留临时文件"
+        print("✓ 写入失败时原文件保持完整")
+
+        # 7. flush等待后台线程正在进行的写入，之后的write不会被旧配置覆盖
+        original_write = autodoor.write_json_atomic
+
+        def slow_write(path, data):
+            if data['ocr']['keywords'] == ['old']:
+                time.sleep(0.2)
+            original_write(path, data)
+
+        autodoor.write_json_atomic = slow_write
+        try:
+            writer.submit(dict(config, ocr={'keywords': ['old']}))
+            time.sleep(0.05)
+            writer.flush()
+            with open(config_file, 'r', encoding='utf-8') as f:
+                assert json.load(f)['ocr']['keywords'] == ['old'], "flush应等待正在进行的写入完成"
+            for i in range(3):
+                writer.submit(dict(config, ocr={'keywords': ['old']}))
+                writer.flush()
+                writer.write(dict(config, ocr={'keywords': [f'new{i}']}))
+        finally:
+            autodoor.write_json_atomic = original_write
+        time.sleep(0.3)
+        with open(config_file, 'r', encoding='utf-8') as f:
+            assert json.load(f)['ocr']['keywords'] == ['new2'], "旧配置覆盖了新配置"
+        print("✓ flush等待正在进行的写入，旧配置不会覆盖新配置")
+
+        # 8. 保存Tesseract检测结果直接原子写入，不启动后台写入线程
+        engine = AutoDoorEngine(config_file=config_file, log_file=os.devnull, ui_log_capacity=0)
+        try:
+            threads = threading.active_count()
+            for i in range(5):
+                engine._save_tesseract_probe({'key': i, 'version': '5.3.0'})
+            assert threading.active_count() == threads, "保存检测结果不应启动新线程"
+            assert engine._load_tesseract_probe()['key'] == 4, "检测结果写入错误"
+        finally:
+            engine.close()
+        print("✓ 保存检测结果不启动后台线程")
+
+    print("\n=== 配置写入器测试完成 ===")
+
+if __name__ == "__main__":
+    test_config_writer()
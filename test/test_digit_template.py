@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数字模板识别测试脚本
+用于验证字符切分、模板学习、低置信度回退以及与Tesseract结果的核对
+"""
+
+import os
+import sys
+import time
+from PIL import ImageOps
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from autodoor import AutoDoorEngine, DigitTemplateRecognizer
+from test_number_recognition import create_test_image
+
+def test_digit_template():
+    """测试数字模板识别"""
+    print("=== 开始测试数字模板识别 ===")
+
+    # 1. 没有模板时回退
+    recognizer = DigitTemplateRecognizer()
+    assert recognizer.recognize(create_test_image("123/456")) is None, "没有模板时应返回None"
+    assert recognizer.fallbacks == 1
+    print("✓ 没有模板时回退到Tesseract")
+
+    # 2. 学习全部字符后识别
+    assert recognizer.learn(create_test_image("0123456789/", size=(120, 30)), "0123456789/"), "模板学习失败"
+    assert recognizer.learned_chars() == "0123456789/", f"已学习字符错误: {recognizer.learned_chars()}"
+    for text in ["123/456", "789/1011", "90/100"]:
+        result = recognizer.recognize(create_test_image(text))
+        assert result == text, f"识别错误: '{text}' -> '{result}'"
+    print("✓ 学习模板后识别正确")
+
+    # 3. 深色背景浅色文字
+    inverted = ImageOps.invert(create_test_image("123/456").convert('L'))
+    assert recognizer.recognize(inverted) == "123/456", "浅色文字识别错误"
+    print("✓ 自动识别文字颜色")
+
+    # 4. 未学习的数字置信度不足
+    partial = DigitTemplateRecognizer()
+    partial.learn(create_test_image("123/4"), "123/4")
+    assert partial.recognize(create_test_image("5/6")) is None, "未学习的数字不应被识别"
+    assert not partial.learn(create_test_image("123/4"), "12/4"), "字符数不一致时不应学习"
+    print("✓ 未学习的数字回退到Tesseract")
+
+    # 5. 识别速度
+    image = create_test_image("2864/2864")
+    recognizer.learn(image, "2864/2864")
+    start_time = time.perf_counter()
+    for _ in range(200):
+        recognizer.recognize(image)
+    avg_ms = (time.perf_counter() - start_time) / 200 * 1000
+    assert avg_ms < 5, f"模板识别过慢: {avg_ms:.3f}ms"
+    print(f"✓ 模板识别平均耗时{avg_ms:.3f}ms")
+
+    # 6. 引擎中Tesseract的结果用于学习，之后不再调用Tesseract
+    engine = AutoDoorEngine(log_file=os.devnull, ui_log_capacity=0)
+    engine.apply_config({'performance': {'digit_templates': True}})
+    calls = []
+
+    def fake_image_to_string(image, lang='eng', config='', timeout=None, cancel_event=None):
+        calls.append(config)
+        return "0123456789/" if image.width == 120 else "123/456"
+
+    engine.ocr_engine.image_to_string = fake_image_to_string
+    engine.configure_cache(0, 0)
+    try:
+        assert engine.ocr_number(create_test_image("0123456789/", size=(120, 30)), 0) == "0123456789/"
+        assert engine.ocr_number(create_test_image("123/456"), 0) == "123/456"
+        assert len(calls) == 1, f"学习模板后不应再调用Tesseract: {len(calls)}次"
+
+        # 定期核对，结果不一致时清空模板
+        engine.digit_verify_interval = 1
+        engine.ocr_number(create_test_image("456/123"), 0)
+        assert len(calls) == 2, "未按核对间隔调用Tesseract"
+        assert engine.get_digit_recognizer(0).learned_chars() == "123456/", "核对不一致时应重新学习模板"
+    finally:
+        engine.close()
+    print(f"✓ 引擎集成: {engine.format_digit_template_stats()}")
+
+    print("\n=== 数字模板识别测试完成 ===")
+
+if __name__ == "__main__":
+    test_digit_template()
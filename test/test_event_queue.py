@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+事件队列测试脚本
+用于验证按模块优先级出队、合并重复按键、队列已满时的丢弃策略以及队列深度统计
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from autodoor import AutoDoorEngine, EventQueue
+
+def make_event(key, module, index=0):
+    return (('keypress', key), (module, index), None, time.perf_counter())
+
+def test_event_queue():
+    """测试事件队列"""
+    print("=== 开始测试事件队列 ===")
+
+    # 1. 按模块优先级出队，同一优先级按先后顺序
+    queue = EventQueue()
+    for item in (make_event('space', 'timed'), make_event('f1', 'ocr'), make_event('f2', 'number'),
+                 make_event('enter', 'timed', 1), make_event('f3', 'number', 1)):
+        assert queue.push(item) == ("queued", None)
+    queue.push((('exit', None), None, None, time.perf_counter()))
+    order = [queue.pop()[0][1] for _ in range(6)]
+    assert order == [None, 'f2', 'f3', 'f1', 'space', 'enter'], f"出队顺序错误: {order}"
+    assert queue.pop() is None and len(queue) == 0
+    print(f"✓ 出队顺序: {order}")
+
+    # 2. 合并尚未执行的重复按键，不同区域的同一按键不合并
+    for _ in range(10):
+        queue.push(make_event('f2', 'number'))
+    queue.push(make_event('f2', 'number', 1))
+    assert len(queue) == 2 and queue.coalesced == 9, f"合并错误: {len(queue)}个, 合并{queue.coalesced}次"
+    queue.pop()
+    assert queue.push(make_event('f2', 'number', 1))[0] == "coalesced"
+    queue.pop()
+    assert queue.push(make_event('f2', 'number'))[0] == "queued", "事件取出后应可再次入队"
+    queue.pop()
+    print("✓ 重复按键合并为一个事件")
+
+    # 3. 跳过的事件留在队列中
+    queue.push(make_event('space', 'timed'))
+    queue.push(make_event('f1', 'timed', 1))
+    item = queue.pop(skip=lambda item: item[0][1] == 'space')
+    assert item[0][1] == 'f1' and len(queue) == 1
+    assert queue.pop()[0][1] == 'space'
+    print("✓ 跳过的事件留在队列中")
+
+    # 4. 队列已满：丢弃优先级最低的最早事件，新事件优先级更低时丢弃新事件
+    queue = EventQueue(max_size=3)
+    first = make_event('a', 'timed', 0)
+    second = make_event('b', 'timed', 1)
+    queue.push(first)
+    queue.push(second)
+    queue.push(make_event('c', 'ocr'))
+    result, dropped = queue.push(make_event('d', 'number'))
+    assert result == "dropped" and dropped is first, "应丢弃优先级最低的最早事件"
+    # 新事件与最低优先级相同时丢弃较早的事件，保留最新的按键
+    assert queue.push(make_event('e', 'timed', 2)) == ("dropped", second)
+    assert len(queue) == 3 and queue.dropped == 2
+    remaining = [queue.pop()[0][1] for _ in range(3)]
+    assert remaining == ['d', 'c', 'e'], f"丢弃后剩余事件错误: {remaining}"
+    print(f"✓ 队列已满时丢弃优先级最低的最早事件，剩余: {remaining}")
+
+    queue = EventQueue(max_size=2)
+    queue.push(make_event('f2', 'number'))
+    queue.push(make_event('f1', 'ocr'))
+    newest = make_event('space', 'timed')
+    assert queue.push(newest) == ("dropped", newest), "新事件优先级最低时应丢弃新事件"
+    print("✓ 新事件优先级最低时丢弃新事件")
+
+    # 5. 按模块丢弃和深度统计
+    queue = EventQueue()
+    for i in range(5):
+        queue.push(make_event('space', 'timed', i))
+    queue.push(make_event('f2', 'number'))
+    assert queue.discard(lambda item: item[1][0] == 'timed') == 5 and len(queue) == 1
+    stats = queue.get_stats()
+    assert stats["depth_max"] == 6 and stats["enqueued"] == 6, f"深度统计错误: {stats}"
+    print(f"✓ 队列统计: {queue.format_stats()}")
+
+    print("\n=== 事件队列测试完成 ===")
+
+def test_engine_event_queue():
+    """测试引擎中的事件队列：数字识别按键优先执行，重复按键合并"""
+    print("=== 开始测试引擎事件队列 ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = AutoDoorEngine(config_file=os.path.join(temp_dir, "autodoor_config.json"),
+                                log_file=os.path.join(temp_dir, "autodoor.log"), ui_log_capacity=0)
+        engine.apply_config({
+            'timed_key_press': {'groups': [
+                {'enabled': False, 'interval': 10, 'key': 'space', 'delay_min': 1, 'delay_max': 1},
+                {'enabled': False, 'interval': 10, 'key': 'enter', 'delay_min': 1, 'delay_max': 1}]},
+            'number_recognition': {'regions': [
+                {'enabled': False, 'region': [0, 0, 100, 30], 'threshold': 100, 'key': 'f2',
+                 'delay_min': 1, 'delay_max': 1}]},
+            'alarm': {'ocr': {'enabled': False}, 'timed': {'enabled': False}, 'number': {'enabled': False}}
+        })
+        engine.set_input_backend("record")
+        # 事件线程启动前入队，启动后按优先级执行
+        engine.add_event(('keypress', 'space'), ('timed', 0))
+        engine.add_event(('keypress', 'enter'), ('timed', 1))
+        for _ in range(20):
+            engine.add_event(('keypress', 'f2'), ('number', 0))
+        engine.start()
+        try:
+            time.sleep(0.3)
+            pressed = [key for _, action, key in engine.input_backend.actions if action == "down"]
+            assert pressed == ['f2', 'space', 'enter'], f"执行顺序错误: {pressed}"
+            print(f"✓ 执行顺序: {pressed}，20个重复按键合并为1个")
+            print(f"✓ {engine.format_event_queue_stats()}")
+        finally:
+            engine.close()
+
+    print("\n=== 引擎事件队列测试完成 ===")
+
+if __name__ == "__main__":
+    test_event_queue()
+    test_engine_event_queue()
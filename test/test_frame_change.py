@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+画面变化检测测试脚本
+用于验证画面未变化时复用识别结果，画面变化时重新识别
+"""
+
+import os
+import sys
+from PIL import Image, ImageDraw, ImageFont
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from autodoor import FrameChangeDetector
+
+def create_test_image(text, size=(100, 30)):
+    """创建测试图像"""
+    image = Image.new('RGB', size, color='white')
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default()
+    draw.text((10, 8), text, fill='black', font=font)
+    return image
+
+def test_frame_change_detection():
+    """测试画面变化检测"""
+    print("=== 开始测试画面变化检测 ===")
+
+    detector = FrameChangeDetector()
+    key = ("number", 0, (0, 0, 100, 30))
+
+    # 1. 第一帧必须执行识别
+    image = create_test_image("2864/2864")
+    hit, cached = detector.lookup(key, image)
+    assert not hit, "第一帧不应命中"
+    detector.store(key, ("2864/2864", 2864))
+
+    # 2. 相同画面复用结果
+    hit, cached = detector.lookup(key, create_test_image("2864/2864"))
+    assert hit, "相同画面应命中"
+    assert cached == ("2864/2864", 2864), f"复用结果错误: {cached}"
+    print(f"✓ 相同画面复用结果: {cached}")
+
+    # 3. 少量噪点不视为变化
+    noisy = create_test_image("2864/2864")
+    noisy.putpixel((50, 2), (250, 250, 250))
+    hit, _ = detector.lookup(key, noisy)
+    assert hit, "少量噪点不应视为画面变化"
+    print("✓ 少量噪点被忽略")
+
+    # 4. 数字变化时重新识别
+    hit, _ = detector.lookup(key, create_test_image("1864/2864"))
+    assert not hit, "数字变化时应重新识别"
+    print("✓ 数字变化时重新识别")
+
+    # 5. 未保存结果前不会命中
+    hit, _ = detector.lookup(key, create_test_image("1864/2864"))
+    assert not hit, "未保存识别结果时不应命中"
+
+    assert detector.hits == 2 and detector.misses == 3, f"统计错误: {detector.hits}/{detector.misses}"
+    print(f"统计: {detector.format_stats()}")
+
+    print("\n=== 画面变化检测测试完成 ===")
+
+if __name__ == "__main__":
+    test_frame_change_detection()
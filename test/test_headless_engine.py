@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+无界面运行引擎测试脚本
+用于验证引擎直接读取配置字典运行，不依赖Tk界面
+"""
+
+import os
+import sys
+import json
+import stat
+import time
+import platform
+import tempfile
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from autodoor import AutoDoorEngine, main_headless
+
+# 模拟启动很慢的tesseract，用于验证无界面模式不等待Tesseract检测
+SLOW_TESSERACT = """#!/bin/sh
+sleep 1
+echo "tesseract 5.3.0"
+"""
+
+def create_config():
+    """创建测试配置，结构与autodoor_config.json相同"""
+    return {
+        'ocr': {
+            'interval': 2,
+            'selected_region': [10, 10, 110, 40],
+            'custom_key': 'f1',
+            'custom_keywords': ['Men', ' door '],
+            'delay_min': 100,
+            'delay_max': 200
+        },
+        'click': {'mode': 'custom', 'x': 5, 'y': 6},
+        'timed_key_press': {
+            'groups': [
+                {'enabled': True, 'interval': 0.1, 'key': 'space', 'delay_min': 10, 'delay_max': 20},
+                {'enabled': False, 'interval': 0.1, 'key': 'enter'}
+            ]
+        },
+        'number_recognition': {
+            'interval': 0.5,
+            'regions': [{'enabled': False, 'region': [0, 0, 100, 30], 'threshold': 100, 'key': 'f2'}]
+        },
+        'performance': {'ocr_cache_size': 16, 'ocr_cache_ttl': 60},
+        'log': {'level': 'debug'}
+    }
+
+def test_headless_engine():
+    """测试无界面运行引擎"""
+    print("=== 开始测试无界面运行引擎 ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_file = os.path.join(temp_dir, "autodoor_config.json")
+        log_file = os.path.join(temp_dir, "autodoor.log")
+        with open(config_file, 'w', encoding='utf-8') as f:
+            json.dump(create_config(), f)
+
+        # 1. 加载配置文件
+        start_time = time.perf_counter()
+        engine = AutoDoorEngine(config_file, log_file)
+        assert engine.load_config_file(), "配置加载失败"
+        startup_ms = (time.perf_counter() - start_time) * 1000
+        assert engine.selected_region == (10, 10, 110, 40), f"监控区域错误: {engine.selected_region}"
+        assert engine.custom_keywords == ['men', 'door'], f"关键词错误: {engine.custom_keywords}"
+        assert engine.calculate_click_position() == (15, 16), "点击位置错误"
+        assert engine.ocr_cache.max_size == 16 and engine.log_level == 'debug', "性能或日志配置未生效"
+        print(f"✓ 配置加载成功，耗时{startup_ms:.0f}ms")
+
+        # 2. 兼容旧版平铺格式
+        engine.apply_config({'selected_region': [0, 0, 50, 50], 'custom_key': 'f3', 'click_mode': 'center'})
+        assert engine.selected_region == (0, 0, 50, 50) and engine.custom_key == 'f3', "旧版配置格式未生效"
+        engine.apply_config(create_config())
+        print("✓ 兼容旧版配置格式")
+
+        # 3. 定时任务通过事件队列触发按键，只记录不注入
+        engine.set_input_backend("record")
+        events = []
+        engine.add_event = lambda event, module_info=None, detect_time=None: events.append((event, module_info))
+        engine.start()
+        try:
+            assert engine.start_modules(["timed"]) == ["timed"], "定时模块未启动"
+            time.sleep(0.35)
+
+            # 运行中修改配置，禁用定时组后不再触发
+            config = create_config()
+            config['timed_key_press']['groups'][0]['enabled'] = False
+            engine.apply_config(config)
+            time.sleep(0.15)
+            count = len(events)
+            time.sleep(0.2)
+            assert len(events) == count, "定时组禁用后仍在触发"
+        finally:
+            engine.close()
+        assert count >= 3, f"定时任务触发次数错误: {count}"
+        keypresses = [event for event in events if event[0][0] == 'keypress']
+        assert all(event == (('keypress', 'space'), ('timed', 0)) for event in keypresses), f"触发事件错误: {events}"
+        print(f"✓ 定时任务触发{count}次，禁用后停止")
+
+        # 关闭引擎时只停止运行中的模块，每个模块只停止一次
+        with open(log_file, 'r', encoding='utf-8') as f:
+            log_text = f.read()
+        log_text = log_text.split("开始定时任务")[-1]
+        assert log_text.count("已停止定时任务") == 1, "定时任务应只停止一次"
+        assert "已停止数字识别" not in log_text and "已停止监控" not in log_text, "未运行的模块不应再停止"
+        print("✓ 关闭引擎时只停止运行中的模块")
+
+        # 4. 命令行入口
+        result = main_headless(["--config", config_file, "--log-file", log_file, "--modules", "timed",
+                                "--input-backend", "record", "--duration", "0.2", "--quiet"])
+        assert result == 0, f"命令行入口返回值错误: {result}"
+        result = main_headless(["--config", config_file, "--log-file", log_file, "--modules", "number",
+                                "--input-backend", "record", "--quiet"])
+        assert result == 1, "没有可运行的模块时应返回1"
+        print("✓ 命令行入口运行正常")
+
+        # 5. Tesseract在后台检测，不依赖Tesseract的定时任务立即启动
+        if platform.system() != "Windows":
+            tesseract_cmd = os.path.join(temp_dir, "tesseract")
+            with open(tesseract_cmd, 'w') as f:
+                f.write(SLOW_TESSERACT)
+            os.chmod(tesseract_cmd, os.stat(tesseract_cmd).st_mode | stat.S_IEXEC)
+            config = create_config()
+            config['tesseract'] = {'path': tesseract_cmd}
+            with open(config_file, 'w', encoding='utf-8') as f:
+                json.dump(config, f)
+            start_time = time.perf_counter()
+            result = main_headless(["--config", config_file, "--log-file", log_file, "--modules", "ocr,timed",
+                                    "--input-backend", "record", "--duration", "0.2", "--quiet"])
+            elapsed = time.perf_counter() - start_time
+            assert result == 0, f"定时任务应立即启动: {result}"
+            assert elapsed < 0.9, f"启动时等待了Tesseract检测: {elapsed:.2f}秒"
+            # 等待后台检测结束后再删除临时目录
+            time.sleep(1.5)
+            print(f"✓ 后台检测Tesseract，{elapsed:.2f}秒后按时退出")
+
+    print("\n=== 无界面运行引擎测试完成 ===")
+
+if __name__ == "__main__":
+    test_headless_engine()
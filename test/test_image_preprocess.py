@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR图像预处理测试脚本
+用于验证二值化、文字颜色统一、裁剪缩放以及numpy和PIL两种实现的一致性
+"""
+
+import os
+import sys
+from PIL import Image, ImageChops, ImageOps
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import autodoor
+from autodoor import AutoDoorEngine, ImagePreprocessor
+from test_number_recognition import create_test_image
+
+def is_binary(image):
+    """图像只包含0和255两种灰度"""
+    return [value for value, count in enumerate(image.histogram()) if count] == [0, 255]
+
+def test_image_preprocess():
+    """测试OCR图像预处理"""
+    print("=== 开始测试OCR图像预处理 ===")
+
+    preprocessor = ImagePreprocessor()
+    options = ImagePreprocessor.normalize_options({'enabled': True, 'target_height': 32})
+
+    # 1. 输出白底黑字的二值图像，文字裁剪后缩放到目标高度附近
+    image = create_test_image("123/456", size=(200, 60))
+    result = preprocessor.process(("number", 0), image, options)
+    assert result.mode == 'L' and is_binary(result), "输出应为二值图像"
+    text_height = result.height - ImagePreprocessor.BORDER * 2
+    assert 16 <= text_height <= 48, f"文字高度未缩放到目标高度附近: {text_height}"
+    assert result.getpixel((0, 0)) == 255, "背景应为白色"
+    print(f"✓ 输出二值图像 {result.size}，文字高度{text_height}")
+
+    # 2. 深色背景浅色文字统一为白底黑字
+    inverted = preprocessor.process(("number", 1), ImageOps.invert(image.convert('L')), options)
+    assert ImageChops.difference(result, inverted).getbbox() is None, "文字颜色未统一"
+    print("✓ 自动统一文字颜色")
+
+    # 3. 没有文字内容时返回空白图像
+    blank = preprocessor.process(("number", 2), Image.new('L', (50, 20), 128), options)
+    assert blank.getextrema() == (255, 255), "空白截图应返回空白图像"
+    print("✓ 空白截图返回空白图像")
+
+    # 4. numpy和PIL两种实现结果一致
+    if autodoor.NUMPY_AVAILABLE:
+        autodoor.NUMPY_AVAILABLE = False
+        try:
+            pil_result = ImagePreprocessor().process(("number", 0), image, options)
+        finally:
+            autodoor.NUMPY_AVAILABLE = True
+        assert ImageChops.difference(result, pil_result).getbbox() is None, "numpy和PIL实现结果不一致"
+        print("✓ numpy和PIL实现结果一致")
+
+    # 5. 自适应阈值
+    adaptive = preprocessor.process(("ocr", 0), image, dict(options, threshold='adaptive'))
+    assert is_binary(adaptive), "自适应阈值输出应为二值图像"
+    print("✓ 自适应阈值")
+
+    # 6. 引擎中开启预处理后，交给Tesseract的是预处理后的图像，并记录耗时
+    engine = AutoDoorEngine(log_file=os.devnull, ui_log_capacity=0)
+    received = []
+
+    def fake_image_to_string(image, lang='eng', config='', timeout=None, cancel_event=None):
+        received.append(image)
+        return "123/456"
+
+    engine.ocr_engine.image_to_string = fake_image_to_string
+    engine.digit_templates_enabled = False
+    try:
+        engine.apply_config({'number_recognition': {'regions': [
+            {'enabled': True, 'region': [0, 0, 200, 60], 'preprocess': {'enabled': True}}]}})
+        assert engine.ocr_number(image, 0) == "123/456"
+        assert is_binary(received[-1]), "Tesseract收到的应是预处理后的图像"
+        stages = [row['stage'] for row in engine.latency.snapshot()]
+        assert "preprocess" in stages, f"未记录预处理耗时: {stages}"
+
+        # 关闭预处理后使用不同的缓存键
+        engine.apply_config({'number_recognition': {'regions': [
+            {'enabled': True, 'region': [0, 0, 200, 60], 'preprocess': {'enabled': False}}]}})
+        engine.ocr_number(image, 0)
+        assert len(received) == 2 and received[-1].size == image.size, "关闭预处理后应使用原图识别"
+    finally:
+        engine.close()
+    print("✓ 引擎按区域配置预处理")
+
+    print("\n=== OCR图像预处理测试完成 ===")
+
+if __name__ == "__main__":
+    test_image_preprocess()
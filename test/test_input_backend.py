@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+输入后端测试脚本
+用于验证输入后端的选择、延迟创建、pyautogui后端关闭固定暂停、记录后端以及每次注入的耗时统计
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import autodoor
+from autodoor import (AutoDoorEngine, PyAutoGUIBackend, RecordingBackend, XTestBackend, XLIB_AVAILABLE,
+                      create_input_backend)
+
+class FakePyAutoGUI:
+    """模拟pyautogui，记录调用"""
+
+    def __init__(self):
+        self.PAUSE = 0.1
+        self.calls = []
+
+    def click(self, x, y):
+        self.calls.append(("click", x, y))
+
+    def keyDown(self, key):
+        self.calls.append(("keyDown", key))
+
+    def keyUp(self, key):
+        self.calls.append(("keyUp", key))
+
+def test_input_backend():
+    """测试输入后端"""
+    print("=== 开始测试输入后端 ===")
+
+    # 1. 后端选择：没有X11会话时auto使用pyautogui
+    display = os.environ.pop("DISPLAY", None)
+    try:
+        assert isinstance(create_input_backend("auto"), PyAutoGUIBackend)
+        assert isinstance(create_input_backend("record"), RecordingBackend)
+        if XLIB_AVAILABLE:
+            try:
+                XTestBackend(":99999")
+                assert False, "无法连接X服务器时应抛出异常"
+            except Exception:
+                pass
+    finally:
+        if display is not None:
+            os.environ["DISPLAY"] = display
+    print("✓ 没有X11会话时auto使用pyautogui")
+
+    # 2. pyautogui后端调用pyautogui，首次导入时关闭每次调用后的固定暂停
+    fake = FakePyAutoGUI()
+    original = autodoor.pyautogui
+    autodoor.pyautogui = fake
+    try:
+        backend = PyAutoGUIBackend()
+        backend.click(10, 20)
+        backend.key_down("f2")
+        backend.key_up("f2")
+        assert fake.calls == [("click", 10, 20), ("keyDown", "f2"), ("keyUp", "f2")], f"调用错误: {fake.calls}"
+    finally:
+        autodoor.pyautogui = original
+    autodoor._init_pyautogui(fake)
+    assert fake.PAUSE == 0 and fake.FAILSAFE is False
+    print("✓ pyautogui后端调用正常，固定暂停已关闭")
+
+    # 3. 记录后端
+    backend = RecordingBackend()
+    backend.click(1, 2)
+    backend.key_down("space")
+    backend.key_up("space")
+    assert [(action, value) for _, action, value in backend.actions] == [
+        ("click", (1, 2)), ("down", "space"), ("up", "space")]
+    assert len(backend.times("down", "space")) == 1
+    backend.clear()
+    assert not backend.actions
+    print("✓ 记录后端记录点击和按键")
+
+    # 4. 引擎在首次注入时才创建后端，配置了其他后端时不创建auto后端
+    created = []
+    original_create = autodoor.create_input_backend
+
+    def create_input_backend_spy(name="auto"):
+        created.append(name)
+        return original_create(name)
+
+    autodoor.create_input_backend = create_input_backend_spy
+    try:
+        engine = AutoDoorEngine(log_file=os.devnull, ui_log_capacity=0)
+        try:
+            assert engine.input_backend is None and created == [], "构造引擎时不应创建输入后端"
+            engine.apply_config({'performance': {'input_backend': 'pyautogui'}})
+            assert created == ["pyautogui"] and isinstance(engine.get_input_backend(), PyAutoGUIBackend)
+        finally:
+            engine.close()
+        engine = AutoDoorEngine(log_file=os.devnull, ui_log_capacity=0)
+        try:
+            backend = engine.get_input_backend()
+            assert created == ["pyautogui", "auto"] and engine.get_input_backend() is backend, "首次使用时应创建一次"
+        finally:
+            engine.close()
+    finally:
+        autodoor.create_input_backend = original_create
+    print("✓ 输入后端在首次注入时才创建")
+
+    # 5. 引擎切换后端，每次点击、按下和弹起的耗时记录到统计中
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = AutoDoorEngine(config_file=os.path.join(temp_dir, "autodoor_config.json"),
+                                log_file=os.path.join(temp_dir, "autodoor.log"), ui_log_capacity=0)
+        engine.apply_config({
+            'ocr': {'selected_region': [0, 0, 100, 100], 'custom_key': 'equal', 'delay_min': 20, 'delay_max': 20},
+            'performance': {'input_backend': 'record'},
+            'alarm': {'ocr': {'enabled': False}, 'timed': {'enabled': False}, 'number': {'enabled': False}}
+        })
+        engine.click_delay = 0.01
+        assert engine.input_backend_name == "record" and isinstance(engine.input_backend, RecordingBackend)
+        engine.start()
+        try:
+            engine.trigger_action()
+            time.sleep(0.2)
+        finally:
+            engine.close()
+        actions = [(action, value) for _, action, value in engine.input_backend.actions]
+        assert actions == [("click", (50, 50)), ("down", "equal"), ("up", "equal")], f"注入的事件错误: {actions}"
+        stages = {row['stage']: row for row in engine.latency.snapshot() if row['module'] == 'ocr'}
+        assert {"click", "keydown", "keyup"} <= set(stages), f"缺少注入耗时: {sorted(stages)}"
+        print("✓ 注入耗时: " + ", ".join(f"{stage} {stages[stage]['p50']:.3f}ms" for stage in ("click", "keydown", "keyup")))
+
+    print("\n=== 输入后端测试完成 ===")
+
+if __name__ == "__main__":
+    test_input_backend()
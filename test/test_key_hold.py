@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按键按住调度测试脚本
+用于验证按住按键期间事件线程继续处理其他按键、同一按键弹起后再次按下以及退出时弹起所有按键
+"""
+
+import os
+import sys
+import time
+import tempfile
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from autodoor import AutoDoorEngine
+
+def create_engine(temp_dir):
+    engine = AutoDoorEngine(config_file=os.path.join(temp_dir, "autodoor_config.json"),
+                            log_file=os.path.join(temp_dir, "autodoor.log"), ui_log_capacity=0)
+    engine.apply_config({
+        'timed_key_press': {'groups': [
+            {'enabled': False, 'interval': 10, 'key': 'space', 'delay_min': 400, 'delay_max': 400}]},
+        'number_recognition': {'regions': [
+            {'enabled': False, 'region': [0, 0, 100, 30], 'threshold': 100, 'key': 'f2', 'delay_min': 50, 'delay_max': 50}]},
+        'alarm': {'ocr': {'enabled': False}, 'timed': {'enabled': False}, 'number': {'enabled': False}}
+    })
+    # 只记录按键按下和弹起的时间，不真正注入
+    engine.set_input_backend("record")
+    return engine
+
+def test_key_hold():
+    """测试按键按住调度"""
+    print("=== 开始测试按键按住调度 ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = create_engine(temp_dir)
+        recorder = engine.input_backend
+        engine.start()
+        try:
+            # 1. 定时组按住400ms期间，数字识别的按键不用等待
+            start = time.perf_counter()
+            engine.add_event(('keypress', 'space'), ('timed', 0))
+            time.sleep(0.02)
+            engine.add_event(('keypress', 'f2'), ('number', 0))
+            time.sleep(0.6)
+            f2_down = recorder.times("down", "f2")[0] - start
+            space_up = recorder.times("up", "space")[0] - start
+            assert f2_down < 0.1, f"按住其他按键时数字识别按键被延迟: {f2_down*1000:.0f}ms"
+            assert 0.38 < space_up < 0.5, f"按住时长错误: {space_up*1000:.0f}ms"
+            assert recorder.times("up", "f2")[0] < recorder.times("up", "space")[0], "较短的按键应先弹起"
+            print(f"✓ space按住{space_up*1000:.0f}ms期间，f2在{f2_down*1000:.0f}ms时按下")
+
+            # 2. 同一按键按住期间的新事件在弹起后执行，其他按键不受影响
+            recorder.clear()
+            engine.add_event(('keypress', 'space'), ('timed', 0))
+            # 等第一次按下后再入队，尚未执行的重复按键会被合并
+            time.sleep(0.02)
+            engine.add_event(('keypress', 'space'), ('timed', 0))
+            engine.add_event(('keypress', 'f2'), ('number', 0))
+            time.sleep(1.0)
+            downs = recorder.times("down", "space")
+            ups = recorder.times("up", "space")
+            assert len(downs) == 2 and len(ups) == 2, f"按键次数错误: {recorder.actions}"
+            assert downs[1] >= ups[0], "同一按键应在弹起后再次按下"
+            assert recorder.times("down", "f2")[0] < ups[0], "其他按键不应等待同一按键的第二次按下"
+            print("✓ 同一按键弹起后再次按下")
+
+            # 3. 排队期间区域已被删除时，使用默认按键时长并照常弹起
+            recorder.clear()
+            engine.add_event(('keypress', 'f3'), ('number', 5))
+            time.sleep(0.7)
+            downs = recorder.times("down", "f3")
+            ups = recorder.times("up", "f3")
+            assert len(downs) == 1 and len(ups) == 1, f"按键未弹起: {recorder.actions}"
+            assert 0.28 < ups[0] - downs[0] < 0.6, f"默认按住时长错误: {(ups[0] - downs[0])*1000:.0f}ms"
+            assert 'f3' not in engine.held_keys
+            print("✓ 区域已删除时按默认时长按住后弹起")
+
+            # 4. 退出时弹起仍按住的按键
+            recorder.clear()
+            engine.add_event(('keypress', 'space'), ('timed', 0))
+            time.sleep(0.05)
+        finally:
+            close_start = time.perf_counter()
+            engine.close()
+        ups = recorder.times("up", "space")
+        assert len(ups) == 1 and ups[0] - close_start < 0.2, "退出时未弹起按住的按键"
+        assert not engine.held_keys, f"仍有按住的按键: {engine.held_keys}"
+        print("✓ 退出时弹起仍按住的按键")
+
+    print("\n=== 按键按住调度测试完成 ===")
+
+if __name__ == "__main__":
+    test_key_hold()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+关键词匹配测试脚本
+用于验证多关键词匹配、OCR混淆字符规范化、编辑距离为1的模糊匹配以及不应匹配的相似单词
+"""
+
+import os
+import sys
+import time
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from autodoor import AutoDoorEngine, KeywordMatcher
+
+def test_keyword_matcher():
+    """测试关键词匹配"""
+    print("=== 开始测试关键词匹配 ===")
+
+    # 1. 精确匹配，报告关键词和位置
+    matcher = KeywordMatcher(["men", "Door", "门"])
+    match = matcher.search("The DOOR is open")
+    assert match and match.keyword == "door" and (match.start, match.end, match.text) == (4, 8, "DOOR"), f"匹配结果错误: {match}"
+    assert matcher.search("门已开启").keyword == "门", "中文关键词未匹配"
+    assert matcher.search("d00r") is None, "精确匹配不应容忍混淆字符"
+    assert matcher.search("nothing here") is None
+    # 重叠的关键词：位置靠前的优先，位置相同时较长的优先
+    overlapping = KeywordMatcher(["ab", "xabc"])
+    match = overlapping.search("xabc")
+    assert match and (match.keyword, match.start) == ("xabc", 0), f"应匹配位置靠前的关键词: {match}"
+    match = KeywordMatcher(["open", "open door"]).search("please open door now")
+    assert match and (match.keyword, match.start) == ("open door", 7), f"位置相同时应匹配较长的关键词: {match}"
+    assert KeywordMatcher(["ab", "xabc"], fuzzy=True).search("xabc").keyword == "xabc"
+    print("✓ 精确匹配报告关键词和位置")
+
+    # 2. 模糊匹配：混淆字符和编辑距离
+    fuzzy = KeywordMatcher(["men", "door", "danger"], fuzzy=True)
+    cases = {
+        "the d00r": ("door", "d00r", 0),
+        "rnen at work": ("men", "rnen", 0),
+        "the dnger": ("danger", "dnger", 1),
+        "dangor zone": ("danger", "dangor", 1),
+        "the dangeer!": ("danger", "dangeer", 1),
+    }
+    for text, (keyword, matched_text, distance) in cases.items():
+        match = fuzzy.search(text)
+        assert match and (match.keyword, match.text, match.distance) == (keyword, matched_text, distance), \
+            f"模糊匹配错误: '{text}' -> {match}"
+    # 精确匹配优先于模糊匹配
+    assert fuzzy.search("dnger ... danger").distance == 0, "应优先报告精确匹配"
+    print("✓ 模糊匹配容忍混淆字符和一个字符的错误")
+
+    # 3. 不应匹配：短关键词不做编辑距离匹配，编辑距离为1的匹配必须是完整的单词
+    negatives = ["man", "ten", "the floor", "poor guy", "moor", "doom", "the dor", "doer",
+                 "xdnger", "dangorous", "dnagerous", "endangor"]
+    for text in negatives:
+        match = fuzzy.search(text)
+        assert match is None, f"不应匹配: '{text}' -> {match}"
+    # 精确匹配仍按子串匹配
+    assert fuzzy.search("indoors").keyword == "door" and fuzzy.search("endangered").distance == 0
+    print(f"✓ 相似单词不会误触发: {', '.join(negatives)}")
+
+    # 4. 耗时与关键词数量无关
+    text = "lorem ipsum dolor sit amet, consectetur adipiscing elit " * 20
+    timings = []
+    for count in (2, 200):
+        many = KeywordMatcher([f"keyword{i}" for i in range(count)])
+        start_time = time.perf_counter()
+        for _ in range(50):
+            many.search(text)
+        timings.append(time.perf_counter() - start_time)
+    assert timings[1] < timings[0] * 3, f"关键词增多后匹配明显变慢: {timings}"
+    print(f"✓ 2个和200个关键词匹配耗时: {timings[0]*20:.3f}ms / {timings[1]*20:.3f}ms")
+
+    # 5. 引擎只在关键词或匹配方式变化时重新编译
+    engine = AutoDoorEngine(log_file=os.devnull, ui_log_capacity=0)
+    try:
+        engine.apply_config({'ocr': {'custom_keywords': ['door']}})
+        compiled = engine.keyword_matcher
+        engine.apply_config({'ocr': {'custom_keywords': ['door'], 'interval': 3}})
+        assert engine.keyword_matcher is compiled, "关键词未变化时不应重新编译"
+        assert engine.match_keywords("d00r") is None
+        engine.apply_config({'ocr': {'custom_keywords': ['door'], 'fuzzy_match': True}})
+        assert engine.keyword_matcher is not compiled and engine.match_keywords("d00r"), "开启模糊匹配后应重新编译"
+    finally:
+        engine.close()
+    print("✓ 引擎按需重新编译关键词匹配器")
+
+    print("\n=== 关键词匹配测试完成 ===")
+
+if __name__ == "__main__":
+    test_keyword_matcher()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+耗时统计测试脚本
+用于验证百分位数计算、滚动窗口以及JSON导出
+"""
+
+import os
+import sys
+import json
+import tempfile
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from autodoor import LatencyRecorder
+
+def test_latency_recorder():
+    """测试耗时统计"""
+    print("=== 开始测试耗时统计 ===")
+
+    recorder = LatencyRecorder(window=100)
+
+    # 1. 百分位数计算
+    for ms in range(1, 101):
+        recorder.record("number", 0, "ocr", float(ms))
+    rows = recorder.snapshot()
+    assert len(rows) == 1, f"统计行数错误: {len(rows)}"
+    row = rows[0]
+    assert (row['p50'], row['p95'], row['p99'], row['max']) == (50.0, 95.0, 99.0, 100.0), f"百分位数错误: {row}"
+    print(f"✓ 百分位数正确: p50={row['p50']}, p95={row['p95']}, p99={row['p99']}")
+
+    # 2. 只保留最近的样本
+    for _ in range(100):
+        recorder.record("number", 0, "ocr", 1.0)
+    row = recorder.snapshot()[0]
+    assert row['count'] == 100 and row['max'] == 1.0, f"滚动窗口错误: {row}"
+    print("✓ 滚动窗口只保留最近的样本")
+
+    # 3. 按模块、区域和流水线顺序排列
+    recorder.record("number", 0, "total", 5.0)
+    recorder.record("number", 0, "capture", 1.0)
+    recorder.record("number", 1, "capture", 1.0)
+    recorder.record("ocr", 0, "match", 0.1)
+    order = [(row['module'], row['region'], row['stage']) for row in recorder.snapshot()]
+    assert order == [("number", 0, "capture"), ("number", 0, "ocr"), ("number", 0, "total"),
+                     ("number", 1, "capture"), ("ocr", 0, "match")], f"排列顺序错误: {order}"
+    print("✓ 按流水线顺序排列")
+
+    # 4. 导出JSON
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "latency.json")
+        recorder.export_json(path)
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        assert data['window'] == 100 and len(data['stages']) == 5, f"导出内容错误: {data}"
+    print("✓ 导出JSON成功")
+
+    # 5. 重置
+    recorder.reset()
+    assert recorder.snapshot() == [], "重置后应没有统计"
+
+    print("\n=== 耗时统计测试完成 ===")
+
+if __name__ == "__main__":
+    test_latency_recorder()
@@ -89,7 +89,7 @@ def test_xy_format_recognition():
     test_image.save("test_xy_format.png")
     
     # 模拟截图函数
-    def mock_take_screenshot(region):
+    def mock_take_screenshot(region, key=None):
         return Image.open("test_xy_format.png")
     
     # 保存原始的take_screenshot方法
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR识别结果缓存测试脚本
+用于验证LRU淘汰、有效期和按配置区分缓存键
+"""
+
+import os
+import sys
+import time
+from PIL import Image
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from autodoor import OCRResultCache
+
+def test_ocr_cache():
+    """测试OCR识别结果缓存"""
+    print("=== 开始测试OCR识别结果缓存 ===")
+
+    config = '--psm 7 --oem 3 -c tessedit_char_whitelist=0123456789/'
+    images = [Image.new('L', (100, 30), color=value) for value in (0, 80, 160)]
+
+    # 1. 相同图像、语言和配置命中缓存
+    cache = OCRResultCache(max_size=2, ttl=300)
+    key = OCRResultCache.make_key(images[0], 'eng', config)
+    assert cache.get(key) is None, "空缓存不应命中"
+    cache.put(key, "123/456")
+    assert cache.get(OCRResultCache.make_key(images[0].copy(), 'eng', config)) == "123/456", "相同图像应命中"
+    print("✓ 相同图像命中缓存")
+
+    # 2. 配置不同时不共享结果
+    assert cache.get(OCRResultCache.make_key(images[0], 'eng')) is None, "不同配置不应命中"
+    print("✓ 不同配置区分缓存")
+
+    # 3. 超过容量时淘汰最久未使用的条目
+    key1 = OCRResultCache.make_key(images[1], 'eng', config)
+    key2 = OCRResultCache.make_key(images[2], 'eng', config)
+    cache.put(key1, "1")
+    cache.get(key)
+    cache.put(key2, "2")
+    assert cache.get(key1) is None, "最久未使用的条目应被淘汰"
+    assert cache.get(key) == "123/456", "最近使用的条目应保留"
+    print("✓ LRU淘汰正确")
+
+    # 4. 超过有效期的结果失效
+    cache.configure(max_size=2, ttl=0.05)
+    time.sleep(0.1)
+    assert cache.get(key) is None, "过期结果应失效"
+    print("✓ 有效期生效")
+
+    # 5. 容量为0时禁用缓存
+    cache.configure(max_size=0, ttl=300)
+    cache.put(key, "123/456")
+    assert cache.get(key) is None, "禁用缓存时不应命中"
+
+    print(cache.format_stats())
+    print("\n=== OCR识别结果缓存测试完成 ===")
+
+if __name__ == "__main__":
+    test_ocr_cache()
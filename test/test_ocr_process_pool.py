@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR进程池测试脚本
+用于验证进程池模式在工作进程中识别、每个工作进程限制OpenMP线程数、提交后返回Future、多进程并行识别、超时后回收卡住的工作进程以及数字识别并发数随池大小调整
+"""
+
+import os
+import sys
+import stat
+import time
+import platform
+import tempfile
+import threading
+
+from PIL import Image
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from autodoor import AutoDoorEngine, FileReplayBackend, OCRCancelled, OCREngine, OCRTimeout
+
+# 模拟的tesseract：每次识别耗时0.2秒，输出OpenMP线程限制和父进程号（即工作进程号）
+FAKE_TESSERACT = """#!/bin/sh
+cat > /dev/null
+sleep 0.2
+echo "${OMP_THREAD_LIMIT:-none} $PPID"
+"""
+
+# 模拟卡住的tesseract：存在hang文件时，后台子进程继续占用标准输出，
+# 工作进程终止tesseract后仍等不到输出结束，一直占用进程池
+HANGING_TESSERACT = """#!/bin/sh
+cat > /dev/null
+if [ -e "$(dirname "$0")/hang" ]; then
+    sleep 10 &
+    wait
+fi
+echo "ok $PPID"
+"""
+
+def create_fake_tesseract(temp_dir, script=FAKE_TESSERACT, name="tesseract"):
+    """在临时目录创建模拟的tesseract可执行文件"""
+    path = os.path.join(temp_dir, name)
+    with open(path, 'w') as f:
+        f.write(script)
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path
+
+def process_exited(pid):
+    """进程已退出（包括尚未回收的僵尸进程）"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] == "Z"
+    except OSError:
+        return True
+
+def run_batch(engine, image, count):
+    """同时提交count张图像，返回(识别结果列表, 耗时秒)"""
+    start = time.perf_counter()
+    futures = [engine.submit(image, lang='eng', config='--psm 7') for _ in range(count)]
+    results = [future.result(timeout=30).split() for future in futures]
+    return results, time.perf_counter() - start
+
+def test_ocr_process_pool():
+    """测试OCR进程池"""
+    print("=== 开始测试OCR进程池 ===")
+
+    if platform.system() == "Windows":
+        print("跳过: 模拟的tesseract需要sh")
+        return
+
+    image = Image.new('L', (60, 20), color=255)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tesseract_cmd = create_fake_tesseract(temp_dir)
+
+        # 1. 默认进程池大小为CPU核数
+        engine = OCREngine(tesseract_cmd, backend="pipe", executor="process", pool_size=0)
+        assert engine.pool_size == (os.cpu_count() or 1), f"进程池大小错误: {engine.pool_size}"
+        engine.close()
+        print(f"✓ 默认进程池大小为CPU核数: {os.cpu_count()}")
+
+        # 2. 在工作进程中识别，每个工作进程限制OpenMP线程数
+        serial = OCREngine(tesseract_cmd, backend="pipe", executor="process", pool_size=1)
+        parallel = OCREngine(tesseract_cmd, backend="pipe", executor="process", pool_size=4)
+        try:
+            limit, worker_pid = serial.image_to_string(image).split()
+            assert limit == "1", f"工作进程未限制OpenMP线程数: {limit}"
+            assert int(worker_pid) != os.getpid(), "识别应在工作进程中执行"
+            print(f"✓ 在工作进程{worker_pid}中识别，OMP_THREAD_LIMIT={limit}")
+
+            # 3. 提交后返回Future，多个工作进程并行识别
+            run_batch(parallel, image, 4)  # 预先启动工作进程
+            results, parallel_time = run_batch(parallel, image, 8)
+            _, serial_time = run_batch(serial, image, 8)
+            workers = {pid for _, pid in results}
+            assert all(limit == "1" for limit, _ in results)
+            assert 1 < len(workers) <= 4, f"工作进程数错误: {workers}"
+            speedup = serial_time / parallel_time
+            assert speedup > 2, f"4个工作进程的吞吐量提升不足: {speedup:.1f}倍"
+            print(f"✓ 8次识别: 1个工作进程{serial_time:.2f}秒，4个工作进程{parallel_time:.2f}秒，提升{speedup:.1f}倍")
+
+            # 4. 取消等待中的识别
+            cancel_event = threading.Event()
+            threading.Timer(0.05, cancel_event.set).start()
+            try:
+                serial.image_to_string(image, cancel_event=cancel_event)
+                assert False, "取消应抛出OCRCancelled"
+            except OCRCancelled:
+                pass
+            assert serial.get_stats()["cancelled"] == 1
+            print(f"✓ 取消等待中的识别，{serial.format_stats()}")
+        finally:
+            serial.close()
+            parallel.close()
+
+    # 5. 工作进程超过时限仍未返回时回收工作进程，后续识别不再等待卡住的工作进程
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tesseract_cmd = create_fake_tesseract(temp_dir, HANGING_TESSERACT)
+        hang_file = os.path.join(temp_dir, "hang")
+        engine = OCREngine(tesseract_cmd, backend="pipe", executor="process", pool_size=1)
+        try:
+            _, first_pid = engine.image_to_string(image).split()
+            open(hang_file, 'w').close()
+            start = time.perf_counter()
+            try:
+                engine.image_to_string(image, timeout=0.3)
+                assert False, "超时应抛出OCRTimeout"
+            except OCRTimeout:
+                pass
+            timed_out = time.perf_counter() - start
+            assert timed_out < 2, f"超时返回过慢: {timed_out:.2f}秒"
+            os.remove(hang_file)
+            start = time.perf_counter()
+            text, second_pid = engine.image_to_string(image, timeout=5).split()
+            recovered = time.perf_counter() - start
+            assert text == "ok" and second_pid != first_pid, "应在新的工作进程中识别"
+            assert recovered < 5, f"后续识别仍在等待卡住的工作进程: {recovered:.2f}秒"
+            deadline = time.monotonic() + 2
+            while not process_exited(first_pid) and time.monotonic() < deadline:
+                time.sleep(0.05)
+            assert process_exited(first_pid), "卡住的工作进程未被终止"
+            assert engine.get_stats()["timeouts"] == 1
+            print(f"✓ {timed_out:.2f}秒超时后回收工作进程{first_pid}，{recovered:.2f}秒后在工作进程{second_pid}中识别")
+        finally:
+            engine.close()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tesseract_cmd = create_fake_tesseract(temp_dir)
+
+        # 6. 线程模式不变
+        engine = OCREngine(tesseract_cmd, backend="pipe")
+        limit, pid = engine.image_to_string(image).split()
+        assert engine.executor == "thread" and engine.pool_size == OCREngine.DEFAULT_POOL_SIZE
+        assert int(pid) == os.getpid(), "线程模式应在当前进程中启动tesseract"
+        engine.close()
+        print("✓ 线程模式在当前进程中识别")
+
+    print("\n=== OCR进程池测试完成 ===")
+
+def test_number_concurrency():
+    """测试数字识别可同时识别的区域数随OCR池大小调整，不固定为4个"""
+    print("=== 开始测试数字识别并发数 ===")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = AutoDoorEngine(config_file=os.path.join(temp_dir, "autodoor_config.json"),
+                                log_file=os.path.join(temp_dir, "autodoor.log"), ui_log_capacity=0)
+        engine.apply_config({
+            'number_recognition': {'interval': 0.05, 'adaptive': False, 'regions': [
+                {'enabled': True, 'region': [i * 20, 0, i * 20 + 20, 20], 'threshold': 5, 'key': ''}
+                for i in range(8)]},
+            'performance': {'ocr_executor': 'thread', 'ocr_pool_size': 8},
+            'alarm': {'ocr': {'enabled': False}, 'timed': {'enabled': False}, 'number': {'enabled': False}}
+        })
+        assert engine.number_workers == 8, f"数字识别线程数未随OCR池调整: {engine.number_workers}"
+        engine.capture_backend.close()
+        engine.capture_backend = FileReplayBackend([Image.new('RGB', (200, 20), color='white')])
+        engine.tesseract_available = True
+
+        # 每次识别耗时0.3秒，记录同时进行的识别数；画面不变时也照常识别
+        running = [0, 0]
+        lock = threading.Lock()
+
+        def slow_ocr_number(image, region_index=None, stop_event=None):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+            time.sleep(0.3)
+            with lock:
+                running[0] -= 1
+            return "12"
+
+        engine.ocr_number = slow_ocr_number
+        engine.frame_detector.lookup = lambda key, image: (False, None)
+        engine.start()
+        try:
+            engine.start_number_recognition()
+            time.sleep(0.8)
+            engine.stop_number_recognition()
+        finally:
+            engine.close()
+        assert running[1] == 8, f"8个区域应同时识别: 最多{running[1]}个"
+        print("✓ OCR池大小为8时，8个区域同时识别")
+
+    print("\n=== 数字识别并发数测试完成 ===")
+
+if __name__ == "__main__":
+    test_ocr_process_pool()
+    test_number_concurrency()
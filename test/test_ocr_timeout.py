@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OCR识别时限和取消测试脚本
+用于验证tesseract卡住时按时限终止进程、停止模块时取消正在进行的识别以及超时次数统计
+"""
+
+import os
+import sys
+import stat
+import time
+import platform
+import tempfile
+import threading
+import subprocess
+
+from PIL import Image
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from autodoor import AutoDoorEngine, OCRCancelled, OCREngine, OCRTimeout, tesseract_pipe_image_to_string
+from test_number_recognition import create_test_image
+
+# 模拟卡住的tesseract：读完输入后长时间不返回，记录进程号以便检查是否被终止
+HANGING_TESSERACT = """#!/bin/sh
+if [ "$1" = "--version" ]; then echo "tesseract 5.3.0"; exit 0; fi
+echo $$ >> "{pids}"
+cat > /dev/null
+exec sleep 30
+"""
+
+def create_hanging_tesseract(temp_dir):
+    """在临时目录创建卡住的tesseract可执行文件"""
+    path = os.path.join(temp_dir, "tesseract")
+    pids = os.path.join(temp_dir, "pids.log")
+    with open(path, 'w') as f:
+        f.write(HANGING_TESSERACT.format(pids=pids))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path, pids
+
+def all_exited(pids_file):
+    """记录的tesseract进程是否都已退出"""
+    with open(pids_file) as f:
+        pids = [int(line) for line in f if line.strip()]
+    for pid in pids:
+        try:
+            os.kill(pid, 0)
+            return False
+        except OSError:
+            pass
+    return True
+
+def test_ocr_timeout():
+    """测试OCR识别时限和取消"""
+    print("=== 开始测试OCR识别时限和取消 ===")
+
+    if platform.system() == "Windows":
+        print("跳过: 模拟的tesseract需要sh")
+        return
+
+    image = Image.new('L', (60, 20), color=255)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tesseract_cmd, pids = create_hanging_tesseract(temp_dir)
+
+        # 1. 超时后终止进程
+        start = time.perf_counter()
+        try:
+            tesseract_pipe_image_to_string(tesseract_cmd, image, timeout=0.3)
+            assert False, "超时应抛出TimeoutExpired"
+        except subprocess.TimeoutExpired:
+            pass
+        elapsed = time.perf_counter() - start
+        assert elapsed < 1.0, f"超时后未及时返回: {elapsed:.2f}秒"
+        assert all_exited(pids), "超时后tesseract进程未终止"
+        print(f"✓ 0.3秒超时，{elapsed:.2f}秒后返回并终止了进程")
+
+        # 2. 取消信号
+        cancel_event = threading.Event()
+        threading.Timer(0.2, cancel_event.set).start()
+        start = time.perf_counter()
+        try:
+            tesseract_pipe_image_to_string(tesseract_cmd, image, cancel_event=cancel_event)
+            assert False, "取消应抛出OCRCancelled"
+        except OCRCancelled:
+            pass
+        elapsed = time.perf_counter() - start
+        assert elapsed < 0.6, f"取消后未及时返回: {elapsed:.2f}秒"
+        assert all_exited(pids), "取消后tesseract进程未终止"
+        print(f"✓ 取消后{elapsed:.2f}秒返回并终止了进程")
+
+        # 3. OCR引擎统一抛出OCRTimeout并统计超时和取消次数
+        engine = OCREngine(tesseract_cmd, backend="pipe")
+        try:
+            engine.image_to_string(image, timeout=0.2)
+            assert False, "超时应抛出OCRTimeout"
+        except OCRTimeout:
+            pass
+        cancel_event = threading.Event()
+        cancel_event.set()
+        try:
+            engine.image_to_string(image, cancel_event=cancel_event)
+            assert False, "已取消时应抛出OCRCancelled"
+        except OCRCancelled:
+            pass
+        stats = engine.get_stats()
+        assert stats["timeouts"] == 1 and stats["cancelled"] == 1 and stats["calls"] == 0, f"统计错误: {stats}"
+        print(f"✓ OCR引擎统计: {engine.format_stats()}")
+
+        # 4. 数字识别超时：画面按空结果处理，超时次数记录到耗时统计
+        frame_dir = os.path.join(temp_dir, "frames")
+        os.makedirs(frame_dir)
+        frame = create_test_image("", size=(200, 60))
+        frame.paste(create_test_image("12/34", size=(100, 30)), (10, 10))
+        frame.save(os.path.join(frame_dir, "frame_0000.png"))
+
+        app = AutoDoorEngine(config_file=os.path.join(temp_dir, "autodoor_config.json"),
+                             log_file=os.path.join(temp_dir, "autodoor.log"), ui_log_capacity=0)
+        app.apply_config({
+            'number_recognition': {'interval': 0.1, 'regions': [
+                {'enabled': True, 'region': [10, 10, 110, 40], 'threshold': 5, 'key': ''}]},
+            'performance': {'digit_templates': False, 'ocr_timeout': 0.2},
+            'alarm': {'ocr': {'enabled': False}, 'timed': {'enabled': False}, 'number': {'enabled': False}}
+        })
+        app.set_capture_backend("replay:" + frame_dir)
+        app.set_tesseract_path(tesseract_cmd)
+        app.tesseract_available = True
+        app.start()
+        try:
+            app.start_number_recognition()
+            time.sleep(0.8)
+            app.stop_number_recognition()
+            timeouts = [row for row in app.latency.snapshot() if row['stage'] == "ocr_timeout"]
+            assert len(timeouts) == 1 and timeouts[0]['count'] == 1, f"超时次数统计错误: {timeouts}"
+            print("✓ 超时的画面不再重复识别，超时次数记录到耗时统计")
+
+            # 5. 停止数字识别时取消正在进行的识别
+            app.ocr_timeout = 0
+            app.frame_detector.reset()
+            app.start_number_recognition()
+            time.sleep(0.3)
+            start = time.perf_counter()
+            app.stop_number_recognition()
+            time.sleep(0.2)
+            assert all_exited(pids), "停止数字识别后tesseract进程未终止"
+            assert app.ocr_engine.cancel_count >= 1, "停止后应取消正在进行的识别"
+            print(f"✓ 停止数字识别{time.perf_counter() - start:.2f}秒内终止了正在进行的识别")
+        finally:
+            app.close()
+
+    print("\n=== OCR识别时限和取消测试完成 ===")
+
+if __name__ == "__main__":
+    test_ocr_timeout()
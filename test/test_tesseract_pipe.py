@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+管道调用Tesseract测试脚本
+用于验证PNM编码、通过标准输入输出调用tesseract不产生临时文件以及OCR后端的选择
+"""
+
+import os
+import sys
+import stat
+import platform
+import tempfile
+import subprocess
+
+from PIL import Image
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from autodoor import OCREngine, TESSEROCR_AVAILABLE, encode_pnm, tesseract_pipe_image_to_string
+
+# 模拟的tesseract：记录参数和输入字节数，输出固定文字
+FAKE_TESSERACT = """#!/bin/sh
+echo "$@" > "{log}"
+wc -c | tr -d ' ' >> "{log}"
+if [ "$4" = "bad" ]; then echo "Failed loading language 'bad'" >&2; exit 1; fi
+printf '123/456\\n\\f'
+"""
+
+def create_fake_tesseract(temp_dir):
+    """在临时目录创建模拟的tesseract可执行文件"""
+    path = os.path.join(temp_dir, "tesseract")
+    log = os.path.join(temp_dir, "args.log")
+    with open(path, 'w') as f:
+        f.write(FAKE_TESSERACT.format(log=log))
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+    return path, log
+
+def test_encode_pnm():
+    """测试PNM编码"""
+    print("=== 开始测试PNM编码 ===")
+
+    gray = Image.new('L', (30, 10), color=200)
+    data = encode_pnm(gray)
+    assert data.startswith(b"P5\n30 10\n255\n"), f"灰度图头部错误: {data[:16]}"
+    assert len(data) == len(b"P5\n30 10\n255\n") + 30 * 10, "灰度图数据长度错误"
+    print("✓ 灰度图编码为P5")
+
+    color = Image.new('RGB', (30, 10), color=(255, 0, 0))
+    data = encode_pnm(color)
+    assert data.startswith(b"P6\n30 10\n255\n") and len(data) == len(b"P6\n30 10\n255\n") + 30 * 10 * 3
+    assert encode_pnm(color.convert('RGBA')) == data, "RGBA应转为RGB编码"
+    print("✓ 彩色图编码为P6")
+
+    binary = gray.convert('1')
+    assert encode_pnm(binary).startswith(b"P5\n"), "二值图应转为灰度编码"
+    print("✓ 二值图转为灰度编码")
+
+    print("\n=== PNM编码测试完成 ===")
+
+def test_tesseract_pipe():
+    """测试管道调用tesseract"""
+    print("=== 开始测试管道调用Tesseract ===")
+
+    if platform.system() == "Windows":
+        print("跳过: 模拟的tesseract需要sh")
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tesseract_cmd, log = create_fake_tesseract(temp_dir)
+        work_dir = os.path.join(temp_dir, "work")
+        os.makedirs(work_dir)
+        old_cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            # 1. 参数和输入
+            image = Image.new('L', (40, 12), color=255)
+            text = tesseract_pipe_image_to_string(tesseract_cmd, image, lang='eng', config='--psm 7 -c tessedit_char_whitelist=0123456789/')
+            assert text.strip() == "123/456", f"识别结果错误: {text!r}"
+            with open(log) as f:
+                args, size = f.read().split("\n")[:2]
+            assert args == "stdin stdout -l eng --psm 7 -c tessedit_char_whitelist=0123456789/", f"参数错误: {args}"
+            assert int(size) == len(encode_pnm(image)), f"写入标准输入的字节数错误: {size}"
+            print(f"✓ 参数: {args}，写入{size}字节")
+
+            # 2. 不产生临时文件
+            assert os.listdir(work_dir) == [], f"工作目录中出现了文件: {os.listdir(work_dir)}"
+            print("✓ 没有写入临时文件")
+
+            # 3. tesseract出错时抛出CalledProcessError并保留错误输出
+            try:
+                tesseract_pipe_image_to_string(tesseract_cmd, image, lang='bad')
+                assert False, "tesseract出错时应抛出异常"
+            except subprocess.CalledProcessError as e:
+                assert b"Failed loading language" in e.stderr
+            print("✓ tesseract出错时抛出CalledProcessError")
+
+            # 4. OCR引擎使用管道后端
+            engine = OCREngine(tesseract_cmd, backend="pipe")
+            assert engine.backend == "pipe"
+            assert engine.image_to_string(image, lang='eng', config='--psm 7').strip() == "123/456"
+            assert engine.get_stats()["calls"] == 1
+            print("✓ OCR引擎管道后端识别正常")
+        finally:
+            os.chdir(old_cwd)
+
+    # 5. 后端选择：未安装tesserocr时auto使用管道
+    expected = "tesserocr" if TESSEROCR_AVAILABLE else "pipe"
+    assert OCREngine.resolve_backend("auto") == expected
+    assert OCREngine.resolve_backend("tesserocr") == expected
+    assert OCREngine.resolve_backend("unknown") == expected
+    assert OCREngine.resolve_backend("pytesseract") == "pytesseract"
+    print(f"✓ auto后端解析为{expected}")
+
+    print("\n=== 管道调用Tesseract测试完成 ===")
+
+if __name__ == "__main__":
+    test_encode_pnm()
+    test_tesseract_pipe()
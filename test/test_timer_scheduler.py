@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+定时调度器测试脚本
+用于验证小于1秒的间隔、取消任务以及单线程驱动大量定时组
+"""
+
+import os
+import sys
+import time
+import threading
+
+# 添加当前目录到Python路径
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from autodoor import TimerScheduler
+
+def test_timer_scheduler():
+    """测试定时调度器"""
+    print("=== 开始测试定时调度器 ===")
+
+    scheduler = TimerScheduler()
+    scheduler.start()
+
+    try:
+        # 1. 小于1秒的间隔，触发时间不漂移
+        fired = []
+        scheduler.schedule(("timed", 0), 0.05, lambda: fired.append(time.monotonic()))
+        time.sleep(0.52)
+        scheduler.cancel(("timed", 0))
+        assert 9 <= len(fired) <= 12, f"0.05秒间隔触发次数错误: {len(fired)}"
+        drift = (fired[-1] - fired[0]) - 0.05 * (len(fired) - 1)
+        assert abs(drift) < 0.03, f"触发时间漂移过大: {drift:.3f}秒"
+        print(f"✓ 0.05秒间隔触发{len(fired)}次，累计漂移{drift*1000:.1f}ms")
+
+        # 2. 取消后不再触发
+        count = len(fired)
+        time.sleep(0.15)
+        assert len(fired) == count, "取消后仍在触发"
+        print("✓ 取消任务生效")
+
+        # 3. 一个线程驱动数百个定时组
+        counts = [0] * 300
+        lock = threading.Lock()
+
+        def make_callback(index):
+            def callback():
+                with lock:
+                    counts[index] += 1
+            return callback
+
+        thread_count = threading.active_count()
+        for i in range(300):
+            scheduler.schedule(("timed", i), 0.1, make_callback(i))
+        assert threading.active_count() == thread_count, "调度任务不应创建新线程"
+        time.sleep(0.35)
+        for i in range(300):
+            scheduler.cancel(("timed", i))
+        assert all(c >= 3 for c in counts), f"部分定时组未按时触发: {min(counts)}"
+        assert scheduler.job_count() == 0, "任务未全部取消"
+        print(f"✓ 300个定时组由单线程驱动，最少触发{min(counts)}次")
+
+        # 4. 推迟任务
+        postponed = []
+        scheduler.schedule(("number", 0), 0.05, lambda: postponed.append(1), delay=0.05)
+        scheduler.postpone(("number", 0), 0.3)
+        time.sleep(0.2)
+        assert not postponed, "推迟的任务不应提前触发"
+        scheduler.cancel(("number", 0))
+        print("✓ 推迟任务生效")
+    finally:
+        scheduler.stop()
+
+    print("\n=== 定时调度器测试完成 ===")
+
+if __name__ == "__main__":
+    test_timer_scheduler()